@@ -1,19 +1,42 @@
 # AI Toolkit
 # A collection of tools to help AI assistants with code editing and analysis
 
-from .file_editor import FileEditor, EditRegion, EditResult
-from .code_analyzer import CodeAnalyzer, CodeSymbol, CodeContext
-from .test_helper import TestHelper, TestCase, TestAnalysis
+from .file_editor import FileEditor, EditRegion, EditResult, LineChange
+from .code_analyzer import CodeAnalyzer, CodeSymbol, CodeContext, ResolvedSymbol, ContextSlice, SlicedContext
+from .symbol_store import SymbolStore, CompactSymbol, StringTable
+from .parse_utils import parse_tolerant, ParseDiagnostic, TolerantParse
+from .language_backends import LanguageBackend, PythonBackend, BraceBackend, register_backend, get_backend
+from .test_helper import TestHelper, TestCase, TestAnalysis, TestSuiteReport
+from .coverage_tracer import CoverageTracer, CoverageReport, FileCoverage
 
 __version__ = '0.1.0'
 __all__ = [
     'FileEditor',
     'EditRegion',
     'EditResult',
+    'LineChange',
     'CodeAnalyzer',
     'CodeSymbol',
     'CodeContext',
+    'ResolvedSymbol',
+    'ContextSlice',
+    'SlicedContext',
+    'SymbolStore',
+    'CompactSymbol',
+    'StringTable',
+    'parse_tolerant',
+    'ParseDiagnostic',
+    'TolerantParse',
+    'LanguageBackend',
+    'PythonBackend',
+    'BraceBackend',
+    'register_backend',
+    'get_backend',
     'TestHelper',
     'TestCase',
-    'TestAnalysis'
+    'TestAnalysis',
+    'TestSuiteReport',
+    'CoverageTracer',
+    'CoverageReport',
+    'FileCoverage'
 ] 
\ No newline at end of file
@@ -2,11 +2,20 @@
 # Advanced code analysis capabilities for better context understanding
 
 import ast
+import os
+import math
+from collections import deque
+from itertools import groupby, islice
 from pathlib import Path
-from typing import List, Dict, Set, Optional, Union
-from dataclasses import dataclass
+from typing import TYPE_CHECKING, List, Dict, Sequence, Set, Optional, Tuple, Union
+from dataclasses import dataclass, field, replace
 import re
 
+from .parse_utils import ParseDiagnostic, parse_source
+
+if TYPE_CHECKING:
+    from .file_editor import LineChange
+
 @dataclass(frozen=True)
 class CodeSymbol:
     """Represents a code symbol (function, class, variable)"""
@@ -17,6 +26,7 @@ class CodeSymbol:
     docstring: Optional[str]
     parent: Optional[str]  # Parent class/function name if any
     dependencies: frozenset[str]  # Other symbols this depends on
+    references: frozenset[str] = frozenset()  # Names and dotted names used, e.g. 'os', 'os.path.join'
 
 @dataclass
 class CodeContext:
@@ -26,15 +36,86 @@ class CodeContext:
     scope_stack: List[str]  # Stack of nested scopes
     docstring: Optional[str]
     file_path: str
+    import_map: Dict[str, str] = field(default_factory=dict)  # Local name -> imported dotted name
+    import_lines: List[int] = field(default_factory=list)  # Line of each entry in imports
+    diagnostics: List[ParseDiagnostic] = field(default_factory=list)  # Syntax errors skipped in tolerant mode
+
+@dataclass(frozen=True)
+class ResolvedSymbol:
+    """A symbol located in a workspace file"""
+    file_path: str  # Relative to the workspace root, '/' separated
+    name: Optional[str]  # Qualified symbol name, or None for the module itself
+
+# Rough characters-per-token ratio used for token budgets
+CHARS_PER_TOKEN = 4
+
+@dataclass(frozen=True)
+class ContextSlice:
+    """Source text of one symbol selected for a prompt"""
+    file_path: str
+    name: str
+    start_line: int
+    end_line: int
+    distance: int  # Dependency steps from the requested code; 0 for the code itself
+    text: str
+    truncated: bool = False
+    
+    def render(self) -> str:
+        return f"# {self.file_path}:{self.start_line}-{self.end_line}\n{self.text}\n"
+
+@dataclass
+class SlicedContext:
+    """Prompt context packed into a size budget"""
+    slices: List[ContextSlice]
+    budget: int
+    unit: str  # 'chars' or 'tokens'
+    size: int  # Size of the rendered slices, in budget units
+    omitted: List[ResolvedSymbol]  # Candidates considered that did not fit, nearest first
+    files_read: int
+    
+    def render(self) -> str:
+        """Join the slices into prompt text, nearest code first."""
+        return '\n'.join(s.render() for s in self.slices)
 
 class CodeAnalyzer:
     """Advanced code analyzer for understanding context"""
     
-    def __init__(self, workspace_root: Union[str, Path]):
+    def __init__(self, workspace_root: Union[str, Path], compact: bool = False):
+        """Initialize the analyzer.
+        
+        Args:
+            workspace_root: Root directory that file paths are relative to
+            compact: Keep cached analyses in a SymbolStore (interned strings,
+                     integer dependency IDs, docstrings read on access) to
+                     cut memory use on large workspaces
+        """
         self.workspace_root = Path(workspace_root)
+        self._store = None
+        if compact:
+            from .symbol_store import SymbolStore
+            self._store = SymbolStore(self.workspace_root)
+        # Shared across calls: parsed files keyed by (mtime_ns, size), and
+        # dotted module name -> defining file (None if not in the workspace)
+        self._context_cache: Dict[str, Tuple[Tuple[int, int], CodeContext]] = {}
+        self._module_cache: Dict[str, Optional[str]] = {}
+        # Resolved dependencies per (file, symbol), with the analyses they were
+        # resolved against; valid while every one of those files is unchanged
+        self._resolution_cache: Dict[Tuple[str, str], Tuple[Dict[str, 'ResolvedSymbol'], Dict[str, CodeContext]]] = {}
+        self._consulted: Optional[Dict[str, CodeContext]] = None
+        self._checked: Optional[Set[str]] = None  # Files already stat'ed during a traversal
+        
+    def analyze_file(self, file_path: str, tolerant: bool = False) -> CodeContext:
+        """Analyze an entire file.
         
-    def analyze_file(self, file_path: str) -> CodeContext:
-        """Analyze an entire file"""
+        With tolerant=True a syntax error does not raise: the top-level
+        block containing it is skipped, the rest of the file is analyzed and
+        the skipped blocks are reported in CodeContext.diagnostics (see
+        parse_utils.parse_tolerant).
+        
+        Files are analyzed by the language backend registered for their
+        extension (see language_backends); files without one are parsed as
+        Python.
+        """
         abs_path = self.workspace_root / file_path
         if not abs_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
@@ -42,9 +123,23 @@ class CodeAnalyzer:
         with open(abs_path, 'r', encoding='utf-8') as f:
             content = f.read()
             
-        tree = ast.parse(content)
+        from .language_backends import get_backend
+        backend = get_backend(file_path)
+        if backend is not None:
+            return backend.analyze(content, file_path, tolerant)
+        tree, diagnostics = parse_source(content, str(file_path), tolerant)
+        context = self._context_from_tree(tree, file_path)
+        context.diagnostics = diagnostics
+        return context
+        
+    @staticmethod
+    def _context_from_tree(tree: ast.Module, file_path: str) -> CodeContext:
+        """Collect the symbols and imports of a parsed module"""
         symbols = {}
         imports = []
+        import_lines = []
+        import_map = {}
+        package = Path(file_path).parent.parts
         
         # Extract file-level docstring
         docstring = ast.get_docstring(tree)
@@ -59,11 +154,16 @@ class CodeAnalyzer:
                 name = node.name
                 # Collect base class dependencies
                 base_deps = set()
+                base_refs = set()
                 for base in node.bases:
                     if isinstance(base, ast.Name):
                         base_deps.add(base.id)
+                        base_refs.add(base.id)
                     elif isinstance(base, ast.Attribute):
                         base_deps.add(base.attr)
+                        dotted = _dotted_name(base)
+                        if dotted:
+                            base_refs.add(dotted)
                         
                 symbol = CodeSymbol(
                     name=name,
@@ -72,7 +172,8 @@ class CodeAnalyzer:
                     end_line=node.end_lineno,
                     docstring=ast.get_docstring(node),
                     parent=self.current_parent,
-                    dependencies=frozenset(base_deps)
+                    dependencies=frozenset(base_deps),
+                    references=frozenset(base_refs)
                 )
                 symbols[name] = symbol
                 
@@ -97,13 +198,18 @@ class CodeAnalyzer:
                     
                 # Analyze function body for dependencies
                 deps = set()
+                refs = set()
                 for child in ast.walk(node):
                     if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
                         deps.add(child.id)
+                        refs.add(child.id)
                     elif isinstance(child, ast.Attribute):
                         if isinstance(child.value, ast.Name):
                             deps.add(child.value.id)
                         deps.add(child.attr)
+                        dotted = _dotted_name(child)
+                        if dotted:
+                            refs.add(dotted)
                         
                 # Add parent class dependencies for methods
                 if self.current_parent:
@@ -118,7 +224,8 @@ class CodeAnalyzer:
                     end_line=node.end_lineno,
                     docstring=ast.get_docstring(node),
                     parent=self.current_parent,
-                    dependencies=frozenset(deps)
+                    dependencies=frozenset(deps),
+                    references=frozenset(refs)
                 )
                 symbols[full_name] = symbol
                 
@@ -134,11 +241,26 @@ class CodeAnalyzer:
             def visit_Import(self, node):
                 for name in node.names:
                     imports.append(name.name)
+                    import_lines.append(node.lineno)
+                    if name.asname:
+                        import_map[name.asname] = name.name
+                    else:
+                        head = name.name.split('.')[0]
+                        import_map[head] = head
                     
             def visit_ImportFrom(self, node):
                 module = node.module or ''
                 for name in node.names:
                     imports.append(f"{module}.{name.name}")
+                    import_lines.append(node.lineno)
+                    
+                # Make relative imports absolute from the file's package
+                if node.level:
+                    base = package[:len(package) - node.level + 1] if node.level <= len(package) + 1 else ()
+                    module = '.'.join(list(base) + ([module] if module else []))
+                for name in node.names:
+                    if name.name != '*':
+                        import_map[name.asname or name.name] = f"{module}.{name.name}" if module else name.name
                     
         visitor = SymbolVisitor()
         visitor.visit(tree)
@@ -148,9 +270,142 @@ class CodeAnalyzer:
             imports=imports,
             scope_stack=visitor.scope_stack,
             docstring=docstring,
-            file_path=file_path
+            file_path=file_path,
+            import_map=import_map,
+            import_lines=import_lines
         )
         
+    def reanalyze_file(self, file_path: str, changes: Sequence['LineChange'] = (),
+                       previous: Optional[CodeContext] = None, tolerant: bool = False) -> CodeContext:
+        """Refresh a file's analysis after an edit, re-parsing only what changed.
+        
+        When every change lies inside a top-level class or function of the
+        previous analysis, only those statements are re-parsed and the
+        symbols after them are shifted. Changes anywhere else (module-level
+        code, decorators, imports) or edits that alter the top-level
+        structure fall back to a full analyze_file. The result replaces the
+        cached analysis used by the resolver.
+        
+        Args:
+            file_path: Path to the edited file
+            changes: Every edit made since previous, e.g. EditResult.changes
+            previous: Analysis before the edit; defaults to the cached one
+            tolerant: Skip blocks with syntax errors instead of raising (see analyze_file)
+            
+        Returns:
+            CodeContext for the file's current contents
+        """
+        rel_path = Path(file_path).as_posix()
+        if previous is None:
+            cached = self._context_cache.get(rel_path)
+            previous = cached[1] if cached is not None else None
+            
+        context = None
+        if previous is not None and changes and _is_python(rel_path):
+            context = self._reanalyze(rel_path, previous, changes)
+        if context is None:
+            context = self.analyze_file(file_path, tolerant)
+            if self._store is not None:
+                context = self._store.compact_context(context)
+                
+        try:
+            st = os.stat(os.path.join(self.workspace_root, rel_path))
+            self._context_cache[rel_path] = ((st.st_mtime_ns, st.st_size), context)
+        except OSError:
+            pass
+        return context
+        
+    def _reanalyze(self, file_path: str, previous: CodeContext,
+                   changes: Sequence['LineChange']) -> Optional[CodeContext]:
+        """Re-parse the top-level statements touched by changes, or None for a full parse."""
+        if previous.diagnostics or len(previous.import_lines) != len(previous.imports):
+            return None
+            
+        # Outermost symbols in line order; every symbol lies inside one of them
+        ordered = sorted(previous.symbols.values(), key=lambda s: s.line_number)
+        tops = []
+        for symbol in ordered:
+            if symbol.parent is None and (not tops or symbol.line_number > tops[-1].end_line):
+                tops.append(symbol)
+                
+        # Line delta of the edits inside each affected top-level statement
+        deltas: Dict[int, int] = {}
+        for change in changes:
+            for i, top in enumerate(tops):
+                inside = top.line_number <= change.start_line and change.end_line <= top.end_line
+                if inside and (change.end_line >= change.start_line or change.start_line > top.line_number):
+                    break
+            else:
+                return None
+            if any(top.line_number <= line <= top.end_line for line in previous.import_lines):
+                return None
+            deltas[i] = deltas.get(i, 0) + change.delta
+            
+        with open(os.path.join(self.workspace_root, file_path), 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+            
+        symbols = {}
+        shift = 0
+        shifts = []  # (old end line, cumulative shift after it)
+        position = 0
+        for i, top in enumerate(tops):
+            group = []
+            while position < len(ordered) and ordered[position].line_number <= top.end_line:
+                group.append(ordered[position])
+                position += 1
+            if i not in deltas:
+                for symbol in group:
+                    symbols[symbol.name] = self._shift_symbol(symbol, shift) if shift else symbol
+                continue
+                
+            start = top.line_number + shift
+            end = top.end_line + shift + deltas[i]
+            # Include the decorators above the def/class (possibly spanning
+            # several lines), which the full analysis sees as part of it
+            lower = tops[i - 1].end_line + shift if i else 0
+            for line in range(start - 1, lower, -1):
+                text = lines[line - 1]
+                if text.startswith('@'):
+                    start = line
+                elif text[:1] not in ' \t\r\n#)]}':
+                    break
+            try:
+                tree = ast.parse(''.join(lines[start - 1:end]))
+            except SyntaxError:
+                return None
+            if len(tree.body) != 1 or not isinstance(tree.body[0], (ast.ClassDef, ast.FunctionDef)):
+                return None  # The edit changed the top-level structure
+            ast.increment_lineno(tree, start - 1)
+            block = self._context_from_tree(tree, file_path)
+            if block.imports:
+                return None
+            new_symbols = block.symbols
+            if self._store is not None:
+                new_symbols = self._store.compact_symbols(file_path, new_symbols.values())
+            symbols.update(new_symbols)
+            shift += deltas[i]
+            shifts.append((top.end_line, shift))
+            
+        def shifted_line(line: int) -> int:
+            return line + next((s for end, s in reversed(shifts) if end < line), 0)
+            
+        return CodeContext(
+            symbols=symbols,
+            imports=list(previous.imports),
+            scope_stack=[],
+            docstring=previous.docstring,
+            file_path=previous.file_path,
+            import_map=previous.import_map,
+            import_lines=[shifted_line(line) for line in previous.import_lines]
+        )
+        
+    @staticmethod
+    def _shift_symbol(symbol, delta: int):
+        """Move a symbol down by delta lines."""
+        if isinstance(symbol, CodeSymbol):
+            return replace(symbol, line_number=symbol.line_number + delta, end_line=symbol.end_line + delta)
+        return symbol.shifted(delta)
+        
     def get_context_at_line(self, file_path: str, line_number: int) -> CodeContext:
         """Get the code context (symbols + scope stack) for a specific line.
         
@@ -209,7 +464,9 @@ class CodeAnalyzer:
             imports=context.imports,
             scope_stack=scope_stack,
             docstring=context.docstring,
-            file_path=file_path
+            file_path=file_path,
+            import_map=context.import_map,
+            import_lines=context.import_lines
         )
         
     def find_symbol_references(self, file_path: str, symbol_name: str) -> List[int]:
@@ -235,6 +492,9 @@ class CodeAnalyzer:
     def get_symbol_dependencies(self, file_path: str, symbol_name: str) -> Set[str]:
         """Get all symbols that the given symbol depends on.
         
+        The names are not resolved; see resolve_symbol_dependencies for their
+        defining files and symbols across the workspace.
+        
         This method:
         1. Gets the direct dependencies of the symbol from its frozenset
         2. If it's a method, includes the parent class's dependencies
@@ -263,4 +523,396 @@ class CodeAnalyzer:
                 # Union with parent's dependencies
                 dependencies.update(context.symbols[class_name].dependencies)
                 
-        return dependencies 
\ No newline at end of file
+        return dependencies 
+        
+    def clear_cache(self):
+        """Forget cached file analyses, module locations and resolutions."""
+        self._context_cache.clear()
+        self._module_cache.clear()
+        self._resolution_cache.clear()
+        if self._store is not None:
+            self._store.clear()
+        
+    def _cached_context(self, file_path: str) -> Optional[CodeContext]:
+        """Analyze a file, reusing the previous analysis while the file is unchanged."""
+        cached = self._context_cache.get(file_path)
+        if cached is not None and self._checked is not None and file_path in self._checked:
+            context = cached[1]
+        else:
+            try:
+                st = os.stat(os.path.join(self.workspace_root, file_path))
+            except OSError:
+                self._context_cache.pop(file_path, None)
+                return None
+            stamp = (st.st_mtime_ns, st.st_size)
+            if cached is not None and cached[0] == stamp:
+                context = cached[1]
+            else:
+                try:
+                    context = self.analyze_file(file_path, tolerant=True)
+                except (UnicodeDecodeError, FileNotFoundError):
+                    context = None
+                if context is not None and self._store is not None:
+                    context = self._store.compact_context(context)
+                self._context_cache[file_path] = (stamp, context)
+            if self._checked is not None:
+                self._checked.add(file_path)
+        if self._consulted is not None:
+            self._consulted[file_path] = context
+        return context
+        
+    def resolve_module(self, module: str) -> Optional[str]:
+        """Find the workspace file defining a dotted module name.
+        
+        Tries '<a>/<b>.py' and '<a>/<b>/__init__.py' under the workspace
+        root, then the same with leading package names dropped, so imports
+        naming the workspace's own package resolve as well.
+        
+        Returns:
+            Path relative to the workspace root, or None for modules outside it
+        """
+        try:
+            return self._module_cache[module]
+        except KeyError:
+            pass
+        parts = module.split('.')
+        found = None
+        for start in range(len(parts)):
+            base = '/'.join(parts[start:])
+            for candidate in (f"{base}.py", f"{base}/__init__.py"):
+                if (self.workspace_root / candidate).is_file():
+                    found = candidate
+                    break
+            if found:
+                break
+        self._module_cache[module] = found
+        return found
+        
+    def _resolve_dotted(self, dotted: str, seen: Set[str]) -> Optional[ResolvedSymbol]:
+        """Resolve an absolute dotted name to the module and symbol defining it."""
+        if dotted in seen:
+            return None
+        seen.add(dotted)
+        parts = dotted.split('.')
+        for split in range(len(parts), 0, -1):
+            module_file = self.resolve_module('.'.join(parts[:split]))
+            if module_file is None:
+                continue
+            rest = parts[split:]
+            if not rest:
+                return ResolvedSymbol(module_file, None)
+            context = self._cached_context(module_file)
+            if context is None:
+                return None
+            for end in range(len(rest), 0, -1):
+                name = '.'.join(rest[:end])
+                if name in context.symbols:
+                    return ResolvedSymbol(module_file, name)
+            # Follow re-exports such as 'from .impl import Name' in a package
+            target = context.import_map.get(rest[0])
+            if target is not None:
+                return self._resolve_dotted('.'.join([target] + rest[1:]), seen)
+            return None
+        return None
+        
+    def _resolve_member(self, owner: ResolvedSymbol, member: str, seen: Set[ResolvedSymbol]) -> Optional[ResolvedSymbol]:
+        """Find a class member, searching base classes in declaration order."""
+        if owner in seen:
+            return None
+        seen.add(owner)
+        context = self._cached_context(owner.file_path)
+        if context is None or owner.name not in context.symbols:
+            return None
+        name = f"{owner.name}.{member}"
+        if name in context.symbols:
+            return ResolvedSymbol(owner.file_path, name)
+        class_symbol = context.symbols[owner.name]
+        for base in sorted(class_symbol.references):
+            base_class = self._resolve_reference(context, class_symbol, base)
+            if base_class is not None and base_class.name is not None:
+                found = self._resolve_member(base_class, member, seen)
+                if found is not None:
+                    return found
+        return None
+        
+    def _resolve_reference(self, context: CodeContext, symbol: CodeSymbol, name: str) -> Optional[ResolvedSymbol]:
+        """Resolve a name used by a symbol to its definition."""
+        file_path = Path(context.file_path).as_posix()
+        head, _, rest = name.partition('.')
+        if head in ('self', 'cls'):
+            # Members of the enclosing class or its base classes
+            owner = symbol.parent or (symbol.name if symbol.type == 'class' else None)
+            if not owner or not rest:
+                return None
+            return self._resolve_member(ResolvedSymbol(file_path, owner), rest.split('.')[0], set())
+        for candidate in (name, head):
+            if candidate in context.symbols and context.symbols[candidate] is not symbol:
+                return ResolvedSymbol(file_path, candidate)
+        target = context.import_map.get(head)
+        if target is not None:
+            return self._resolve_dotted(f"{target}.{rest}" if rest else target, set())
+        return None
+        
+    def resolve_symbol_dependencies(self, file_path: str, symbol_name: str) -> Dict[str, ResolvedSymbol]:
+        """Map each dependency of a symbol to the file and symbol defining it.
+        
+        Names are resolved against the symbol's own file first (including
+        self/cls members of its class), then through the file's imports to
+        modules in the workspace. Builtins, locals, attributes of unknown
+        objects and modules outside the workspace are left out. A class
+        also depends on its __init__.
+        
+        Args:
+            file_path: Path to the file containing the symbol
+            symbol_name: Qualified symbol name (e.g. 'TestClass.test_method')
+            
+        Returns:
+            Dict mapping each resolvable name the symbol uses to its definition
+        """
+        return dict(self._resolved_dependencies(Path(file_path).as_posix(), symbol_name))
+        
+    def _resolved_dependencies(self, file_path: str, symbol_name: str) -> Dict[str, ResolvedSymbol]:
+        """Cached implementation of resolve_symbol_dependencies."""
+        key = (file_path, symbol_name)
+        cached = self._resolution_cache.get(key)
+        if cached is not None:
+            resolved, consulted = cached
+            if all(self._cached_context(f) is context for f, context in consulted.items()):
+                return resolved
+        
+        outer, self._consulted = self._consulted, {}
+        try:
+            resolved = {}
+            context = self._cached_context(file_path)
+            symbol = context.symbols.get(symbol_name) if context is not None else None
+            if symbol is not None:
+                targets = set()
+                for name in sorted(symbol.references):
+                    target = self._resolve_reference(context, symbol, name)
+                    if target is not None and target not in targets:
+                        targets.add(target)
+                        resolved[name] = target
+                init = f"{symbol_name}.__init__"
+                if symbol.type == 'class' and init in context.symbols:
+                    resolved['__init__'] = ResolvedSymbol(file_path, init)
+            consulted = self._consulted
+        finally:
+            self._consulted = outer
+        if outer is not None:
+            outer.update(consulted)
+        self._resolution_cache[key] = (resolved, consulted)
+        return resolved
+        
+    def transitive_symbol_dependencies(self, file_path: str, symbol_name: str,
+                                       max_depth: Optional[int] = None) -> Dict[ResolvedSymbol, int]:
+        """Find everything a symbol needs, directly or transitively, across files.
+        
+        Args:
+            file_path: Path to the file containing the symbol
+            symbol_name: Qualified symbol name
+            max_depth: Optional limit on the number of resolution steps
+            
+        Returns:
+            Dict mapping each required symbol (or module) to its distance from
+            the starting symbol, in breadth-first order
+        """
+        start = ResolvedSymbol(Path(file_path).as_posix(), symbol_name)
+        # Each file is stat'ed at most once per traversal
+        self._checked = set()
+        try:
+            return dict(self._walk_dependencies(start, max_depth))
+        finally:
+            self._checked = None
+            
+    def _walk_dependencies(self, start: ResolvedSymbol, max_depth: Optional[int]):
+        """Yield (symbol, distance) for everything start needs, breadth-first."""
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            depth = distances[current]
+            if current.name is None or (max_depth is not None and depth >= max_depth):
+                continue
+            for target in self._resolved_dependencies(current.file_path, current.name).values():
+                if target not in distances:
+                    distances[target] = depth + 1
+                    queue.append(target)
+                    yield target, depth + 1
+        
+    def slice_context(self, file_path: str, line_number: Optional[int] = None,
+                      symbol_name: Optional[str] = None, budget: int = 8000,
+                      unit: str = 'chars', max_depth: Optional[int] = None) -> SlicedContext:
+        """Build prompt context for a line or symbol within a size budget.
+        
+        The innermost symbol at the line (or the named symbol) is the seed.
+        Its dependencies are collected breadth-first across files and packed
+        nearest first, smallest first within a distance, skipping whatever
+        does not fit. Classes other than the seed contribute only their
+        header (signature, docstring, class attributes); their methods are
+        separate candidates. Only the needed leading lines of each file are
+        read, and candidates that cannot fit are skipped without reading.
+        
+        Args:
+            file_path: Path to the file, relative to the workspace root
+            line_number: Line whose enclosing symbol is the seed
+            symbol_name: Qualified name of the seed symbol (instead of line_number)
+            budget: Maximum size of the rendered context
+            unit: 'chars', or 'tokens' for an approximate count of
+                  CHARS_PER_TOKEN characters per token
+            max_depth: Optional limit on dependency distance
+            
+        Returns:
+            SlicedContext whose render() is the prompt text
+            
+        Raises:
+            ValueError: If not exactly one of line_number/symbol_name is given,
+                       or unit is unknown
+            FileNotFoundError: If the file is missing or cannot be parsed
+            KeyError: If symbol_name is not defined in the file
+        """
+        if (line_number is None) == (symbol_name is None):
+            raise ValueError("Specify exactly one of line_number or symbol_name")
+        if unit not in ('chars', 'tokens'):
+            raise ValueError(f"Unknown budget unit: {unit}")
+        rel_path = Path(file_path).as_posix()
+        context = self._cached_context(rel_path)
+        if context is None:
+            raise FileNotFoundError(f"Cannot analyze file: {file_path}")
+            
+        if symbol_name is None:
+            containing = [s for s in context.symbols.values() if s.line_number <= line_number <= s.end_line]
+            if not containing:
+                return SlicedContext([], budget, unit, 0, [], 0)
+            symbol_name = max(containing, key=lambda s: s.line_number).name
+        elif symbol_name not in context.symbols:
+            raise KeyError(f"Symbol not found: {symbol_name}")
+            
+        # The seed and its enclosing scopes come first, then what it needs by distance
+        seed = ResolvedSymbol(rel_path, symbol_name)
+        seeds = [(seed, 0)]
+        parent = context.symbols[symbol_name].parent
+        while parent in context.symbols:
+            seeds.append((ResolvedSymbol(rel_path, parent), 0))
+            parent = context.symbols[parent].parent
+            
+        def cost(chars: int) -> int:
+            return chars if unit == 'chars' else math.ceil(chars / CHARS_PER_TOKEN)
+            
+        lines_read: Dict[str, List[str]] = {}
+        member_lines: Dict[str, Dict[str, int]] = {}
+        slices: List[ContextSlice] = []
+        omitted: List[ResolvedSymbol] = []
+        selected: Dict[str, List[Tuple[int, int]]] = {}
+        considered = set()
+        used = 0
+        
+        def pack(tier):
+            """Add a tier of equally distant candidates, smallest first."""
+            nonlocal used
+            candidates = []
+            for target, distance in tier:
+                if target.name is None or target in considered:
+                    continue
+                considered.add(target)
+                target_context = self._cached_context(target.file_path)
+                if target_context is None or target.name not in target_context.symbols:
+                    continue
+                start, end = self._slice_range(target_context, target.name, target == seed, member_lines)
+                candidates.append((target != seed, end - start, target.file_path, start, end, target, distance))
+            candidates.sort(key=lambda c: c[:4])
+            
+            for _, _, _, start, end, target, distance in candidates:
+                if any(s <= start and end <= e for s, e in selected.get(target.file_path, ())):
+                    continue  # Already inside a selected slice
+                header_chars = len(f"# {target.file_path}:{start}-{end}\n") + 2  # Plus separator
+                # Every line takes at least its newline; skip without reading if even that cannot fit
+                if used + cost(header_chars + end - start) > budget and target != seed:
+                    omitted.append(target)
+                    continue
+                lines = self._read_lines(target.file_path, end, lines_read)
+                text = ''.join(lines[start - 1:end]).rstrip()
+                end = start + text.count('\n')  # Drop trailing blank lines
+                truncated = False
+                if used + cost(header_chars + len(text)) > budget:
+                    if target != seed:
+                        omitted.append(target)
+                        continue
+                    # Keep as much of the seed as fits, in whole lines
+                    kept = []
+                    for line in lines[start - 1:end]:
+                        if used + cost(header_chars + len(''.join(kept)) + len(line)) > budget:
+                            break
+                        kept.append(line)
+                    if not kept:
+                        omitted.append(target)
+                        continue
+                    end = start + len(kept) - 1
+                    text = ''.join(kept).rstrip()
+                    truncated = True
+                slices.append(ContextSlice(target.file_path, target.name, start, end, distance, text, truncated))
+                selected.setdefault(target.file_path, []).append((start, end))
+                used += cost(header_chars + len(text))
+                
+        # Stop walking once not even a one-line slice could fit
+        min_cost = cost(len(f"# {rel_path}:1-1\n") + 3)
+        self._checked = set()
+        walk = self._walk_dependencies(seed, max_depth)
+        try:
+            pack(seeds)
+            for _, tier in groupby(walk, key=lambda item: item[1]):
+                if budget - used < min_cost:
+                    break
+                pack(list(tier))
+        finally:
+            walk.close()
+            self._checked = None
+            
+        size = cost(sum(len(s.render()) for s in slices) + max(len(slices) - 1, 0))
+        return SlicedContext(slices, budget, unit, size, omitted, len(lines_read))
+        
+    @staticmethod
+    def _slice_range(context: CodeContext, name: str, full: bool,
+                     member_lines: Dict[str, Dict[str, int]]) -> Tuple[int, int]:
+        """Line range of a symbol's slice: all of it, or a class's header only."""
+        symbol = context.symbols[name]
+        start, end = symbol.line_number, symbol.end_line
+        if not full and symbol.type == 'class':
+            # First member line of every class in the file, computed once per file
+            first_members = member_lines.get(context.file_path)
+            if first_members is None:
+                first_members = {}
+                for member in context.symbols.values():
+                    if member.parent is not None:
+                        first = first_members.get(member.parent)
+                        if first is None or member.line_number < first:
+                            first_members[member.parent] = member.line_number
+                member_lines[context.file_path] = first_members
+            if name in first_members:
+                end = max(start, first_members[name] - 1)
+        return start, end
+        
+    def _read_lines(self, file_path: str, end: int, lines_read: Dict[str, List[str]]) -> List[str]:
+        """Read a file's first end lines, extending what was already read."""
+        lines = lines_read.get(file_path)
+        if lines is None or len(lines) < end:
+            with open(os.path.join(self.workspace_root, file_path), 'r', encoding='utf-8') as f:
+                lines = list(islice(f, end))
+            lines_read[file_path] = lines
+        return lines
+
+def _is_python(file_path: str) -> bool:
+    """Check whether a file is analyzed as Python, so it can be re-parsed by block."""
+    from .language_backends import PythonBackend, get_backend
+    backend = get_backend(file_path)
+    return backend is None or isinstance(backend, PythonBackend)
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    """Return 'a.b.c' for an attribute chain rooted at a name, else None."""
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return '.'.join(reversed(parts))
\ No newline at end of file
@@ -0,0 +1,195 @@
+# AI Toolkit - Coverage Tracer
+# Low-overhead line coverage restricted to workspace files
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import List, Dict, Set, Optional, Union
+from dataclasses import dataclass
+
+@dataclass
+class FileCoverage:
+    """Line coverage for a single source file"""
+    file_path: str
+    executed: int
+    executable: int
+    missing: List[int]
+
+    @property
+    def percent(self) -> float:
+        return (self.executed / self.executable * 100) if self.executable > 0 else 100.0
+
+@dataclass
+class CoverageReport:
+    """Line coverage collected while running code under the tracer"""
+    files: Dict[str, FileCoverage]
+    coverage: float
+    elapsed: float  # Wall time spent with tracing enabled
+    backend: str  # 'monitoring' or 'settrace'
+    tests_run: int = 0
+
+def executable_lines(source: str, filename: str = '<unknown>') -> Set[int]:
+    """Return the line numbers the compiler emits code for"""
+    lines = set()
+    stack = [compile(source, filename, 'exec', dont_inherit=True)]
+    while stack:
+        code = stack.pop()
+        for _, _, line in code.co_lines():
+            if line is not None and line > 0:
+                lines.add(line)
+        for const in code.co_consts:
+            if hasattr(const, 'co_lines'):
+                stack.append(const)
+    return lines
+
+class CoverageTracer:
+    """Records executed lines of workspace files into per-file bitsets.
+
+    On Python 3.12+ this uses sys.monitoring LINE events and disables each
+    location after its first hit, so steady-state overhead is close to zero.
+    Older interpreters, and runs where another tool such as coverage.py
+    already holds the coverage tool ID, fall back to sys.settrace with a
+    per-frame filter that only installs the line tracer for frames executing
+    workspace files.
+    """
+
+    def __init__(self, workspace_root: Union[str, Path], exclude: Optional[List[Union[str, Path]]] = None):
+        self.workspace_root = Path(workspace_root).resolve()
+        self._prefix = str(self.workspace_root) + os.sep
+        self._exclude = {str(Path(p).resolve()) for p in (exclude or [])}
+        self._bitsets: Dict[str, bytearray] = {}
+        self._file_filter: Dict[str, Optional[str]] = {}  # co_filename -> resolved path
+        self._active = False
+        self._previous_trace = None
+        self._previous_thread_trace = None
+        self._started = 0.0
+        self.elapsed = 0.0
+        self.backend = 'monitoring' if hasattr(sys, 'monitoring') else 'settrace'
+
+    def _traced_path(self, filename: str) -> Optional[str]:
+        """Map a code filename to its resolved path, or None if not traced"""
+        try:
+            return self._file_filter[filename]
+        except KeyError:
+            path = os.path.realpath(filename)
+            if not (path.startswith(self._prefix) and path.endswith('.py')) or path in self._exclude:
+                path = None
+            self._file_filter[filename] = path
+            return path
+
+    def _record(self, path: str, line: int):
+        """Set the bit for a line in the file's bitset"""
+        bits = self._bitsets.get(path)
+        byte = line >> 3
+        if bits is None:
+            bits = self._bitsets[path] = bytearray(byte + 64)
+        elif byte >= len(bits):
+            bits.extend(bytes(byte - len(bits) + 64))
+        bits[byte] |= 1 << (line & 7)
+
+    def start(self):
+        """Begin recording executed lines"""
+        if self._active:
+            raise RuntimeError("Coverage tracer is already running")
+        if self.backend == 'monitoring':
+            monitoring = sys.monitoring
+            tool_id = monitoring.COVERAGE_ID
+            try:
+                monitoring.use_tool_id(tool_id, 'ai_toolkit.coverage')
+            except ValueError:
+                self.backend = 'settrace'  # Tool ID held by another coverage tool
+        if self.backend == 'monitoring':
+            monitoring.register_callback(tool_id, monitoring.events.LINE, self._monitor_line)
+            monitoring.set_events(tool_id, monitoring.events.LINE)
+        else:
+            self._previous_trace = sys.gettrace()
+            self._previous_thread_trace = threading.gettrace()
+            threading.settrace(self._global_trace)
+            sys.settrace(self._global_trace)
+        self._active = True
+        self._started = time.perf_counter()
+
+    def stop(self):
+        """Stop recording executed lines"""
+        if not self._active:
+            return
+        if self.backend == 'monitoring':
+            monitoring = sys.monitoring
+            tool_id = monitoring.COVERAGE_ID
+            monitoring.set_events(tool_id, 0)
+            monitoring.register_callback(tool_id, monitoring.events.LINE, None)
+            # Not restart_events(): it is interpreter-wide and would re-enable
+            # locations disabled by other tools such as debuggers or profilers
+            monitoring.free_tool_id(tool_id)
+        else:
+            sys.settrace(self._previous_trace)
+            threading.settrace(self._previous_thread_trace)
+        self.elapsed += time.perf_counter() - self._started
+        self._active = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def _monitor_line(self, code, line):
+        path = self._traced_path(code.co_filename)
+        if path is not None:
+            self._record(path, line)
+        return sys.monitoring.DISABLE
+
+    def _global_trace(self, frame, event, arg):
+        if event == 'call' and self._traced_path(frame.f_code.co_filename) is not None:
+            return self._local_trace
+        return None
+
+    def _local_trace(self, frame, event, arg):
+        if event == 'line':
+            self._record(self._file_filter[frame.f_code.co_filename], frame.f_lineno)
+        return self._local_trace
+
+    def executed_lines(self, path: str) -> Set[int]:
+        """Return the executed lines recorded for a resolved file path"""
+        bits = self._bitsets.get(path)
+        if bits is None:
+            return set()
+        lines = set()
+        for byte_index, byte in enumerate(bits):
+            while byte:
+                low = byte & -byte
+                lines.add((byte_index << 3) + low.bit_length() - 1)
+                byte ^= low
+        return lines
+
+    def report(self) -> CoverageReport:
+        """Build a coverage report for every traced workspace file"""
+        files = {}
+        total_executed = total_executable = 0
+        for path in self._bitsets:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+                executable = executable_lines(source, path)
+            except (OSError, SyntaxError, ValueError):
+                continue
+            executed = self.executed_lines(path) & executable
+            rel_path = Path(path).relative_to(self.workspace_root).as_posix()
+            files[rel_path] = FileCoverage(
+                file_path=rel_path,
+                executed=len(executed),
+                executable=len(executable),
+                missing=sorted(executable - executed)
+            )
+            total_executed += len(executed)
+            total_executable += len(executable)
+
+        return CoverageReport(
+            files=dict(sorted(files.items())),
+            coverage=(total_executed / total_executable * 100) if total_executable > 0 else 0,
+            elapsed=self.elapsed,
+            backend=self.backend
+        )
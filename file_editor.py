@@ -3,7 +3,7 @@
 
 import os
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple, Union
 import difflib
 
@@ -17,6 +17,18 @@ class EditRegion:
     context_before: str = ""  # Lines before for context
     context_after: str = ""   # Lines after for context
 
+@dataclass(frozen=True)
+class LineChange:
+    """Lines replaced by an applied edit, in the file's original line numbers"""
+    start_line: int  # 1-indexed first replaced line
+    end_line: int    # 1-indexed last replaced line; start_line - 1 for a pure insertion
+    new_line_count: int  # Number of lines that replaced them
+    
+    @property
+    def delta(self) -> int:
+        """Change in the file's line count caused by this edit"""
+        return self.new_line_count - (self.end_line - self.start_line + 1)
+
 @dataclass
 class EditResult:
     """Result of an edit operation"""
@@ -25,6 +37,7 @@ class EditResult:
     diff: str
     applied_edits: List[EditRegion]
     failed_edits: List[EditRegion]
+    changes: List[LineChange] = field(default_factory=list)  # Edited line ranges, top to bottom
 
 class FileEditor:
     """Advanced file editor with support for multi-point edits"""
@@ -105,12 +118,16 @@ class FileEditor:
         # Apply edits
         applied = []
         failed = []
+        changes = []
         for edit in edits:
             try:
                 # Replace the lines
                 new_lines = edit.new_content.splitlines(keepends=True)
+                if new_lines and not new_lines[-1].endswith('\n') and edit.end_line < len(lines):
+                    new_lines[-1] += '\n'  # Don't join the last new line with the following one
                 lines[edit.start_line-1:edit.end_line] = new_lines
                 applied.append(edit)
+                changes.append(LineChange(edit.start_line, edit.end_line, len(new_lines)))
             except Exception as e:
                 failed.append(edit)
                 return EditResult(
@@ -140,7 +157,8 @@ class FileEditor:
             "All edits applied successfully",
             diff,
             applied,
-            failed
+            failed,
+            changes[::-1]
         )
         
     def create_file(self, file_path: str, content: str) -> bool:
@@ -0,0 +1,435 @@
+# AI Toolkit - Language Backends
+# Per-extension analyzers producing CodeSymbol/CodeContext for non-Python sources
+
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from .code_analyzer import CodeAnalyzer, CodeContext, CodeSymbol
+from .parse_utils import ParseDiagnostic, parse_source
+
+class LanguageBackend(ABC):
+    """Analyzes the source of one language into a CodeContext.
+
+    Subclasses set `name` and `extensions` and must implement analyze(), so
+    an incomplete backend cannot be instantiated. Register an instance with
+    register_backend(); CodeAnalyzer and ToolkitIndexer then dispatch files
+    to it by extension. Register at import time so process pool workers
+    started with 'spawn' see the same registry.
+    """
+
+    name = ''
+    extensions: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def analyze(self, source: str, file_path: str, tolerant: bool = False) -> CodeContext:
+        """Analyze source text.
+
+        Args:
+            source: File contents
+            file_path: Path stored in the returned context
+            tolerant: Report problems in CodeContext.diagnostics instead of
+                     raising SyntaxError
+        """
+
+class PythonBackend(LanguageBackend):
+    """Python via the ast module (see CodeAnalyzer)"""
+
+    name = 'python'
+    extensions = ('.py',)
+
+    def analyze(self, source: str, file_path: str, tolerant: bool = False) -> CodeContext:
+        tree, diagnostics = parse_source(source, str(file_path), tolerant)
+        context = CodeAnalyzer._context_from_tree(tree, file_path)
+        context.diagnostics = diagnostics
+        return context
+
+_TOKEN = re.compile(r'''
+      (?P<newline>\n)
+    | (?P<space>[ \t\r\f\v]+)
+    | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<include>\#[ \t]*(?:include|import)[^\n]*)
+    | (?P<string>"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?|`(?:\\.|[^`\\])*`?)
+    | (?P<name>[A-Za-z_$][\w$]*)
+    | (?P<number>\d[\w.]*)
+    | (?P<op>=>|::|->|[^\s\w])
+''', re.VERBOSE | re.DOTALL)
+_REGEX_LITERAL = re.compile(r'/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\[\n])+/[A-Za-z]*')
+
+# Tokens after which '/' starts a regular expression literal rather than a division
+_REGEX_PREFIX = frozenset('( , = : [ ! & | ? { ; + - * % < > ~ ^ => return typeof case'.split())
+# A line ending in one of these continues on the next line
+_CONTINUATION = frozenset('( [ , = . : :: -> => + - * / % & | ^ < > ? ! ~ extends implements'.split())
+# A line starting with one of these continues the declaration on the line before
+_HEADER_CONTINUATION = frozenset(('extends', 'implements', 'where', 'throws', ':', '->'))
+# A '{' after one of these opens an expression (object literal, initializer) rather than a block
+_EXPRESSION = frozenset('= : , ( [ ? ! & | return :: . export default'.split())
+
+_CLASS_KEYWORDS = frozenset(('class', 'struct', 'interface', 'enum', 'trait', 'union'))
+_FUNCTION_KEYWORDS = frozenset(('function', 'func', 'fn', 'fun', 'def'))
+_NAMESPACE_KEYWORDS = frozenset(('namespace', 'extern', 'module', 'package'))
+_KEYWORDS = frozenset('''
+    abstract as async await break case catch class const continue default defer
+    delete do else enum export extends extern final finally for fun func function
+    go if impl implements import in instanceof interface internal let match module
+    namespace new override package private protected public readonly return select
+    sizeof static struct super switch synchronized this throw throws trait try type
+    typeof union unsafe use using var virtual void when where while with yield
+'''.split())
+
+def _is_name(value: str) -> bool:
+    return bool(value) and (value[0].isalpha() or value[0] in '_$')
+
+def _clean_comment(text: str) -> str:
+    """Strip comment markers, e.g. from a JSDoc block, leaving the prose."""
+    if text.startswith('/*'):
+        text = text[2:-2] if text.endswith('*/') else text[2:]
+        lines = [line.strip().lstrip('*').strip() for line in text.strip('*').splitlines()]
+    else:
+        lines = [line.strip()[2:].lstrip('/').strip() for line in text.splitlines()]
+    return '\n'.join(lines).strip()
+
+def _matching_paren(values: List[str], start: int) -> int:
+    """Index of the ')' closing the '(' at start, or len(values)."""
+    depth = 0
+    for i in range(start, len(values)):
+        if values[i] == '(':
+            depth += 1
+        elif values[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return len(values)
+
+def _declaration(values: List[str]) -> Optional[Tuple[str, str, Optional[str], List[str]]]:
+    """Classify the header of a '{' block.
+
+    Returns:
+        (type, name, owner, bases) for a class-like or function declaration,
+        ('namespace', '', None, []) for a block whose contents are still top
+        level, or None for any other block
+    """
+    n = len(values)
+    for i, value in enumerate(values):
+        if value in _CLASS_KEYWORDS:
+            if i >= 2 and values[i - 2] == 'type' and _is_name(values[i - 1]):
+                return 'class', values[i - 1], None, []  # Go: type Name struct {
+            if i + 1 < n and _is_name(values[i + 1]) and values[i + 1] not in _KEYWORDS:
+                bases = [v for v in values[i + 2:] if _is_name(v) and v not in _KEYWORDS]
+                return 'class', values[i + 1], None, bases
+            if '=' in values[:i] and _is_name(values[values.index('=') - 1]):
+                return 'class', values[values.index('=') - 1], None, []
+            return None
+        if value == 'impl':  # Rust: impl Type / impl Trait for Type
+            rest = values[i + 1:]
+            target = rest[rest.index('for') + 1:] if 'for' in rest else rest
+            names = [v for v in target if _is_name(v) and v not in _KEYWORDS]
+            return ('class', names[0], None, []) if names else None
+        if value in _FUNCTION_KEYWORDS:
+            j, owner = i + 1, None
+            if j < n and values[j] == '*':
+                j += 1
+            if value == 'func' and j < n and values[j] == '(':  # Go method receiver
+                end = _matching_paren(values, j)
+                receiver = [v for v in values[j + 1:end] if _is_name(v)]
+                owner = receiver[-1] if receiver else None
+                j = end + 1
+            if j < n and _is_name(values[j]) and values[j] not in _KEYWORDS:
+                return 'function', values[j], owner, []
+            if '=' in values[:i] and _is_name(values[values.index('=') - 1]):
+                return 'function', values[values.index('=') - 1], None, []
+            return None
+        if value in _NAMESPACE_KEYWORDS and '(' not in values:
+            return 'namespace', '', None, []
+
+    if '=>' in values and '=' in values:
+        eq = values.index('=')
+        if eq > 0 and _is_name(values[eq - 1]) and values[eq - 1] not in _KEYWORDS:
+            return 'function', values[eq - 1], None, []  # const name = (...) => {
+        return None
+
+    # Call-shaped header: [modifiers] [type] name(...) [return type] {
+    if '(' not in values:
+        return None
+    p = values.index('(')
+    if p == 0 or '=' in values[:p] or '=' in values[_matching_paren(values, p):]:
+        return None
+    name = values[p - 1]
+    if not _is_name(name) or name in _KEYWORDS:
+        return None
+    before = values[p - 2] if p >= 2 else None
+    if before in ('.', 'new'):
+        return None
+    owner = values[p - 3] if before == '::' and p >= 3 and _is_name(values[p - 3]) else None
+    return 'function', name, owner, []
+
+class _Block:
+    """An open '{' and the declaration it belongs to, if any"""
+
+    __slots__ = ('kind', 'name', 'line', 'docstring', 'deps', 'refs', 'parent',
+                 'header', 'paren', 'expression')
+
+    def __init__(self, kind: Optional[str], name: str, line: int, header: list, paren: int, expression: bool):
+        self.kind = kind
+        self.name = name
+        self.line = line
+        self.docstring = None
+        self.deps: Set[str] = set()
+        self.refs: Set[str] = set()
+        self.parent: Optional[str] = None
+        self.header = header  # Enclosing statement's header, restored after an expression block
+        self.paren = paren
+        self.expression = expression
+
+class BraceBackend(LanguageBackend):
+    """Brace-delimited languages (JavaScript/TypeScript, Go, Java, C-family, Rust...).
+
+    A single linear token scan tracks brace depth and the header of the
+    statement each '{' opens, recognizing class-like declarations
+    (class/struct/interface/enum/trait, Go 'type X struct', Rust 'impl'),
+    functions (function/func/fn/fun/def keywords, arrow functions assigned
+    to a name, C-style 'type name(args) {') and imports (import/use
+    statements, require() calls, #include). Top-level declarations and the
+    members of classes are recorded; code inside function bodies only
+    contributes dependencies. It is a heuristic: nothing is type-checked and
+    macros or unusual syntax may hide a declaration, but the scan never
+    fails on input it does not understand.
+    """
+
+    name = 'brace'
+    extensions = ('.js', '.jsx', '.mjs', '.cjs', '.ts', '.tsx', '.go', '.java', '.kt',
+                  '.c', '.h', '.cc', '.cpp', '.hpp', '.cs', '.rs', '.swift', '.scala')
+
+    def analyze(self, source: str, file_path: str, tolerant: bool = False) -> CodeContext:
+        symbols: Dict[str, CodeSymbol] = {}
+        imports: List[str] = []
+        import_lines: List[int] = []
+        diagnostics: List[ParseDiagnostic] = []
+        blocks: List[_Block] = []
+        header: List[Tuple[str, int]] = []  # (token, line) of the current statement
+        previous_header: List[Tuple[str, int]] = []  # Statement ended by the last newline, for braces on their own line
+        paren = 0
+        line = 1
+        last = None  # Last significant token
+        chain = None  # Dotted name being read, e.g. 'this.items.push'
+        comment: Optional[Tuple[str, int, int]] = None  # (text, first line, last line) of the latest comment
+        file_docstring = None
+        seen_code = False
+
+        def end_statement():
+            """Record an import if the finished statement is one."""
+            if not header:
+                return
+            values = [v for v, _ in header]
+            first = values[0]
+            modules = []
+            if first == 'import' or (first == 'export' and 'from' in values):
+                modules = [v[1:-1] for v in values if v[0] in '"\'`']
+                if not modules and first == 'import':
+                    modules = [''.join(v for v in values[1:] if v not in ('static', ';'))]
+            elif first == 'use':
+                modules = [''.join(values[1:]).rstrip(':;')]
+            elif 'require' in values:
+                i = values.index('require')
+                if values[i + 1:i + 2] == ['('] and values[i + 2:i + 3] and values[i + 2][0] in '"\'`':
+                    modules = [values[i + 2][1:-1]]
+            for module in modules:
+                if module:
+                    imports.append(module)
+                    import_lines.append(header[0][1])
+
+        def open_scope() -> Optional[_Block]:
+            """Innermost enclosing function, unless a class is nearer.
+
+            As in the Python analyzer, a class depends only on its bases;
+            names used in its body but outside its methods are not recorded.
+            """
+            for block in reversed(blocks):
+                if block.kind in ('class', 'function'):
+                    return block if block.kind == 'function' else None
+            return None
+
+        pos, size = 0, len(source)
+        match_token = _TOKEN.match
+        while pos < size:
+            if source[pos] == '/' and (last is None or last in _REGEX_PREFIX):
+                m = _REGEX_LITERAL.match(source, pos) if source[pos + 1:pos + 2] not in ('/', '*') else None
+                if m is not None:
+                    header.append((m.group(), line))
+                    last, chain, pos = 'regex', None, m.end()
+                    continue
+            m = match_token(source, pos)
+            kind, value = m.lastgroup, m.group()
+            pos = m.end()
+
+            if kind == 'newline':
+                line += 1
+                if header and paren == 0 and header[-1][0] not in _CONTINUATION:
+                    end_statement()
+                    previous_header, header = header, []
+                continue
+            if kind == 'space':
+                continue
+            if kind == 'comment':
+                end = line + value.count('\n')
+                if comment is not None and comment[2] == line - 1 and value.startswith('//') and comment[0].startswith('//'):
+                    comment = (comment[0] + '\n' + value, comment[1], end)
+                else:
+                    comment = (value, line, end)
+                if not seen_code and file_docstring is None and value.startswith('/*'):
+                    file_docstring = _clean_comment(value) or None
+                line = end
+                continue
+            if kind == 'include':
+                target = re.search(r'[<"]([^>"]+)[>"]', value)
+                if target:
+                    imports.append(target.group(1))
+                    import_lines.append(line)
+                continue
+
+            seen_code = True
+            if kind == 'string' or kind == 'number':
+                line += value.count('\n')
+                header.append((value, line))
+                last, chain = kind, None
+                continue
+
+            if kind == 'name':
+                scope = open_scope()
+                if last == '.':
+                    # A member: extends a dotted name, but is not a dependency itself
+                    if chain is not None:
+                        chain += '.' + value
+                        if scope is not None:
+                            scope.refs.add(chain)
+                else:
+                    # 'this' plays the role of Python's 'self' for member resolution
+                    chain = 'self' if value == 'this' else value
+                    if scope is not None and value not in _KEYWORDS:
+                        scope.deps.add(value)
+                        scope.refs.add(value)
+                header.append((value, line))
+                last = value
+                continue
+
+            # Operators and punctuation
+            if value != '.':
+                chain = None
+            if value in ('(', '['):
+                paren += 1
+            elif value in (')', ']'):
+                paren = max(paren - 1, 0)
+            elif value == ';' and paren == 0:
+                end_statement()
+                header, previous_header = [], []
+                last = value
+                continue
+            elif value == '{':
+                if previous_header and (not header or header[0][0] in _HEADER_CONTINUATION):
+                    header = previous_header + header  # Brace or 'extends ...' on the line after the name
+                values = [v for v, _ in header]
+                expression = paren > 0 or bool(values) and (values[-1] in _EXPRESSION or values[0] in ('import', 'use'))
+                declared = None
+                enclosing = blocks[-1] if blocks else None
+                at_top = all(b.kind == 'namespace' for b in blocks) or (
+                    enclosing is not None and enclosing.kind == 'class')
+                if not expression and at_top and values:
+                    declared = _declaration(values)
+                block = _Block(None, '', line, header, paren, expression)
+                if declared is not None:
+                    kind_, name, owner, bases = declared
+                    block.kind = kind_
+                    if kind_ != 'namespace':
+                        start = header[0][1]
+                        if enclosing is not None and enclosing.kind == 'class':
+                            block.parent = enclosing.name
+                        elif owner is not None:
+                            block.parent = owner
+                        block.name = f"{block.parent}.{name}" if block.parent else name
+                        block.line = start
+                        if comment is not None and comment[2] in (start - 1, start):
+                            block.docstring = _clean_comment(comment[0]) or None
+                        block.deps.update(bases)
+                        block.refs.update(bases)
+                blocks.append(block)
+                header, previous_header, paren = [], [], 0
+                last = value
+                continue
+            elif value == '}':
+                if not blocks:
+                    if not tolerant:
+                        raise SyntaxError("unmatched '}'", (str(file_path), line, 1, None))
+                    diagnostics.append(ParseDiagnostic("unmatched '}'", line, line, line))
+                    last = value
+                    continue
+                block = blocks.pop()
+                self._close(block, line, symbols, open_scope())
+                if block.expression:
+                    header, paren = block.header, block.paren
+                    header.append(('}', line))
+                else:
+                    end_statement()
+                    header, paren = [], 0
+                previous_header = []
+                last = value
+                continue
+            header.append((value, line))
+            last = value
+
+        end_statement()
+        if blocks:
+            first = blocks[0]
+            message = "'{' was never closed"
+            if not tolerant:
+                raise SyntaxError(message, (str(file_path), first.line, 1, None))
+            diagnostics.append(ParseDiagnostic(message, first.line, first.line, line))
+            while blocks:
+                block = blocks.pop()
+                self._close(block, line, symbols, open_scope())
+
+        return CodeContext(
+            symbols=symbols,
+            imports=imports,
+            scope_stack=[],
+            docstring=file_docstring,
+            file_path=file_path,
+            import_lines=import_lines,
+            diagnostics=diagnostics
+        )
+
+    @staticmethod
+    def _close(block: _Block, line: int, symbols: Dict[str, CodeSymbol], scope: Optional[_Block]):
+        """Record a closed declaration and pass its names up to the enclosing one."""
+        if block.kind in ('class', 'function'):
+            symbols[block.name] = CodeSymbol(
+                name=block.name,
+                type=block.kind,
+                line_number=block.line,
+                end_line=line,
+                docstring=block.docstring,
+                parent=block.parent,
+                dependencies=frozenset(block.deps),
+                references=frozenset(block.refs)
+            )
+        if scope is not None and scope is not block:
+            scope.deps |= block.deps
+            scope.refs |= block.refs
+
+_BACKENDS: Dict[str, LanguageBackend] = {}
+
+def register_backend(backend: LanguageBackend, extensions: Optional[Iterable[str]] = None):
+    """Register a backend for its extensions (or the given ones), replacing earlier registrations."""
+    for extension in extensions if extensions is not None else backend.extensions:
+        _BACKENDS[extension.lower()] = backend
+
+def get_backend(file_path: Union[str, os.PathLike]) -> Optional[LanguageBackend]:
+    """Return the backend registered for a file's extension, or None."""
+    return _BACKENDS.get(os.path.splitext(file_path)[1].lower())
+
+def source_suffixes() -> Tuple[str, ...]:
+    """File suffixes that have a registered backend."""
+    return tuple(sorted(_BACKENDS))
+
+register_backend(PythonBackend())
+register_backend(BraceBackend())
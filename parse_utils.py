@@ -0,0 +1,185 @@
+# AI Toolkit - Parse Utils
+# Error-tolerant parsing of Python source that is mid-edit
+
+import ast
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+# Column-0 lines that continue the previous statement rather than start one
+_CONTINUATION = re.compile(r'(else|elif|except|finally|case)\b|[)\]}]')
+_NESTED_DEF = re.compile(r'([ \t]+)(async[ \t]+)?def[ \t]')
+# "expected an indented block after function definition on line 4" is
+# reported at the next statement; the block at fault is the one referenced
+_REFERENCED_LINE = re.compile(r'\bon line (\d+)')
+
+@dataclass(frozen=True)
+class ParseDiagnostic:
+    """A syntax error and the source lines skipped because of it"""
+    message: str
+    line: int        # Line reported by the parser (1-indexed)
+    start_line: int  # First skipped line
+    end_line: int    # Last skipped line
+
+    def __str__(self) -> str:
+        return f"line {self.line}: {self.message} (skipped lines {self.start_line}-{self.end_line})"
+
+@dataclass
+class TolerantParse:
+    """Result of parse_tolerant"""
+    tree: ast.Module
+    diagnostics: List[ParseDiagnostic] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if the source parsed without skipping anything."""
+        return not self.diagnostics
+
+def _starts_statement(line: str) -> bool:
+    """Check whether a line begins a new top-level statement."""
+    if not line or line[0] in ' \t\r\n#':
+        return False
+    return not _CONTINUATION.match(line)
+
+def _block_bounds(lines: List[str], line: int) -> Tuple[int, int]:
+    """Find the top-level block (1-indexed, inclusive) containing a line.
+
+    A block runs from the nearest column-0 statement at or above the line,
+    including any decorators above it, to the line before the next one.
+    """
+    index = min(max(line, 1), len(lines)) - 1
+    # Errors reported on a blank line (e.g. at end of file) belong to the code above
+    while index > 0 and not lines[index].strip():
+        index -= 1
+    start = index
+    while start > 0 and not _starts_statement(lines[start]):
+        start -= 1
+    while start > 0 and lines[start - 1].startswith('@'):
+        start -= 1
+    end = index + 1
+    while end < len(lines) and not _starts_statement(lines[end]):
+        end += 1
+    return start + 1, end
+
+def _error_line(lines: List[str], line: int, message: str) -> int:
+    """Return the line of the block a syntax error should skip.
+
+    Errors about a missing indented block are reported at the statement
+    after the empty header; they belong to the header, which the message
+    names ('on line N') or which is the last non-blank line above.
+    """
+    match = _REFERENCED_LINE.search(message)
+    if match and int(match.group(1)) <= line:
+        return int(match.group(1))
+    if message.startswith('expected an indented block'):
+        index = min(line, len(lines)) - 1
+        if 0 < index and lines[index].strip():
+            index -= 1
+            while index > 0 and not lines[index].strip():
+                index -= 1
+            return index + 1
+    return line
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(' \t'))
+
+def _nested_def_bounds(lines: List[str], line: int) -> Optional[Tuple[int, int, str]]:
+    """Find an indented function (e.g. a method) containing a line.
+
+    Returns:
+        (start, end, indentation) with 1-indexed inclusive lines, or None
+        if the line is not inside an indented def
+    """
+    index = min(max(line, 1), len(lines)) - 1
+    while index > 0 and not lines[index].strip():
+        index -= 1
+    for start in range(index, -1, -1):
+        text = lines[start]
+        if _starts_statement(text):
+            return None
+        match = _NESTED_DEF.match(text)
+        if match:
+            break
+    else:
+        return None
+    indent = match.group(1)
+    if any(l.strip() and _indent(l) <= len(indent) for l in lines[start + 1:index + 1]):
+        return None  # The def ended before the error line
+    while start > 0 and lines[start - 1].startswith(indent + '@'):
+        start -= 1
+    end = index + 1
+    while end < len(lines) and (not lines[end].strip() or _indent(lines[end]) > len(indent)):
+        end += 1
+    while end - 1 > index and not lines[end - 1].strip():
+        end -= 1
+    return start + 1, end, indent
+
+def parse_tolerant(source: Union[str, bytes], filename: str = '<unknown>',
+                   max_errors: int = 20) -> TolerantParse:
+    """Parse Python source, skipping the top-level blocks that fail to parse.
+
+    Each syntax error blanks the top-level statement containing it (keeping
+    line numbers intact) and the parse is retried, so the valid code around
+    a broken block is still analyzed. An error inside a method first skips
+    just that method, so the rest of its class survives.
+
+    Args:
+        source: Python source; bytes are decoded as UTF-8 with replacement
+        filename: Name used in diagnostics from the parser
+        max_errors: Give up and return an empty module after this many errors
+
+    Returns:
+        TolerantParse with the tree of the valid code and one diagnostic
+        per skipped block
+    """
+    if isinstance(source, bytes):
+        source = source.decode('utf-8', errors='replace')
+    try:
+        return TolerantParse(ast.parse(source, filename))
+    except (SyntaxError, ValueError) as e:
+        error = e
+
+    lines = source.splitlines(keepends=True)
+    diagnostics = []
+    stubbed = set()  # Lines of methods already replaced by 'pass'
+    while True:
+        line = getattr(error, 'lineno', None) or 1
+        message = getattr(error, 'msg', None) or str(error)
+        if len(diagnostics) >= max_errors or not lines:
+            diagnostics.append(ParseDiagnostic(message, line, 1, len(lines)))
+            return TolerantParse(ast.Module(body=[], type_ignores=[]), diagnostics)
+
+        target = _error_line(lines, line, message)
+        nested = _nested_def_bounds(lines, target) if target not in stubbed else None
+        if nested is not None:
+            # Replace just the method with 'pass' so its class stays valid
+            start, end, indent = nested
+            diagnostics.append(ParseDiagnostic(message, line, start, end))
+            for i in range(start - 1, end):
+                lines[i] = '\n'
+                stubbed.add(i + 1)
+            lines[start - 1] = indent + 'pass\n'
+        else:
+            start, end = _block_bounds(lines, target)
+            if not any(l.strip() for l in lines[start - 1:end]):
+                # Nothing left to skip here; drop everything from the error on
+                start, end = min(target, len(lines)), len(lines)
+            diagnostics.append(ParseDiagnostic(message, line, start, end))
+            for i in range(start - 1, end):
+                lines[i] = '\n'
+        try:
+            return TolerantParse(ast.parse(''.join(lines), filename), diagnostics)
+        except (SyntaxError, ValueError) as e:
+            error = e
+
+def parse_source(source: Union[str, bytes], filename: str = '<unknown>',
+                 tolerant: bool = False) -> Tuple[ast.Module, List[ParseDiagnostic]]:
+    """Parse source strictly (raising SyntaxError) or tolerantly.
+
+    Returns:
+        (tree, diagnostics); diagnostics is always empty in strict mode
+    """
+    if not tolerant:
+        return ast.parse(source, filename), []
+    result = parse_tolerant(source, filename)
+    return result.tree, result.diagnostics
@@ -0,0 +1,162 @@
+# AI Toolkit - Symbol Store
+# Compact storage for code symbols across large workspaces
+
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from .code_analyzer import CodeContext, CodeSymbol
+
+class StringTable:
+    """Interned strings addressed by integer ID"""
+
+    __slots__ = ('_ids', '_strings')
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def id(self, text: str) -> int:
+        """Return the ID of a string, adding it to the table if needed."""
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            text = sys.intern(text)
+            self._strings.append(text)
+            self._ids[text] = string_id
+        return string_id
+
+    def intern(self, text: Optional[str]) -> Optional[str]:
+        """Return the table's copy of a string, so equal names share one object."""
+        if text is None:
+            return None
+        return self._strings[self.id(text)]
+
+    def __getitem__(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+class _FileSymbols:
+    """Storage shared by the symbols of one file: a dependency ID array"""
+
+    __slots__ = ('ids', 'table')
+
+    def __init__(self, table: StringTable):
+        self.ids = array('I')
+        self.table = table
+
+class CompactSymbol:
+    """Memory-compact stand-in for CodeSymbol.
+
+    Dependencies and references are kept as integer IDs in an array shared
+    by all symbols of the file and decoded on access; the docstring is kept
+    as a string table ID, so it is the one analyzed whatever the language
+    and however the file changed since. Attribute names and types match
+    CodeSymbol, and to_symbol() converts to one.
+    """
+
+    __slots__ = ('name', 'type', 'line_number', 'end_line', 'parent',
+                 '_file', '_doc', '_deps_start', '_refs_start', '_refs_end')
+
+    def __init__(self, file: _FileSymbols, symbol: CodeSymbol):
+        table = file.table
+        self.name = table.intern(symbol.name)
+        self.type = table.intern(symbol.type)
+        self.line_number = symbol.line_number
+        self.end_line = symbol.end_line
+        self.parent = table.intern(symbol.parent)
+        self._file = file
+        self._doc = table.id(symbol.docstring) if symbol.docstring is not None else None
+        ids = file.ids
+        self._deps_start = len(ids)
+        ids.extend(table.id(name) for name in symbol.dependencies)
+        self._refs_start = len(ids)
+        ids.extend(table.id(name) for name in symbol.references)
+        self._refs_end = len(ids)
+
+    def __repr__(self) -> str:
+        return f"CompactSymbol(name={self.name!r}, type={self.type!r}, lines={self.line_number}-{self.end_line})"
+
+    def _decode(self, start: int, end: int) -> frozenset:
+        table = self._file.table
+        return frozenset(table[i] for i in self._file.ids[start:end])
+
+    @property
+    def dependencies(self) -> frozenset:
+        return self._decode(self._deps_start, self._refs_start)
+
+    @property
+    def references(self) -> frozenset:
+        return self._decode(self._refs_start, self._refs_end)
+
+    @property
+    def docstring(self) -> Optional[str]:
+        if self._doc is None:
+            return None
+        return self._file.table[self._doc]
+
+    def shifted(self, delta: int) -> 'CompactSymbol':
+        """Return a copy moved down by delta lines, sharing this symbol's storage."""
+        copy = object.__new__(CompactSymbol)
+        for slot in CompactSymbol.__slots__:
+            setattr(copy, slot, getattr(self, slot))
+        copy.line_number += delta
+        copy.end_line += delta
+        return copy
+
+    def to_symbol(self) -> CodeSymbol:
+        """Convert to a regular CodeSymbol."""
+        return CodeSymbol(
+            name=self.name,
+            type=self.type,
+            line_number=self.line_number,
+            end_line=self.end_line,
+            docstring=self.docstring,
+            parent=self.parent,
+            dependencies=self.dependencies,
+            references=self.references
+        )
+
+class SymbolStore:
+    """Compact symbol storage shared across a workspace.
+
+    All names, types, imports, docstrings and dependency strings go through
+    one string table, so each distinct string is stored once however many
+    files use it.
+    The table only grows; call clear() to release strings of files that were
+    re-analyzed or removed.
+    """
+
+    def __init__(self, workspace_root: Union[str, Path]):
+        self.workspace_root = Path(workspace_root)
+        self.strings = StringTable()
+
+    def clear(self):
+        """Drop the string table; symbols compacted earlier stay valid."""
+        self.strings = StringTable()
+
+    def compact_symbols(self, file_path: str, symbols: Iterable[CodeSymbol]) -> Dict[str, CompactSymbol]:
+        """Convert a file's symbols, keyed by qualified name."""
+        file = _FileSymbols(self.strings)
+        compacted = {}
+        for symbol in symbols:
+            compact = CompactSymbol(file, symbol)
+            compacted[compact.name] = compact
+        return compacted
+
+    def compact_context(self, context: CodeContext) -> CodeContext:
+        """Return a CodeContext holding compact symbols and interned strings."""
+        intern = self.strings.intern
+        return CodeContext(
+            symbols=self.compact_symbols(context.file_path, context.symbols.values()),
+            imports=[intern(name) for name in context.imports],
+            scope_stack=[intern(name) for name in context.scope_stack],
+            docstring=context.docstring,
+            file_path=context.file_path,
+            import_map={intern(k): intern(v) for k, v in context.import_map.items()},
+            import_lines=context.import_lines,
+            diagnostics=context.diagnostics
+        )
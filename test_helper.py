@@ -2,11 +2,29 @@
 # Assists in test creation and validation
 
 import ast
+import os
+import io
+import sys
+import hashlib
+import importlib.util
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from typing import List, Dict, Set, Optional, Union, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 import inspect
 import re
+import fnmatch
+
+from .coverage_tracer import CoverageTracer, CoverageReport
+from .parse_utils import parse_source
+
+# Below this many uncached files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 32
+
+# Directories never searched for test files
+SKIP_DIRS = {'__pycache__', '.git', '.venv', 'venv', 'node_modules', '.tox', '.nox'}
 
 @dataclass
 class TestCase:
@@ -25,107 +43,320 @@ class TestAnalysis:
     missing_assertions: List[str]
     unused_setup: List[str]
     suggestions: List[str]
+    test_count: int = 0
+    tested_count: int = 0
+    assertion_count: int = 0
+    line_coverage: Optional[float] = None  # Real source line coverage, when measured
+    parse_errors: List[str] = field(default_factory=list)  # Blocks skipped in tolerant mode
+
+@dataclass
+class TestSuiteReport:
+    """Aggregated analysis of every test file under a directory"""
+    files: Dict[str, TestAnalysis]
+    coverage: float
+    assertion_density: float  # Assertions per test function
+    unused_setup: Dict[str, List[str]]
+    total_tests: int
+    errors: Dict[str, str] = field(default_factory=dict)  # Files that failed to parse
+
+class TestVisitor(ast.NodeVisitor):
+    """Single-pass visitor collecting test metrics from a test module.
+    
+    Every node is visited exactly once. Test and setUp bodies are tracked with
+    scoped accumulators: an assertion marks all enclosing test functions, so a
+    nested helper counts towards the test that contains it.
+    """
+    
+    def __init__(self):
+        self.total_functions = 0
+        self.tested_functions = 0
+        self.assertions: List[Tuple[str, int]] = []  # (assert method name, line)
+        self.setup_vars: Set[str] = set()
+        self.used_vars: Set[str] = set()
+        self.suggestions: List[str] = []
+        self.has_setup = False
+        self.setup_depth = 0
+        self.test_frames: List[List[bool]] = []  # One [has_assertions] per enclosing test
+        
+    def visit_FunctionDef(self, node):
+        if node.name == 'setUp':
+            self.has_setup = True
+            self.setup_depth += 1
+            self.generic_visit(node)
+            self.setup_depth -= 1
+        elif node.name.startswith('test_'):
+            self.total_functions += 1
+            frame = [False]
+            self.test_frames.append(frame)
+            self.generic_visit(node)
+            self.test_frames.pop()
+            
+            if frame[0]:
+                self.tested_functions += 1
+            else:
+                self.suggestions.append(f"Test function {node.name} has no assertions")
+        else:
+            self.generic_visit(node)
+            
+    def visit_Assign(self, node):
+        if self.setup_depth:
+            for target in node.targets:
+                if isinstance(target, ast.Attribute):
+                    if isinstance(target.value, ast.Name) and target.value.id == 'self':
+                        self.setup_vars.add(target.attr)
+                elif isinstance(target, ast.Name):
+                    self.setup_vars.add(target.id)
+        self.generic_visit(node)
+        
+    def visit_Call(self, node):
+        if self.test_frames and isinstance(node.func, ast.Attribute):
+            if node.func.attr.startswith('assert'):
+                self.assertions.append((node.func.attr, node.lineno))
+                for frame in self.test_frames:
+                    frame[0] = True
+        self.generic_visit(node)
+        
+    def visit_Name(self, node):
+        if self.test_frames and isinstance(node.ctx, ast.Load):
+            self.used_vars.add(node.id)
+            
+    def visit_Attribute(self, node):
+        if self.test_frames and isinstance(node.value, ast.Name) and node.value.id == 'self':
+            self.used_vars.add(node.attr)
+        self.generic_visit(node)
+
+def _analyze_test_source(data: Union[str, bytes], tolerant: bool = False) -> TestAnalysis:
+    """Analyze test source code for completeness and quality"""
+    tree, diagnostics = parse_source(data, tolerant=tolerant)
+    
+    visitor = TestVisitor()
+    visitor.visit(tree)
+    total_functions = visitor.total_functions
+    suggestions = visitor.suggestions
+    
+    # Calculate coverage
+    coverage = (visitor.tested_functions / total_functions * 100) if total_functions > 0 else 0
+    
+    # Find unused setup
+    unused_setup = visitor.setup_vars - visitor.used_vars
+    
+    # Generate additional suggestions
+    if len(visitor.assertions) < total_functions * 2:
+        suggestions.append("Consider adding more assertions per test")
+        
+    if not visitor.has_setup:
+        suggestions.append("Consider adding setUp method for common initialization")
+        
+    if unused_setup:
+        suggestions.append(f"Remove unused setup variables: {', '.join(unused_setup)}")
+        
+    return TestAnalysis(
+        coverage=coverage,
+        missing_assertions=[],  # Would need source code to determine missing assertions
+        unused_setup=list(unused_setup),
+        suggestions=suggestions,
+        test_count=total_functions,
+        tested_count=visitor.tested_functions,
+        assertion_count=len(visitor.assertions),
+        parse_errors=[str(d) for d in diagnostics]
+    )
+
+def _analyze_test_source_safe(data: bytes, tolerant: bool = False) -> Tuple[Optional[TestAnalysis], Optional[str]]:
+    """Pool-friendly wrapper returning (analysis, error) instead of raising"""
+    try:
+        return _analyze_test_source(data, tolerant), None
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        # Deeply nested sources exhaust the parser like a syntax error would
+        return None, f"{type(e).__name__}: {e}"
+
+def _copy_analysis(analysis: TestAnalysis) -> TestAnalysis:
+    """Copy a cached analysis so callers can't mutate the cached lists"""
+    return replace(
+        analysis,
+        missing_assertions=list(analysis.missing_assertions),
+        unused_setup=list(analysis.unused_setup),
+        suggestions=list(analysis.suggestions),
+        parse_errors=list(analysis.parse_errors)
+    )
 
 class TestHelper:
     """Helper for test creation and analysis"""
     
     def __init__(self, workspace_root: Union[str, Path]):
         self.workspace_root = Path(workspace_root)
+        self._analysis_cache: Dict[str, TestAnalysis] = {}  # Content hash -> analysis
+        
+    def analyze_test_file(self, test_file: str, line_coverage: bool = False,
+                          tolerant: bool = False) -> TestAnalysis:
+        """Analyze a test file for completeness and quality.
         
-    def analyze_test_file(self, test_file: str) -> TestAnalysis:
-        """Analyze a test file for completeness and quality"""
+        With line_coverage=True the test file is also executed under the
+        coverage tracer and TestAnalysis.line_coverage holds the real line
+        coverage of the workspace sources it exercised. With tolerant=True
+        top-level blocks with syntax errors are skipped and listed in
+        TestAnalysis.parse_errors instead of raising SyntaxError.
+        """
         abs_path = self.workspace_root / test_file
         if not abs_path.exists():
             raise FileNotFoundError(f"Test file not found: {test_file}")
             
-        with open(abs_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with open(abs_path, 'rb') as f:
+            data = f.read()
             
-        tree = ast.parse(content)
-        
-        # Track various metrics
-        total_functions = 0
-        tested_functions = 0
-        assertions = []
-        setup_vars = set()
-        used_vars = set()
-        suggestions = []
-        has_setup = False
-        in_setup = False
+        key = hashlib.sha256(data).hexdigest()
+        analysis = self._cached_analysis(key, tolerant)
+        if analysis is None:
+            analysis = _analyze_test_source(data, tolerant)
+            self._store_results([key], [(analysis, None)], {})
+            
+        analysis = _copy_analysis(analysis)
+        if line_coverage:
+            report = self.measure_line_coverage(test_file)
+            analysis.line_coverage = report.coverage
+        return analysis
         
-        class TestVisitor(ast.NodeVisitor):
-            def visit_FunctionDef(self, node):
-                nonlocal total_functions, tested_functions, has_setup, in_setup
-                
-                if node.name == 'setUp':
-                    has_setup = True
-                    in_setup = True
-                    # Process setup function body
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.Assign):
-                            for target in child.targets:
-                                if isinstance(target, ast.Attribute):
-                                    if isinstance(target.value, ast.Name) and target.value.id == 'self':
-                                        setup_vars.add(target.attr)
-                                elif isinstance(target, ast.Name):
-                                    setup_vars.add(target.id)
-                    self.generic_visit(node)
-                    in_setup = False
-                elif node.name.startswith('test_'):
-                    total_functions += 1
-                    
-                    # Check if function has assertions
-                    has_assertions = False
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.Call):
-                            if isinstance(child.func, ast.Attribute):
-                                if child.func.attr.startswith('assert'):
-                                    has_assertions = True
-                                    assertions.append(child)
-                        elif isinstance(child, ast.Name):
-                            if isinstance(child.ctx, ast.Load):
-                                used_vars.add(child.id)
-                        elif isinstance(child, ast.Attribute):
-                            if isinstance(child.value, ast.Name) and child.value.id == 'self':
-                                used_vars.add(child.attr)
-                                    
-                    if has_assertions:
-                        tested_functions += 1
-                    else:
-                        suggestions.append(f"Test function {node.name} has no assertions")
-                        
-                    self.generic_visit(node)
-                else:
-                    self.generic_visit(node)
-                
-        visitor = TestVisitor()
-        visitor.visit(tree)
+    def measure_line_coverage(self, test_file: str) -> CoverageReport:
+        """Run a test file under the coverage tracer and report source line coverage.
         
-        # Calculate coverage
-        coverage = (tested_functions / total_functions * 100) if total_functions > 0 else 0
+        Only files inside the workspace are traced, and the test file itself
+        is excluded from the totals. Modules imported before the run keep
+        their module-level lines unrecorded.
         
-        # Find unused setup
-        unused_setup = setup_vars - used_vars
+        Args:
+            test_file: Path to the test file, relative to the workspace root
+            
+        Returns:
+            CoverageReport for the workspace files executed by the tests
+        """
+        abs_path = self.workspace_root / test_file
+        if not abs_path.exists():
+            raise FileNotFoundError(f"Test file not found: {test_file}")
+            
+        module_name = f"_ai_toolkit_coverage_{abs_path.stem}"
+        spec = importlib.util.spec_from_file_location(module_name, abs_path)
+        module = importlib.util.module_from_spec(spec)
+        tracer = CoverageTracer(self.workspace_root, exclude=[abs_path])
         
-        # Generate additional suggestions
-        if len(assertions) < total_functions * 2:
-            suggestions.append("Consider adding more assertions per test")
+        root = str(self.workspace_root)
+        sys.path.insert(0, root)
+        sys.modules[module_name] = module
+        try:
+            with tracer:
+                spec.loader.exec_module(module)
+                suite = unittest.defaultTestLoader.loadTestsFromModule(module)
+                result = unittest.TextTestRunner(stream=io.StringIO(), verbosity=0).run(suite)
+        finally:
+            sys.modules.pop(module_name, None)
+            sys.path.remove(root)
             
-        if not has_setup:
-            suggestions.append("Consider adding setUp method for common initialization")
+        report = tracer.report()
+        report.tests_run = result.testsRun
+        return report
+        
+    def analyze_test_suite(self, root: Union[str, Path] = '.', pattern: str = 'test_*.py',
+                           max_workers: Optional[int] = None, tolerant: bool = False) -> TestSuiteReport:
+        """Analyze every test file under root and aggregate the results.
+        
+        Files are analyzed in a process pool (serially when only a few need
+        work) and cached by content hash, so repeated calls only re-analyze
+        files that changed.
+        
+        Args:
+            root: Directory to search, relative to the workspace root
+            pattern: Glob pattern matching test file names
+            max_workers: Process pool size (defaults to the CPU count)
+            tolerant: Analyze files with syntax errors from their valid blocks
+                      instead of reporting them in TestSuiteReport.errors
             
-        if unused_setup:
-            suggestions.append(f"Remove unused setup variables: {', '.join(unused_setup)}")
+        Returns:
+            TestSuiteReport with per-file analyses and suite-wide totals
+        """
+        search_root = self.workspace_root / root
+        if not search_root.is_dir():
+            raise FileNotFoundError(f"Test directory not found: {root}")
             
-        return TestAnalysis(
-            coverage=coverage,
-            missing_assertions=[],  # Would need source code to determine missing assertions
-            unused_setup=list(unused_setup),
-            suggestions=suggestions
+        # Read every test file and split into cache hits and misses
+        keys = {}
+        pending = {}
+        for dirpath, dirnames, filenames in os.walk(search_root):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.'))
+            for filename in sorted(filenames):
+                if not fnmatch.fnmatch(filename, pattern):
+                    continue
+                abs_path = Path(dirpath) / filename
+                rel_path = abs_path.relative_to(self.workspace_root).as_posix()
+                with open(abs_path, 'rb') as f:
+                    data = f.read()
+                key = hashlib.sha256(data).hexdigest()
+                keys[rel_path] = key
+                if self._cached_analysis(key, tolerant) is None:
+                    pending[key] = data
+                    
+        errors = {}
+        if pending:
+            pending_keys = list(pending)
+            sources = [pending[key] for key in pending_keys]
+            if len(sources) < PARALLEL_THRESHOLD or max_workers == 1:
+                results = map(_analyze_test_source_safe, sources, repeat(tolerant))
+                self._store_results(pending_keys, results, errors)
+            else:
+                workers = max_workers or os.cpu_count() or 1
+                chunksize = max(1, len(sources) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(_analyze_test_source_safe, sources, repeat(tolerant),
+                                           chunksize=chunksize)
+                    self._store_results(pending_keys, results, errors)
+                    
+        # Aggregate per-file results
+        files = {}
+        unused_setup = {}
+        file_errors = {}
+        total_tests = tested_tests = total_assertions = 0
+        for rel_path, key in keys.items():
+            if key in errors:
+                file_errors[rel_path] = errors[key]
+                continue
+            analysis = _copy_analysis(self._cached_analysis(key, tolerant))
+            files[rel_path] = analysis
+            total_tests += analysis.test_count
+            tested_tests += analysis.tested_count
+            total_assertions += analysis.assertion_count
+            if analysis.unused_setup:
+                unused_setup[rel_path] = analysis.unused_setup
+                
+        return TestSuiteReport(
+            files=files,
+            coverage=(tested_tests / total_tests * 100) if total_tests > 0 else 0,
+            assertion_density=(total_assertions / total_tests) if total_tests > 0 else 0,
+            unused_setup=unused_setup,
+            total_tests=total_tests,
+            errors=file_errors
         )
         
-    def generate_test_case(self, source_file: str, function_name: str) -> TestCase:
-        """Generate a test case for a function"""
+    def _store_results(self, keys: List[str], results, errors: Dict[str, str]):
+        """Cache analyses returned by _analyze_test_source_safe, collecting parse errors."""
+        for key, (analysis, error) in zip(keys, results):
+            if error is not None:
+                errors[key] = error
+            elif analysis.parse_errors:
+                # Partial results must not satisfy a strict lookup
+                self._analysis_cache[key + ':tolerant'] = analysis
+            else:
+                self._analysis_cache[key] = analysis
+                
+    def _cached_analysis(self, key: str, tolerant: bool) -> Optional[TestAnalysis]:
+        """Look up a cached analysis by content hash."""
+        analysis = self._analysis_cache.get(key)
+        if analysis is None and tolerant:
+            analysis = self._analysis_cache.get(key + ':tolerant')
+        return analysis
+                
+    def generate_test_case(self, source_file: str, function_name: str, tolerant: bool = False) -> TestCase:
+        """Generate a test case for a function.
+        
+        With tolerant=True blocks with syntax errors are skipped instead of
+        raising, so functions elsewhere in a broken file can still be used.
+        """
         abs_path = self.workspace_root / source_file
         if not abs_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_file}")
@@ -133,7 +364,7 @@ class TestHelper:
         with open(abs_path, 'r', encoding='utf-8') as f:
             content = f.read()
             
-        tree = ast.parse(content)
+        tree, _ = parse_source(content, tolerant=tolerant)
         
         # Find the function and its class (if any)
         class FunctionFinder(ast.NodeVisitor):
@@ -220,8 +451,11 @@ class TestHelper:
             
         return suggestions
         
-    def generate_test_file(self, source_file: str) -> Tuple[str, List[TestCase]]:
-        """Generate a complete test file for a source file"""
+    def generate_test_file(self, source_file: str, tolerant: bool = False) -> Tuple[str, List[TestCase]]:
+        """Generate a complete test file for a source file.
+        
+        With tolerant=True blocks with syntax errors are skipped instead of raising.
+        """
         abs_path = self.workspace_root / source_file
         if not abs_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_file}")
@@ -229,7 +463,7 @@ class TestHelper:
         with open(abs_path, 'r', encoding='utf-8') as f:
             content = f.read()
             
-        tree = ast.parse(content)
+        tree, _ = parse_source(content, tolerant=tolerant)
         
         # Collect all functions and classes
         test_cases = []
@@ -257,7 +491,8 @@ class TestHelper:
                     try:
                         test_case = TestHelper(abs_path.parent).generate_test_case(
                             source_file,
-                            node.name
+                            node.name,
+                            tolerant=tolerant
                         )
                         test_cases.append(test_case)
                     except Exception:
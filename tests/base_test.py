@@ -2,6 +2,7 @@
 
 import unittest
 import functools
+import inspect
 import traceback
 
 class LLMTestCase(unittest.TestCase):
@@ -38,11 +39,12 @@ class LLMTestCase(unittest.TestCase):
                 print("\nDO NOT RUSH - Take time to fully understand before implementing fixes")
                 print("="*80 + "\n")
                 raise
+        wrapper._llm_wrapped = True
         return wrapper
     
-    def __getattribute__(self, name):
-        """Automatically wrap test methods with the LLM failure logging."""
-        attr = super().__getattribute__(name)
-        if name.startswith('test_') and callable(attr):
-            return self.llm_failure_wrapper(attr)
-        return attr 
\ No newline at end of file
+    def __init_subclass__(cls, **kwargs):
+        """Wrap each subclass's test methods with the LLM failure logging once, at class creation."""
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('test_') and inspect.isfunction(attr) and not getattr(attr, '_llm_wrapped', False):
+                setattr(cls, name, cls.llm_failure_wrapper(attr)) 
\ No newline at end of file
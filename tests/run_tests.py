@@ -1,32 +1,252 @@
 """Test runner for AI Toolkit."""
 import unittest
+import argparse
+import io
+import json
+import subprocess
 import sys
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-def run_tests():
+# Timing history: per-test timings of recent runs plus per-module durations,
+# used for the slowest-test report and to schedule parallel runs longest-first
+TIMINGS_FILE = Path(os.path.abspath(__file__)).parent / '.test_timings.json'
+HISTORY_LIMIT = 20  # Runs kept in the history file
+
+# A test regressed if it got this much slower, relatively and absolutely
+REGRESSION_RATIO = 1.5
+REGRESSION_MIN_SECONDS = 0.05
+
+class TimedTestResult(unittest.TextTestResult):
+    """Text test result that records wall and CPU time for every test."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings: List[Tuple[str, float, float]] = []  # (test id, wall, cpu)
+        self._started = (0.0, 0.0)
+
+    def startTest(self, test):
+        self._started = (time.perf_counter(), time.process_time())
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        wall, cpu = self._started
+        self.timings.append((test.id(), time.perf_counter() - wall, time.process_time() - cpu))
+
+def changed_files_from_git(toolkit_root: Path) -> List[str]:
+    """List files changed relative to HEAD, relative to the toolkit root."""
+    result = subprocess.run(
+        ['git', 'diff', '--name-only', '--relative', 'HEAD'],
+        cwd=toolkit_root, capture_output=True, text=True, check=True
+    )
+    return [line for line in result.stdout.splitlines() if line]
+
+def select_test_files(toolkit_root: Path, changed: List[str]) -> List[str]:
+    """Select the test files in this directory affected by the changed files."""
+    from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+
+    indexer = ToolkitIndexer(toolkit_root)
+    indexer.update_index()
+    tests_dir = Path(os.path.abspath(__file__)).parent
+    selected = []
+    for rel_path in indexer.select_tests(changed):
+        abs_path = toolkit_root / rel_path
+        if abs_path.parent == tests_dir and abs_path.name.startswith('test_'):
+            selected.append(abs_path.name)
+    return selected
+
+def load_history() -> Dict:
+    """Load the timing history persisted by previous runs."""
+    try:
+        with open(TIMINGS_FILE, 'r') as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = {}
+    history.setdefault('modules', {})
+    history.setdefault('runs', [])
+    return history
+
+def load_timings() -> Dict[str, float]:
+    """Load per-module durations persisted by previous runs."""
+    return load_history()['modules']
+
+def record_run(timings: List[Tuple[str, float, float]]) -> Dict[str, List[float]]:
+    """Append a run's per-test timings to the history file.
+    
+    Returns:
+        Previous [wall, cpu] timings for every test in this run that has one
+    """
+    history = load_history()
+    previous = {}
+    for run in history['runs']:
+        previous.update(run['tests'])
+        
+    tests = {test_id: [round(wall, 6), round(cpu, 6)] for test_id, wall, cpu in timings}
+    modules: Dict[str, float] = {}
+    for test_id, wall, _ in timings:
+        module = test_id.split('.', 1)[0] + '.py'
+        modules[module] = modules.get(module, 0.0) + wall
+        
+    history['modules'].update(modules)
+    history['runs'].append({'started': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'tests': tests})
+    history['runs'] = history['runs'][-HISTORY_LIMIT:]
+    with open(TIMINGS_FILE, 'w') as f:
+        json.dump(history, f, indent=1, sort_keys=True)
+    return {test_id: previous[test_id] for test_id in tests if test_id in previous}
+
+def report_timings(timings: List[Tuple[str, float, float]], previous: Dict[str, List[float]],
+                   slowest: int, stream=sys.stderr):
+    """Print the slowest tests and the tests that regressed since their last run."""
+    if slowest > 0 and timings:
+        stream.write(f"\nSlowest {min(slowest, len(timings))} tests (wall / cpu):\n")
+        for test_id, wall, cpu in sorted(timings, key=lambda t: -t[1])[:slowest]:
+            stream.write(f"  {wall:8.3f}s {cpu:8.3f}s  {test_id}\n")
+            
+    regressions = []
+    for test_id, wall, _ in timings:
+        if test_id in previous:
+            before = previous[test_id][0]
+            if wall > before * REGRESSION_RATIO and wall - before > REGRESSION_MIN_SECONDS:
+                regressions.append((test_id, before, wall))
+    if regressions:
+        stream.write(f"\nRegressions vs previous run ({len(regressions)}):\n")
+        for test_id, before, wall in sorted(regressions, key=lambda r: r[1] - r[2]):
+            stream.write(f"  {before:8.3f}s -> {wall:8.3f}s  {test_id}\n")
+
+def _init_worker(paths: List[str], tests_dir: str, deferred_roots: List[str]):
+    """Prepare a worker process the same way run_tests prepares the parent."""
+    from ai_toolkit.tools.auto_index import DEFER_ENV
+
+    for path in paths:
+        sys.path.insert(0, path)
+    os.chdir(tests_dir)
+    os.environ[DEFER_ENV] = os.pathsep.join(deferred_roots)
+
+def _run_module(name: str) -> Dict:
+    """Run one test module in a worker and return a picklable summary."""
+    from ai_toolkit.tools.auto_index import pop_deferred_roots
+
+    suite = unittest.TestLoader().discover('.', pattern=name)
+    stream = io.StringIO()
+    start = time.perf_counter()
+    runner = unittest.TextTestRunner(stream=stream, verbosity=2, resultclass=TimedTestResult)
+    result = runner.run(suite)
+    return {
+        'module': name,
+        'tests_run': result.testsRun,
+        'failures': [(str(test), tb) for test, tb in result.failures],
+        'errors': [(str(test), tb) for test, tb in result.errors],
+        'skipped': len(result.skipped),
+        'elapsed': time.perf_counter() - start,
+        'timings': result.timings,
+        'output': stream.getvalue(),
+        'deferred_roots': sorted(pop_deferred_roots())
+    }
+
+def run_parallel(modules: List[str], workers: int, paths: List[str], tests_dir: str,
+                 deferred_roots: List[str], slowest: int = 10) -> bool:
+    """Run test modules across a process pool, longest first.
+    
+    Index updates from auto_index for the given roots are deferred in the
+    workers and applied once after all modules have finished.
+    """
+    from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+
+    # Modules without a recorded duration go first so they can't form a long tail
+    timings = load_timings()
+    modules = sorted(modules, key=lambda m: -timings.get(m, float('inf')))
+
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(paths, tests_dir, deferred_roots)) as executor:
+        futures = [executor.submit(_run_module, name) for name in modules]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            sys.stderr.write(result['output'])
+    elapsed = time.perf_counter() - start
+
+    tests_run = sum(r['tests_run'] for r in results)
+    failures = [f for r in results for f in r['failures']]
+    errors = [e for r in results for e in r['errors']]
+    skipped = sum(r['skipped'] for r in results)
+    timings = [t for r in results for t in r['timings']]
+    previous = record_run(timings)
+
+    # Apply the deferred index updates once per root
+    for root in sorted({root for r in results for root in r['deferred_roots']}):
+        ToolkitIndexer(root).update_index()
+
+    for label, problems in (('FAIL', failures), ('ERROR', errors)):
+        for test, tb in problems:
+            sys.stderr.write('=' * 70 + f"\n{label}: {test}\n" + '-' * 70 + f"\n{tb}\n")
+    sys.stderr.write('-' * 70 + f"\nRan {tests_run} tests in {elapsed:.3f}s using {workers} workers\n\n")
+    if failures or errors:
+        sys.stderr.write(f"FAILED (failures={len(failures)}, errors={len(errors)})\n")
+    else:
+        sys.stderr.write("OK" + (f" (skipped={skipped})" if skipped else "") + "\n")
+    report_timings(timings, previous, slowest)
+    return not (failures or errors)
+
+def run_tests(argv: Optional[List[str]] = None):
     """Discover and run all tests."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--changed', nargs='*', metavar='FILE',
+                        help='Only run tests affected by these files (default: files changed since HEAD)')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='Run test modules across N worker processes')
+    parser.add_argument('--slowest', type=int, default=10, metavar='N',
+                        help='Report the N slowest tests (0 to disable)')
+    args = parser.parse_args(argv)
+
     # Get the absolute path to the toolkit root
-    toolkit_root = Path(__file__).parent.parent
+    toolkit_root = Path(os.path.abspath(__file__)).parent.parent
     project_root = toolkit_root.parent
-    
+
     # Add both to Python path
     sys.path.insert(0, str(toolkit_root))
     sys.path.insert(0, str(project_root))
-    
+
+    # Resolve changed files before leaving the caller's directory
+    selected = None
+    if args.changed is not None:
+        changed = [os.path.abspath(p) for p in args.changed] or changed_files_from_git(toolkit_root)
+        selected = select_test_files(toolkit_root, changed)
+        print(f"Selected {len(selected)} test file(s) affected by {len(changed)} changed file(s)")
+        if not selected:
+            return 0
+
     # Change to the tests directory
-    os.chdir(Path(__file__).parent)
-    
+    tests_dir = Path(os.path.abspath(__file__)).parent
+    os.chdir(tests_dir)
+
+    if args.workers > 1:
+        modules = selected if selected is not None else sorted(p.name for p in tests_dir.glob('test_*.py'))
+        success = run_parallel(modules, args.workers, [str(project_root), str(toolkit_root)],
+                               str(tests_dir), [str(toolkit_root), str(tests_dir)], args.slowest)
+        return 0 if success else 1
+
     # Find all test files in the tests directory
     loader = unittest.TestLoader()
-    suite = loader.discover('.', pattern='test_*.py')
-    
+    if selected is None:
+        suite = loader.discover('.', pattern='test_*.py')
+    else:
+        suite = unittest.TestSuite(loader.discover('.', pattern=name) for name in selected)
+
     # Run the tests
-    runner = unittest.TextTestRunner(verbosity=2)
+    runner = unittest.TextTestRunner(verbosity=2, resultclass=TimedTestResult)
     result = runner.run(suite)
-    
+    previous = record_run(result.timings)
+    report_timings(result.timings, previous, args.slowest)
+
     # Return 0 if all tests passed, 1 otherwise
     return 0 if result.wasSuccessful() else 1
-    
+
 if __name__ == '__main__':
-    sys.exit(run_tests()) 
\ No newline at end of file
+    sys.exit(run_tests())
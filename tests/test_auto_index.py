@@ -8,7 +8,7 @@ import json
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-from ai_toolkit.tools.auto_index import auto_index, auto_index_class
+from ai_toolkit.tools.auto_index import auto_index, auto_index_class, pop_deferred_roots, DEFER_ENV
 from ai_toolkit.tests.test_base import LLMTestCase
 
 class TestAutoIndex(LLMTestCase):
@@ -181,5 +181,46 @@ class TestAutoIndex(LLMTestCase):
         test.test_child()
         self.assertEqual(mock_instance.update_index.call_count, 2)
 
+    @patch('ai_toolkit.tools.auto_index.ToolkitIndexer')
+    def test_auto_index_class_keeps_base_wrapping(self, mock_indexer_cls):
+        """Test that subclasses of decorated LLMTestCase classes keep LLM wrapping."""
+        mock_instance = MagicMock()
+        mock_indexer_cls.return_value = mock_instance
+        
+        @auto_index_class(toolkit_root=self.temp_dir)
+        class BaseTest(LLMTestCase):
+            def test_base(self):
+                pass
+                
+        class ChildTest(BaseTest):
+            def test_child(self):
+                pass
+                
+        wrapped = ChildTest.__dict__['test_child'].wrapped_method
+        self.assertTrue(wrapped.__wrapped__._llm_wrapped)
+        ChildTest('test_child').test_child()
+        mock_instance.update_index.assert_called_once()
+        
+    def test_auto_index_deferred_root(self):
+        """Test that updates to deferred roots are recorded instead of applied."""
+        @auto_index(toolkit_root=self.temp_dir)
+        def test_deferred():
+            pass
+            
+        with patch.dict(os.environ, {DEFER_ENV: self.temp_dir}):
+            test_deferred()
+            
+        # The index was left untouched and the root is reported for a later update
+        with open(self.index_path) as f:
+            self.assertEqual(json.load(f), self.mock_index)
+        self.assertEqual(pop_deferred_roots(), {os.path.abspath(self.temp_dir)})
+        self.assertEqual(pop_deferred_roots(), set())
+        
+        # Other roots are still updated immediately
+        with patch.dict(os.environ, {DEFER_ENV: os.path.join(self.temp_dir, 'elsewhere')}):
+            test_deferred()
+        with open(self.index_path) as f:
+            self.assertEqual(json.load(f)['metadata']['update_counter'], 1)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -4,6 +4,7 @@ import unittest
 import io
 import sys
 import functools
+import inspect
 import traceback
 from contextlib import contextmanager
 
@@ -25,15 +26,13 @@ class LLMTestCase(unittest.TestCase):
     helping LLM assistants to maximize their analysis and problem-solving capabilities.
     """
     
-    def llm_failure_wrapper(self, test_method):
+    @staticmethod
+    def llm_failure_wrapper(test_method):
         """Decorator that adds LLM-focused logging on test failures."""
         @functools.wraps(test_method)
-        def wrapper(*args, **kwargs):
+        def wrapper(self, *args, **kwargs):
             try:
-                # If this is a bound method, args[0] is self
-                if len(args) > 0 and isinstance(args[0], LLMTestCase):
-                    return test_method(*args[1:], **kwargs)
-                return test_method(*args, **kwargs)
+                return test_method(self, *args, **kwargs)
             except Exception as e:
                 print("\n" + "!"*100)
                 print("""
@@ -79,14 +78,15 @@ class LLMTestCase(unittest.TestCase):
                 """)
                 print("!"*100 + "\n")
                 raise
+        wrapper._llm_wrapped = True
         return wrapper
     
-    def __getattribute__(self, name):
-        """Automatically wrap test methods with the LLM failure logging."""
-        attr = super().__getattribute__(name)
-        if name.startswith('test_') and callable(attr):
-            return self.llm_failure_wrapper(attr)
-        return attr
+    def __init_subclass__(cls, **kwargs):
+        """Wrap each subclass's test methods with the LLM failure logging once, at class creation."""
+        super().__init_subclass__(**kwargs)
+        for name, attr in list(vars(cls).items()):
+            if name.startswith('test_') and inspect.isfunction(attr) and not getattr(attr, '_llm_wrapped', False):
+                setattr(cls, name, cls.llm_failure_wrapper(attr))
 
 class TestLLMTestCase(unittest.TestCase):
     """Tests for the LLMTestCase base class"""
@@ -139,5 +139,39 @@ class TestLLMTestCase(unittest.TestCase):
             
         self.assertEqual(output.getvalue(), '')
 
+    def test_methods_wrapped_once_at_class_creation(self):
+        """Verify that test methods are wrapped on the class, not per attribute access"""
+        
+        class SampleTest(LLMTestCase):
+            def test_success(self):
+                self.assertTrue(True)
+                
+        wrapped = SampleTest.__dict__['test_success']
+        self.assertTrue(wrapped._llm_wrapped)
+        self.assertNotIn('__getattribute__', vars(LLMTestCase))
+        
+        test = SampleTest('test_success')
+        self.assertIs(test.test_success.__func__, wrapped)
+        self.assertIs(test.test_success.__func__, test.test_success.__func__)
+        
+    def test_subclass_methods_logged(self):
+        """Verify that test methods added by subclasses are wrapped as well"""
+        
+        class BaseSample(LLMTestCase):
+            def test_inherited(self):
+                self.assertTrue(True)
+                
+        class ChildSample(BaseSample):
+            def test_child_failure(self):
+                raise ValueError("Child failure")
+                
+        self.assertIs(ChildSample.__dict__.get('test_inherited'), None)
+        with capture_stdout() as output:
+            test = ChildSample('test_child_failure')
+            with self.assertRaises(ValueError):
+                test.test_child_failure()
+                
+        self.assertIn("Failed Test: test_child_failure", output.getvalue())
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
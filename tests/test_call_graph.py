@@ -0,0 +1,93 @@
+"""Tests for the workspace call graph"""
+
+import unittest
+
+from ai_toolkit.tools.call_graph import CallGraph, CallSite
+from ai_toolkit.tests.test_base import LLMTestCase
+
+def entry(symbols, calls):
+    return {'symbols': [list(s) for s in symbols], 'calls': [list(c) for c in calls]}
+
+class TestCallGraph(LLMTestCase):
+    """Test cases for CallGraph"""
+
+    def setUp(self):
+        """Build a small workspace: api -> service -> (repo, util), with a nested helper"""
+        self.graph = CallGraph({
+            'pkg/api.py': entry(
+                [('handle', 'function', 3), ('Api', 'class', 10), ('Api.__init__', 'method', 11)],
+                [('handle', 'service.Service.run', 4), ('handle', 'Api', 5), ('handle', 'print', 6),
+                 ('<module>', 'handle', 20)]
+            ),
+            'pkg/service.py': entry(
+                [('Service', 'class', 1), ('Service.run', 'method', 2), ('Service.save', 'method', 8),
+                 ('outer', 'function', 12), ('outer.inner', 'function', 13)],
+                [('Service.run', 'pkg.repo.load', 3), ('Service.run', 'Service.save', 4),
+                 ('Service.run', 'Service.save', 5), ('Service.save', 'util.write', 9),
+                 ('outer', 'inner', 15), ('outer.inner', 'outer', 14)]
+            ),
+            'pkg/repo.py': entry(
+                [('load', 'function', 1)],
+                [('load', 'write', 2)]
+            ),
+            'pkg/util.py': entry(
+                [('write', 'function', 1)],
+                []
+            ),
+        })
+
+    def test_resolution(self):
+        """Test module, same-file, nested, class and unique-name resolution"""
+        self.assertEqual(self.graph.callees('handle'), [
+            CallSite('pkg/api.py:handle', 'pkg/api.py:Api.__init__', 5),
+            CallSite('pkg/api.py:handle', 'pkg/service.py:Service.run', 4)
+        ])
+        self.assertEqual([s.callee for s in self.graph.callees('pkg/service.py:Service.run')],
+                         ['pkg/service.py:Service.save', 'pkg/service.py:Service.save', 'pkg/repo.py:load'])
+        self.assertEqual([s.callee for s in self.graph.callees('outer')], ['pkg/service.py:outer.inner'])
+        self.assertEqual([s.callee for s in self.graph.callees('load')], ['pkg/util.py:write'])
+        self.assertEqual(self.graph.unresolved, 1)  # print
+        self.assertEqual(self.graph.edge_count, 10)
+
+    def test_callers(self):
+        """Test reverse lookups with call-site lines"""
+        self.assertEqual(self.graph.callers('write'), [
+            CallSite('pkg/service.py:Service.save', 'pkg/util.py:write', 9),
+            CallSite('pkg/repo.py:load', 'pkg/util.py:write', 2)
+        ])
+        self.assertEqual(self.graph.callers('pkg/api.py:handle'),
+                         [CallSite('pkg/api.py:<module>', 'pkg/api.py:handle', 20)])
+        with self.assertRaises(KeyError):
+            self.graph.callers('missing')
+
+    def test_reachable(self):
+        """Test transitive reachability with depth limits in both directions"""
+        self.assertEqual(self.graph.reachable('handle'), {
+            'pkg/api.py:Api.__init__': 1,
+            'pkg/service.py:Service.run': 1,
+            'pkg/service.py:Service.save': 2,
+            'pkg/repo.py:load': 2,
+            'pkg/util.py:write': 3
+        })
+        self.assertEqual(set(self.graph.reachable('handle', max_depth=1)),
+                         {'pkg/api.py:Api.__init__', 'pkg/service.py:Service.run'})
+        self.assertEqual(self.graph.reachable('write', reverse=True, max_depth=2), {
+            'pkg/service.py:Service.save': 1,
+            'pkg/repo.py:load': 1,
+            'pkg/service.py:Service.run': 2
+        })
+        # A recursive symbol does not list itself
+        self.assertEqual(self.graph.reachable('outer'), {'pkg/service.py:outer.inner': 1})
+
+    def test_paths(self):
+        """Test all simple paths between symbols with a depth limit"""
+        self.assertEqual(self.graph.paths('handle', 'write'), [
+            ['pkg/api.py:handle', 'pkg/service.py:Service.run', 'pkg/service.py:Service.save', 'pkg/util.py:write'],
+            ['pkg/api.py:handle', 'pkg/service.py:Service.run', 'pkg/repo.py:load', 'pkg/util.py:write']
+        ])
+        self.assertEqual(self.graph.paths('handle', 'write', max_depth=2), [])
+        self.assertEqual(len(self.graph.paths('handle', 'write', limit=1)), 1)
+        self.assertEqual(self.graph.paths('write', 'handle'), [])
+
+if __name__ == '__main__':
+    unittest.main()
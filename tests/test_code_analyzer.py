@@ -3,8 +3,10 @@ from pathlib import Path
 import tempfile
 import os
 import shutil
+from unittest import mock
 
-from ai_toolkit.code_analyzer import CodeAnalyzer, CodeSymbol, CodeContext
+from ai_toolkit.code_analyzer import CodeAnalyzer, CodeSymbol, CodeContext, ResolvedSymbol, CHARS_PER_TOKEN
+from ai_toolkit.file_editor import FileEditor
 from ai_toolkit.tests.test_base import LLMTestCase
 
 class TestCodeAnalyzer(LLMTestCase):
@@ -107,5 +109,233 @@ def standalone_function():
         self.assertIn('base_method', deps)
         self.assertIn('name', deps)
         
+    def _write(self, rel_path, content):
+        path = os.path.join(self.temp_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+            
+    def _write_package(self):
+        """Create a small package with absolute, relative and re-exported imports"""
+        self._write('pkg/__init__.py', 'from .models import Model\n')
+        self._write('pkg/models.py', '''from pkg.util import helper
+
+class Base:
+    def save(self):
+        return helper()
+
+class Model(Base):
+    def __init__(self):
+        self.ready = True
+''')
+        self._write('pkg/util.py', '''import os
+
+def helper():
+    return os.getcwd()
+
+def unused():
+    pass
+''')
+        self._write('app.py', '''import pkg.util as util
+from pkg import Model
+
+def run():
+    model = Model()
+    model.save()
+    return util.helper()
+
+class Runner(Model):
+    def go(self):
+        return self.save()
+''')
+        
+    def test_resolve_symbol_dependencies(self):
+        """Test resolving dependencies to their defining files"""
+        self._write_package()
+        deps = self.analyzer.resolve_symbol_dependencies('app.py', 'run')
+        
+        # The package re-export is followed to the defining module
+        self.assertEqual(deps['Model'], ResolvedSymbol('pkg/models.py', 'Model'))
+        self.assertEqual(deps['util.helper'], ResolvedSymbol('pkg/util.py', 'helper'))
+        self.assertEqual(deps['util'], ResolvedSymbol('pkg/util.py', None))
+        
+        # Locals, builtins and attributes of unknown objects are not resolved
+        self.assertNotIn('model', deps)
+        self.assertNotIn('model.save', deps)
+        
+    def test_resolve_self_through_bases(self):
+        """Test resolving self members inherited across files"""
+        self._write_package()
+        deps = self.analyzer.resolve_symbol_dependencies('app.py', 'Runner.go')
+        self.assertEqual(deps['self.save'], ResolvedSymbol('pkg/models.py', 'Base.save'))
+        
+        # Same-file members resolve too
+        deps = self.analyzer.resolve_symbol_dependencies(self.test_file, 'TestClass.test_method')
+        self.assertEqual(deps['self.base_method'], ResolvedSymbol(self.test_file, 'BaseClass.base_method'))
+        
+    def test_transitive_symbol_dependencies(self):
+        """Test the transitive closure of what a function needs"""
+        self._write_package()
+        needed = self.analyzer.transitive_symbol_dependencies('app.py', 'run')
+        
+        self.assertEqual(needed[ResolvedSymbol('pkg/models.py', 'Model')], 1)
+        self.assertEqual(needed[ResolvedSymbol('pkg/models.py', 'Base')], 2)
+        self.assertEqual(needed[ResolvedSymbol('pkg/models.py', 'Model.__init__')], 2)
+        self.assertIn(ResolvedSymbol('pkg/util.py', 'helper'), needed)
+        self.assertNotIn(ResolvedSymbol('pkg/util.py', 'unused'), needed)
+        
+        limited = self.analyzer.transitive_symbol_dependencies('app.py', 'run', max_depth=1)
+        self.assertNotIn(ResolvedSymbol('pkg/models.py', 'Base'), limited)
+        
+    def test_resolution_cache_tracks_changes(self):
+        """Test that cached analyses are refreshed when a file changes"""
+        self._write_package()
+        self.assertIn('util.helper', self.analyzer.resolve_symbol_dependencies('app.py', 'run'))
+        self.assertEqual(self.analyzer.resolve_module('pkg.util'), 'pkg/util.py')
+        self.assertIsNone(self.analyzer.resolve_module('json'))
+        
+        self._write('app.py', '''def run():
+    return 1
+
+def other():
+    return run()
+''')
+        os.utime(os.path.join(self.temp_dir, 'app.py'), ns=(0, 1))
+        self.assertEqual(self.analyzer.resolve_symbol_dependencies('app.py', 'run'), {})
+        self.assertEqual(self.analyzer.resolve_symbol_dependencies('app.py', 'other'),
+                         {'run': ResolvedSymbol('app.py', 'run')})
+        
+    def test_slice_context(self):
+        """Test packing a symbol and its dependencies, nearest first"""
+        self._write_package()
+        result = self.analyzer.slice_context('app.py', symbol_name='run', budget=10000)
+        
+        names = [(s.file_path, s.name, s.distance) for s in result.slices]
+        self.assertEqual(names[0], ('app.py', 'run', 0))
+        self.assertIn(('pkg/models.py', 'Model', 1), names)
+        self.assertIn(('pkg/util.py', 'helper', 1), names)
+        self.assertIn(('pkg/models.py', 'Base', 2), names)
+        self.assertEqual([s.distance for s in result.slices], sorted(s.distance for s in result.slices))
+        self.assertEqual(result.omitted, [])
+        self.assertEqual(result.files_read, 3)
+        
+        # Classes other than the seed contribute their header only
+        model = next(s for s in result.slices if s.name == 'Model')
+        self.assertEqual(model.text, 'class Model(Base):')
+        
+        text = result.render()
+        self.assertIn('# app.py:4-7\ndef run():', text)
+        self.assertEqual(result.size, len(text))
+        self.assertNotIn('def unused', text)
+        
+    def test_slice_context_budget(self):
+        """Test that the budget is respected and far dependencies are dropped"""
+        self._write_package()
+        full = self.analyzer.slice_context('app.py', symbol_name='run', budget=10000)
+        small = self.analyzer.slice_context('app.py', symbol_name='run', budget=len(full.slices[0].render()) + 60)
+        
+        self.assertLessEqual(small.size, small.budget)
+        self.assertEqual(small.slices[0].name, 'run')
+        self.assertLess(len(small.slices), len(full.slices))
+        self.assertTrue(small.omitted)
+        
+        tokens = self.analyzer.slice_context('app.py', symbol_name='run', budget=30, unit='tokens')
+        self.assertLessEqual(tokens.size, 30)
+        self.assertEqual(tokens.size, -(-len(tokens.render()) // CHARS_PER_TOKEN))
+        
+        # A seed larger than the budget is truncated to whole lines
+        tiny = self.analyzer.slice_context('app.py', symbol_name='run', budget=40)
+        self.assertEqual(len(tiny.slices), 1)
+        self.assertTrue(tiny.slices[0].truncated)
+        self.assertEqual(tiny.slices[0].text, 'def run():')
+        
+    def test_slice_context_at_line(self):
+        """Test slicing from a line inside a method"""
+        result = self.analyzer.slice_context(self.test_file, line_number=23)
+        names = [s.name for s in result.slices]
+        
+        # The method in full, its class header, and the inherited method it calls
+        self.assertEqual(names[0], 'TestClass.test_method')
+        self.assertIn('TestClass', names)
+        self.assertIn('BaseClass.base_method', names)
+        self.assertNotIn('standalone_function', names)
+        
+        with self.assertRaises(ValueError):
+            self.analyzer.slice_context(self.test_file)
+        with self.assertRaises(KeyError):
+            self.analyzer.slice_context(self.test_file, symbol_name='missing')
+        self.assertEqual(self.analyzer.slice_context(self.test_file, line_number=1).slices, [])
+        
+    def _edit(self, start, end, new_content):
+        """Apply one edit to the sample file and return its line changes"""
+        editor = FileEditor(self.temp_dir)
+        result = editor.apply_edits(self.test_file, [editor.create_edit(self.test_file, start, end, new_content)])
+        self.assertTrue(result.success)
+        return result.changes
+        
+    def test_reanalyze_file_incremental(self):
+        """Test that edits inside a function only re-parse that function"""
+        previous = self.analyzer.analyze_file(self.test_file)
+        changes = self._edit(12, 13, '        """Base method docstring."""\n        total = self.value\n        return total + 1\n')
+        
+        with mock.patch.object(self.analyzer, 'analyze_file', wraps=self.analyzer.analyze_file) as full:
+            context = self.analyzer.reanalyze_file(self.test_file, changes, previous)
+            self.assertFalse(full.called)
+            
+        expected = self.analyzer.analyze_file(self.test_file)
+        self.assertEqual(context.symbols, expected.symbols)
+        self.assertEqual(list(context.symbols), list(expected.symbols))
+        self.assertEqual(context.imports, expected.imports)
+        self.assertEqual(context.import_lines, expected.import_lines)
+        self.assertEqual(context.symbols['standalone_function'].line_number, 28)
+        
+        # The cached analysis is replaced
+        deps = self.analyzer.resolve_symbol_dependencies(self.test_file, 'TestClass.test_method')
+        self.assertEqual(deps['self.base_method'], ResolvedSymbol(self.test_file, 'BaseClass.base_method'))
+        
+    def test_reanalyze_file_decorated(self):
+        """Test that re-parsing a decorated function keeps its decorators"""
+        self._write('decorated.py', 'import functools\n\ndef first():\n    pass\n\n@functools.lru_cache(\n    maxsize=None)\n@staticmethod\ndef cached(x):\n    return x\n')
+        previous = self.analyzer.analyze_file('decorated.py')
+        editor = FileEditor(self.temp_dir)
+        result = editor.apply_edits('decorated.py', [editor.create_edit('decorated.py', 10, 10, '    y = x\n    return y\n')])
+        
+        with mock.patch.object(self.analyzer, 'analyze_file', wraps=self.analyzer.analyze_file) as full:
+            context = self.analyzer.reanalyze_file('decorated.py', result.changes, previous)
+            self.assertFalse(full.called)
+        expected = self.analyzer.analyze_file('decorated.py')
+        self.assertEqual(context.symbols, expected.symbols)
+        self.assertIn('staticmethod', context.symbols['cached'].dependencies)
+        
+    def test_reanalyze_file_fallback(self):
+        """Test that module-level and structural edits fall back to a full parse"""
+        self.analyzer.resolve_symbol_dependencies(self.test_file, 'standalone_function')  # Fill the cache
+        cases = [
+            (4, 4, 'import sys\nimport json\n'),  # Module-level import
+            (26, 26, '        return f"{self.name}: {value}"\n\ndef extra():\n    pass\n'),  # New top-level function, lines shifted by the first edit
+        ]
+        for start, end, new_content in cases:
+            changes = self._edit(start, end, new_content)
+            with mock.patch.object(self.analyzer, 'analyze_file', wraps=self.analyzer.analyze_file) as full:
+                context = self.analyzer.reanalyze_file(self.test_file, changes)
+                self.assertTrue(full.called)
+            self.assertEqual(context.symbols, self.analyzer.analyze_file(self.test_file).symbols)
+        self.assertIn('extra', context.symbols)
+        
+    def test_analyze_file_tolerant(self):
+        """Test analyzing a file with a syntax error"""
+        self._write('broken.py', 'def ok():\n    return 1\n\ndef bad(:\n    pass\n\nclass After:\n    def m(self):\n        return ok()\n')
+        with self.assertRaises(SyntaxError):
+            self.analyzer.analyze_file('broken.py')
+            
+        context = self.analyzer.analyze_file('broken.py', tolerant=True)
+        self.assertEqual(set(context.symbols), {'ok', 'After', 'After.m'})
+        self.assertEqual(context.symbols['After.m'].line_number, 8)
+        self.assertEqual([(d.start_line, d.end_line) for d in context.diagnostics], [(4, 6)])
+        
+        # The resolver works on files that are mid-edit
+        deps = self.analyzer.resolve_symbol_dependencies('broken.py', 'After.m')
+        self.assertEqual(deps['ok'], ResolvedSymbol('broken.py', 'ok'))
+        
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,110 @@
+import unittest
+import importlib.util
+import tempfile
+import os
+import shutil
+import sys
+import threading
+
+from ai_toolkit.coverage_tracer import CoverageTracer, CoverageReport, executable_lines
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestCoverageTracer(LLMTestCase):
+    """Test cases for CoverageTracer"""
+    
+    def setUp(self):
+        """Create a temporary workspace with a module to trace"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.module_path = os.path.join(self.temp_dir, 'shapes.py')
+        with open(self.module_path, 'w') as f:
+            f.write('''def area(width, height):
+    if width < 0:
+        raise ValueError("negative width")
+    return width * height
+
+def perimeter(width, height):
+    return 2 * (width + height)
+''')
+            
+    def tearDown(self):
+        """Clean up temporary files"""
+        shutil.rmtree(self.temp_dir)
+        
+    def load_module(self):
+        """Import the sample module from the workspace"""
+        spec = importlib.util.spec_from_file_location('shapes', self.module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+        
+    def test_executable_lines(self):
+        """Test collecting the lines the compiler emits code for"""
+        with open(self.module_path) as f:
+            lines = executable_lines(f.read())
+        self.assertTrue({1, 2, 3, 4, 6, 7} <= lines)
+        self.assertNotIn(5, lines)
+        
+    def test_records_workspace_lines(self):
+        """Test that executed and missing lines are reported per file"""
+        tracer = CoverageTracer(self.temp_dir)
+        with tracer:
+            module = self.load_module()
+            module.area(2, 3)
+            
+        report = tracer.report()
+        self.assertIsInstance(report, CoverageReport)
+        self.assertEqual(list(report.files), ['shapes.py'])
+        
+        shapes = report.files['shapes.py']
+        self.assertEqual(shapes.missing, [3, 7])
+        self.assertLess(shapes.percent, 100)
+        self.assertGreater(report.elapsed, 0)
+        
+    def test_ignores_files_outside_workspace(self):
+        """Test that only workspace files are traced"""
+        tracer = CoverageTracer(self.temp_dir)
+        with tracer:
+            os.path.join('a', 'b')
+        self.assertEqual(tracer.report().files, {})
+        
+    def test_restores_previous_tracer(self):
+        """Test that stopping the tracer leaves no trace function behind"""
+        previous = sys.gettrace()
+        with CoverageTracer(self.temp_dir):
+            pass
+        self.assertIs(sys.gettrace(), previous)
+        
+    def test_restores_previous_thread_tracer(self):
+        """Test that the thread-start hook is restored separately from the current trace function"""
+        def thread_trace(frame, event, arg):
+            return None
+        previous = threading.gettrace()
+        threading.settrace(thread_trace)
+        self.addCleanup(threading.settrace, previous)
+        
+        tracer = CoverageTracer(self.temp_dir)
+        tracer.backend = 'settrace'
+        with tracer:
+            pass
+        self.assertIs(threading.gettrace(), thread_trace)
+        
+    @unittest.skipUnless(hasattr(sys, 'monitoring'), "sys.monitoring requires Python 3.12+")
+    def test_falls_back_when_tool_id_in_use(self):
+        """Test that the settrace backend is used when another tool holds the coverage ID"""
+        tool_id = sys.monitoring.COVERAGE_ID
+        if sys.monitoring.get_tool(tool_id) is None:
+            sys.monitoring.use_tool_id(tool_id, 'other.coverage')
+            self.addCleanup(sys.monitoring.free_tool_id, tool_id)
+        owner = sys.monitoring.get_tool(tool_id)
+        
+        tracer = CoverageTracer(self.temp_dir)
+        with tracer:
+            module = self.load_module()
+            module.perimeter(2, 3)
+            
+        self.assertEqual(tracer.backend, 'settrace')
+        self.assertEqual(tracer.report().files['shapes.py'].missing, [2, 3, 4])
+        self.assertEqual(sys.monitoring.get_tool(tool_id), owner)
+
+if __name__ == '__main__':
+    unittest.main()
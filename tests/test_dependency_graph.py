@@ -0,0 +1,99 @@
+"""Tests for the toolkit dependency graph"""
+
+import unittest
+
+from ai_toolkit.tools.dependency_graph import DependencyGraph, module_names
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestDependencyGraph(LLMTestCase):
+    """Test cases for DependencyGraph"""
+    
+    def setUp(self):
+        """Build a small graph: app -> service -> (models, utils), models -> utils"""
+        self.graph = DependencyGraph({
+            'pkg/app.py': {'pkg.service', 'os'},
+            'pkg/service.py': {'pkg.models', 'pkg.utils'},
+            'pkg/models.py': {'pkg.utils', 'json'},
+            'pkg/utils.py': set(),
+            'tests/test_app.py': {'unittest', 'pkg.app'},
+        })
+        
+    def test_module_names(self):
+        """Test dotted-module suffixes of a path"""
+        self.assertEqual(module_names('pkg/tools/mod.py'), ['pkg.tools.mod', 'tools.mod', 'mod'])
+        
+    def test_resolution(self):
+        """Test that module names resolve to files and the rest is reported"""
+        self.assertEqual(self.graph.dependencies('pkg/service.py'), ['pkg/models.py', 'pkg/utils.py'])
+        self.assertEqual(self.graph.dependents('pkg/utils.py'), ['pkg/models.py', 'pkg/service.py'])
+        self.assertEqual(self.graph.unresolved['pkg/models.py'], ['json'])
+        self.assertEqual(self.graph.edge_count, 5)
+        
+    def test_relative_and_submodule_names(self):
+        """Test relative imports and 'from pkg import mod' candidates"""
+        graph = DependencyGraph({
+            'pkg/sub/a.py': {'.b', '..c', '...outside'},
+            'pkg/sub/b.py': set(),
+            'pkg/c.py': {'pkg.sub.b.func'},
+        })
+        self.assertEqual(graph.dependencies('pkg/sub/a.py'), ['pkg/c.py', 'pkg/sub/b.py'])
+        self.assertEqual(graph.dependencies('pkg/c.py'), ['pkg/sub/b.py'])
+        self.assertEqual(graph.unresolved['pkg/sub/a.py'], ['...outside'])
+        
+    def test_rooted_resolution(self):
+        """Test that bare names only match root modules and suffixes start at a package"""
+        graph = DependencyGraph({
+            'tools/json.py': set(),
+            'tools/run.py': {'json', 'os.path', 'toolkit.tools.json'},
+            'src/pkg/mod.py': set(),
+            'app.py': {'pkg.mod.thing', 'other.mod', 'tools.json'},
+        }, package='toolkit')
+        self.assertEqual(graph.dependencies('tools/run.py'), ['tools/json.py'])
+        self.assertEqual(graph.unresolved['tools/run.py'], ['json', 'os.path'])
+        self.assertEqual(graph.dependencies('app.py'), ['src/pkg/mod.py', 'tools/json.py'])
+        self.assertEqual(graph.unresolved['app.py'], ['other.mod'])
+        
+    def test_transitive_closure(self):
+        """Test transitive dependencies and dependents"""
+        self.assertEqual(self.graph.transitive_dependencies('pkg/app.py'),
+                         {'pkg/service.py', 'pkg/models.py', 'pkg/utils.py'})
+        self.assertEqual(self.graph.transitive_dependents(['pkg/models.py']),
+                         {'pkg/service.py', 'pkg/app.py', 'tests/test_app.py'})
+        self.assertIn('pkg/models.py', self.graph.transitive_dependents('pkg/models.py', include_self=True))
+        self.assertEqual(self.graph.transitive_dependents('missing.py'), set())
+        
+    def test_topological_order(self):
+        """Test that every file comes after its dependencies"""
+        order = self.graph.topological_order()
+        self.assertEqual(len(order), 5)
+        position = {f: i for i, f in enumerate(order)}
+        for rel_path in order:
+            for dep in self.graph.dependencies(rel_path):
+                self.assertLess(position[dep], position[rel_path])
+                
+    def test_cycles(self):
+        """Test Tarjan SCC on a graph with a cycle"""
+        graph = DependencyGraph({
+            'a.py': {'b'},
+            'b.py': {'c'},
+            'c.py': {'a', 'd'},
+            'd.py': set(),
+            'e.py': {'a'},
+        })
+        self.assertEqual(graph.cycles(), [['a.py', 'b.py', 'c.py']])
+        self.assertEqual(graph.strongly_connected_components(),
+                         [['d.py'], ['a.py', 'b.py', 'c.py'], ['e.py']])
+        self.assertIn('a.py', graph.transitive_dependencies('a.py'))
+        with self.assertRaises(ValueError):
+            graph.topological_order()
+            
+    def test_deep_chain(self):
+        """Test that traversals are iterative and handle long chains"""
+        n = 5000
+        graph = DependencyGraph({f'm{i}.py': {f'm{i + 1}'} if i + 1 < n else set() for i in range(n)})
+        self.assertEqual(len(graph.transitive_dependents(f'm{n - 1}.py')), n - 1)
+        self.assertEqual(len(graph.strongly_connected_components()), n)
+        self.assertEqual(graph.topological_order()[0], f'm{n - 1}.py')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -94,6 +94,24 @@ def main():
             self.assertIn('def hello_world():', content)
             self.assertIn('def earth():', content)
             
+    def test_apply_edits_reports_changes(self):
+        """Test that applied edits report their line ranges"""
+        edits = [
+            self.editor.create_edit(self.test_file, 4, 5, 'def earth():\n    pass\n    pass\n'),
+            self.editor.create_edit(self.test_file, 1, 2, 'def hello():')
+        ]
+        result = self.editor.apply_edits(self.test_file, edits)
+        self.assertTrue(result.success)
+        
+        # Original line numbers, top to bottom
+        self.assertEqual([(c.start_line, c.end_line, c.new_line_count) for c in result.changes],
+                         [(1, 2, 1), (4, 5, 3)])
+        self.assertEqual([c.delta for c in result.changes], [-1, 1])
+        
+        # A replacement without a trailing newline does not merge with the next line
+        with open(os.path.join(self.temp_dir, self.test_file)) as f:
+            self.assertEqual(f.readline(), 'def hello():\n')
+            
     def test_create_file(self):
         """Test creating a new file"""
         new_file = "new.py"
@@ -0,0 +1,180 @@
+"""Tests for the index query CLI and server"""
+
+import io
+import os
+import json
+import stat
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+from ai_toolkit.tools.index_query import IndexQuery, QueryServer, default_socket_path, main, query_server
+from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestIndexQuery(LLMTestCase):
+    """Test cases for IndexQuery and its command line"""
+    
+    def setUp(self):
+        """Create and index a small toolkit"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.write_file('pkg/base.py', 'class Base:\n    def run(self):\n        pass\n')
+        self.write_file('pkg/service.py', 'from pkg.base import Base\n\nclass Service(Base):\n    pass\n')
+        self.write_file('tests/test_service.py', 'from pkg.service import Service\n\nclass TestService:\n    pass\n')
+        ToolkitIndexer(self.temp_dir).update_index()
+        self.query = IndexQuery(self.temp_dir)
+        
+    def write_file(self, rel_path: str, content: str):
+        """Write a file in the temporary toolkit"""
+        path = Path(self.temp_dir) / rel_path
+        os.makedirs(path.parent, exist_ok=True)
+        path.write_text(content)
+        
+    def path(self, rel_path: str) -> str:
+        return os.path.join(*rel_path.split('/'))
+        
+    def test_dependency_queries(self):
+        """Test deps and rdeps, direct and transitive"""
+        self.assertEqual(self.query.deps('pkg/service.py'), [self.path('pkg/base.py')])
+        self.assertEqual(self.query.rdeps('pkg/base.py'), [self.path('pkg/service.py')])
+        self.assertEqual(self.query.rdeps(os.path.join(self.temp_dir, 'pkg', 'base.py'), transitive=True),
+                         [self.path('pkg/service.py'), self.path('tests/test_service.py')])
+        
+    def test_where_and_tests_for(self):
+        """Test symbol lookup and affected-test selection"""
+        self.assertEqual(self.query.where('Base.run'),
+                         [{'name': 'Base.run', 'file': self.path('pkg/base.py'), 'line': 2, 'kind': 'method'}])
+        self.assertEqual([s['name'] for s in self.query.where('Serv')], ['Service'])
+        self.assertEqual(self.query.where('Servise', fuzzy=True)[0]['name'], 'Service')
+        self.assertEqual(self.query.tests_for(['pkg/base.py']), [self.path('tests/test_service.py')])
+        
+    def test_search(self):
+        """Test ranked search over names, signatures and docstrings"""
+        self.write_file('pkg/base.py', 'class Base:\n    """Shared runner."""\n    def run(self, task):\n        """Run one task."""\n')
+        ToolkitIndexer(self.temp_dir).update_index()
+        hits = self.query.search('run task')
+        self.assertEqual([hit['name'] for hit in hits], ['Base.run', 'Base'])
+        self.assertGreater(hits[0]['score'], hits[1]['score'])
+        self.assertEqual({k: v for k, v in hits[0].items() if k != 'score'},
+                         {'name': 'Base.run', 'file': self.path('pkg/base.py'), 'line': 3, 'kind': 'method',
+                          'signature': '(self, task)', 'summary': 'Run one task.'})
+        self.assertEqual([hit['name'] for hit in self.query.search('run', kind='class')], ['Base'])
+        
+    def test_call_queries(self):
+        """Test callers, callees and call paths"""
+        self.write_file('pkg/app.py', 'from pkg.base import Base\n\ndef main():\n    start()\n    Base.run(None)\n\ndef start():\n    pass\n')
+        ToolkitIndexer(self.temp_dir).update_index()
+        app, base = self.path('pkg/app.py'), self.path('pkg/base.py')
+        self.assertEqual(sorted(self.query.callees('main'), key=lambda c: c['line']),
+                         [{'symbol': f'{app}:start', 'line': 4}, {'symbol': f'{base}:Base.run', 'line': 5}])
+        self.assertEqual(self.query.callers('Base.run'), [{'symbol': f'{app}:main', 'line': 5}])
+        self.assertEqual(self.query.callers('start', transitive=True), [{'symbol': f'{app}:main', 'distance': 1}])
+        self.assertEqual(self.query.call_paths('main', 'Base.run'), [[f'{app}:main', f'{base}:Base.run']])
+        self.assertEqual(self.query.handle({'cmd': 'callers', 'args': {'symbol': 'nope'}}),
+                         {'ok': False, 'error': 'Symbol not in call graph: nope'})
+        
+    def test_stats_and_reload(self):
+        """Test statistics and that a rewritten index is picked up"""
+        stats = self.query.stats()
+        self.assertEqual(stats['files'], 3)
+        self.assertEqual(stats['test_files'], 1)
+        self.assertEqual(stats['dependency_edges'], 2)
+        self.assertEqual(stats['cycles'], 0)
+        
+        self.write_file('pkg/extra.py', 'def extra():\n    pass\n')
+        ToolkitIndexer(self.temp_dir).update_index()
+        self.assertEqual(self.query.stats()['files'], 4)
+        
+    def test_handle_errors(self):
+        """Test that bad requests produce error responses"""
+        self.assertFalse(self.query.handle({'cmd': 'nope'})['ok'])
+        response = self.query.handle({'cmd': 'deps', 'args': {'file': 'missing.py'}})
+        self.assertEqual(response, {'ok': False, 'error': 'File not in index: missing.py'})
+        self.assertFalse(self.query.handle({'cmd': 'deps', 'args': {'bogus': 1}})['ok'])
+        
+    def test_cli(self):
+        """Test the command line in process"""
+        out = io.StringIO()
+        socket_path = os.path.join(self.temp_dir, 'none.sock')
+        with redirect_stdout(out):
+            code = main(['--root', self.temp_dir, '--socket', socket_path, '--json', 'where', 'Service'])
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out.getvalue())[0]['file'], self.path('pkg/service.py'))
+        
+    @unittest.skipIf(QueryServer is None, "Unix domain sockets unavailable")
+    def test_server(self):
+        """Test JSON-lines queries against a resident server, directly and via the CLI"""
+        socket_path = os.path.join(self.temp_dir, 'query.sock')
+        server = QueryServer(self.temp_dir, socket_path)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        
+        response = query_server(socket_path, 'rdeps', file='pkg/base.py')
+        self.assertEqual(response, {'ok': True, 'result': [self.path('pkg/service.py')]})
+        self.assertFalse(query_server(socket_path, 'stats', bogus=True)['ok'])
+        
+        out = io.StringIO()
+        with redirect_stdout(out):
+            code = main(['--root', self.temp_dir, '--socket', socket_path, 'tests-for', 'pkg/base.py'])
+        self.assertEqual(code, 0)
+        self.assertEqual(out.getvalue().split(), [self.path('tests/test_service.py')])
+        
+    @unittest.skipIf(QueryServer is None, "Unix domain sockets unavailable")
+    def test_socket_is_private(self):
+        """Test that the default socket lives in a per-user directory and only its owner can connect"""
+        runtime_dir = os.path.join(self.temp_dir, 'run')
+        os.mkdir(runtime_dir, 0o700)
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': runtime_dir}):
+            self.assertEqual(os.path.dirname(default_socket_path(self.temp_dir)), runtime_dir)
+        
+        fallback_dir = os.path.join(self.temp_dir, 'tmp')
+        with mock.patch.dict(os.environ, {'XDG_RUNTIME_DIR': ''}), \
+                mock.patch('tempfile.gettempdir', return_value=fallback_dir):
+            socket_path = default_socket_path(self.temp_dir)
+            self.assertEqual(os.path.dirname(os.path.dirname(socket_path)), fallback_dir)
+            server = QueryServer(self.temp_dir)
+        self.addCleanup(server.server_close)
+        self.assertEqual(server.socket_path, socket_path)
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(socket_path)).st_mode), 0o700)
+        self.assertEqual(stat.S_IMODE(os.stat(socket_path).st_mode), 0o600)
+        
+    @unittest.skipIf(QueryServer is None, "Unix domain sockets unavailable")
+    def test_serve_creates_private_dir(self):
+        """Test that the serve command creates and checks the default socket directory"""
+        fallback_dir = os.path.join(self.temp_dir, 'tmp')
+        environ = {k: v for k, v in os.environ.items() if k != 'XDG_RUNTIME_DIR'}
+        served = []
+        
+        def serve_forever(server):
+            served.append(server.socket_path)
+            self.assertEqual(stat.S_IMODE(os.stat(server.socket_path).st_mode), 0o600)
+            
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch('tempfile.gettempdir', return_value=fallback_dir), \
+                mock.patch.object(QueryServer, 'serve_forever', serve_forever), \
+                redirect_stderr(io.StringIO()):
+            self.assertEqual(main(['--root', self.temp_dir, 'serve']), 0)
+            self.assertEqual(served, [default_socket_path(self.temp_dir)])
+        socket_dir = os.path.dirname(served[0])
+        self.assertEqual(os.path.dirname(socket_dir), fallback_dir)
+        self.assertEqual(stat.S_IMODE(os.stat(socket_dir).st_mode), 0o700)
+        self.assertFalse(os.path.exists(served[0]))
+        
+        # An existing directory open to others is tightened before use
+        os.chmod(socket_dir, 0o755)
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch('tempfile.gettempdir', return_value=fallback_dir), \
+                mock.patch.object(QueryServer, 'serve_forever', serve_forever), \
+                redirect_stderr(io.StringIO()):
+            self.assertEqual(main(['--root', self.temp_dir, 'serve']), 0)
+        self.assertEqual(stat.S_IMODE(os.stat(socket_dir).st_mode), 0o700)
+
+if __name__ == '__main__':
+    unittest.main()
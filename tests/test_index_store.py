@@ -0,0 +1,112 @@
+"""Tests for the sectioned index file layout"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from ai_toolkit.tools import index_store
+from ai_toolkit.tools.index_store import (HEADER_SIZE, LazySection, encode_index, file_stamp, read_header,
+                                          read_section, read_section_stamped, read_sections, write_atomic)
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestIndexStore(LLMTestCase):
+    """Test cases for the index_store layout helpers"""
+    
+    def setUp(self):
+        """Write a sectioned index file"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.path = os.path.join(self.temp_dir, 'index.json')
+        self.sections = {
+            'components': {'a.py': {'classes': ['A']}, 'bé.py': {'classes': []}},
+            'dependencies': {},
+            'test_coverage': {'A': ['test_a.py']},
+        }
+        data = encode_index({'update_counter': 3}, {
+            name: ((k, json.dumps(v)) for k, v in entries.items())
+            for name, entries in self.sections.items()
+        })
+        with open(self.path, 'wb') as f:
+            f.write(data)
+            
+    def test_file_is_valid_json(self):
+        """Test that the sectioned layout still parses as one JSON document"""
+        with open(self.path) as f:
+            data = json.load(f)
+        self.assertEqual(data['metadata'], {'update_counter': 3})
+        for name, entries in self.sections.items():
+            self.assertEqual(data[name], entries)
+            
+    def test_header_and_sections(self):
+        """Test reading the header and individual sections by byte span"""
+        header = read_header(self.path)
+        self.assertEqual(header['metadata']['update_counter'], 3)
+        self.assertEqual(os.path.getsize(self.path) > HEADER_SIZE, True)
+        components = dict(read_section(self.path, header['layout']['components']))
+        self.assertEqual(components, {'a.py': '{"classes": ["A"]}', 'bé.py': '{"classes": []}'})
+        self.assertEqual(list(read_section(self.path, header['layout']['dependencies'])), [])
+        
+    def test_old_layout_has_no_header(self):
+        """Test that plain JSON files are not mistaken for the sectioned layout"""
+        with open(self.path, 'w') as f:
+            json.dump({'components': {}}, f, indent=4)
+        self.assertIsNone(read_header(self.path))
+        self.assertIsNone(read_header(os.path.join(self.temp_dir, 'missing.json')))
+        
+    def test_read_sections_during_replace(self):
+        """Test that a file replaced mid-read still yields the version whose header was read"""
+        stamp = file_stamp(self.path)
+        replacement = encode_index({'update_counter': 4}, {
+            'components': [('z' * 40 + '.py', json.dumps({'classes': ['Z'] * 20}))],
+            'dependencies': [], 'test_coverage': []
+        })
+        parse_header = index_store._parse_header
+        def replace_after_header(head):
+            write_atomic(self.path, replacement)
+            return parse_header(head)
+        
+        with mock.patch.object(index_store, '_parse_header', side_effect=replace_after_header):
+            read_stamp, header, sections = read_sections(self.path)
+        self.assertEqual(read_stamp, stamp)
+        self.assertEqual(header['metadata'], {'update_counter': 3})
+        self.assertEqual({k: json.loads(v) for k, v in sections['components']}, self.sections['components'])
+        self.assertEqual(dict(read_sections(self.path)[2]['components']), {'z' * 40 + '.py': json.dumps({'classes': ['Z'] * 20})})
+        
+    def test_read_section_stamped(self):
+        """Test that one section is read only while the file is the version the span came from"""
+        stamp, header = index_store.read_header_stamped(self.path)
+        span = header['layout']['components']
+        entries = read_section_stamped(self.path, span, stamp)
+        self.assertEqual({k: json.loads(v) for k, v in entries}, self.sections['components'])
+        
+        write_atomic(self.path, encode_index({}, {'components': []}))
+        self.assertIsNone(read_section_stamped(self.path, span, stamp))
+        os.remove(self.path)
+        self.assertIsNone(read_section_stamped(self.path, span, stamp))
+        
+    def test_lazy_section(self):
+        """Test that entries are read on first use and decoded on access"""
+        header = read_header(self.path)
+        reads = []
+        def loader():
+            reads.append(1)
+            return read_section(self.path, header['layout']['test_coverage'])
+        section = LazySection(loader, set)
+        self.assertFalse(section.loaded)
+        
+        self.assertIn('A', section)
+        self.assertTrue(section.is_raw('A'))
+        self.assertEqual(section['A'], {'test_a.py'})
+        self.assertFalse(section.is_raw('A'))
+        self.assertEqual(len(reads), 1)
+        
+        section['B'] = {'test_b.py'}
+        self.assertEqual(dict(section.encoded_items(sorted)), {'A': '["test_a.py"]', 'B': '["test_b.py"]'})
+        del section['A']
+        self.assertEqual(list(section), ['B'])
+
+if __name__ == '__main__':
+    unittest.main()
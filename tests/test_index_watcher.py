@@ -0,0 +1,115 @@
+"""Tests for the toolkit index watcher"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from ai_toolkit.tools.index_watcher import IndexWatcher, PollingSource
+from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class WatcherTestMixin:
+    """Shared scenarios run against each change notification backend"""
+    
+    backend = None
+    
+    def setUp(self):
+        """Create an indexed workspace and start watching it"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.write_file('src/alpha.py', 'class Alpha:\n    pass\n')
+        self.write_file('src/beta.py', 'def beta():\n    pass\n')
+        ToolkitIndexer(self.temp_dir).update_index()
+        
+        self.watcher = IndexWatcher(self.temp_dir, interval=0.05, debounce=0, backend=self.backend)
+        self.addCleanup(self.watcher.close)
+        
+    def write_file(self, rel_path: str, content: str):
+        """Write a file in the temporary workspace with a fresh mtime"""
+        full_path = Path(self.temp_dir) / rel_path
+        os.makedirs(full_path.parent, exist_ok=True)
+        full_path.write_text(content)
+        stamp = time.time_ns() + 10 ** 9
+        os.utime(full_path, ns=(stamp, stamp))
+        
+    def collect_until(self, expected: set):
+        """Collect notifications until the expected files are pending"""
+        for _ in range(20):
+            self.watcher.collect(0.05)
+            if expected <= self.watcher.pending:
+                return
+        self.fail(f"Expected {expected}, pending {self.watcher.pending}")
+        
+    def test_reindexes_only_touched_files(self):
+        """Test that a modified file is re-analyzed and others are left alone"""
+        self.write_file('src/alpha.py', 'class Alpha:\n    pass\n\nclass Gamma:\n    pass\n')
+        self.collect_until({os.path.join('src', 'alpha.py')})
+        
+        self.assertTrue(self.watcher.ready())
+        self.assertEqual(self.watcher.flush(), {os.path.join('src', 'alpha.py')})
+        
+        index = ToolkitIndexer(self.temp_dir)
+        alpha = index.components[os.path.join('src', 'alpha.py')]
+        beta = index.components[os.path.join('src', 'beta.py')]
+        self.assertEqual(set(alpha['classes']), {'Alpha', 'Gamma'})
+        self.assertGreater(alpha['last_update'], beta['last_update'])
+        
+    def test_coalesces_and_removes(self):
+        """Test that a burst of changes, including new directories and deletions, flushes once"""
+        self.write_file('pkg/new_module.py', 'def fresh():\n    pass\n')
+        os.remove(Path(self.temp_dir) / 'src' / 'beta.py')
+        self.collect_until({os.path.join('pkg', 'new_module.py'), os.path.join('src', 'beta.py')})
+        
+        self.watcher.flush()
+        self.assertEqual(self.watcher.pending, set())
+        
+        index = ToolkitIndexer(self.temp_dir)
+        self.assertIn(os.path.join('pkg', 'new_module.py'), index.components)
+        self.assertNotIn(os.path.join('src', 'beta.py'), index.components)
+        self.assertNotIn(os.path.join('src', 'beta.py'), index.dependencies)
+        
+    def test_debounce_waits_for_quiet_period(self):
+        """Test that a burst is not flushed until changes stop arriving"""
+        self.watcher.debounce = 60
+        self.write_file('src/alpha.py', 'class Alpha:\n    value = 1\n')
+        self.collect_until({os.path.join('src', 'alpha.py')})
+        self.assertFalse(self.watcher.ready())
+        
+        self.watcher.max_delay = 0
+        self.assertTrue(self.watcher.ready())
+
+    def test_lost_events_rescan_only_stale_files(self):
+        """Test that lost notifications re-index only files that differ from the index"""
+        self.write_file('src/gamma.py', 'GAMMA = 1\n')
+        os.remove(Path(self.temp_dir) / 'src' / 'beta.py')
+        self.watcher.source.read = lambda timeout: None  # e.g. inotify queue overflow
+        
+        self.assertEqual(self.watcher.collect(0), {os.path.join('src', 'gamma.py'), os.path.join('src', 'beta.py')})
+        self.watcher.flush()
+        index = ToolkitIndexer(self.temp_dir)
+        self.assertEqual(set(index.components), {os.path.join('src', 'alpha.py'), os.path.join('src', 'gamma.py')})
+
+class TestPollingWatcher(WatcherTestMixin, LLMTestCase):
+    """Test cases for the polling backend"""
+    
+    backend = 'poll'
+    
+    def test_ignores_skipped_directories(self):
+        """Test that caches and virtualenvs are not scanned"""
+        self.write_file('__pycache__/cached.py', '')
+        self.write_file('.venv/lib/site.py', '')
+        snapshot = PollingSource(ToolkitIndexer(self.temp_dir)).scan()
+        self.assertEqual(set(snapshot), {os.path.join('src', 'alpha.py'), os.path.join('src', 'beta.py')})
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "inotify is Linux-only")
+class TestInotifyWatcher(WatcherTestMixin, LLMTestCase):
+    """Test cases for the inotify backend"""
+    
+    backend = 'inotify'
+
+if __name__ == '__main__':
+    unittest.main()
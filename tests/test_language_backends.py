@@ -0,0 +1,218 @@
+"""Tests for per-extension language backends"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ai_toolkit.code_analyzer import CodeAnalyzer, CodeContext, ResolvedSymbol
+from ai_toolkit.file_editor import LineChange
+from ai_toolkit import language_backends
+from ai_toolkit.language_backends import (BraceBackend, LanguageBackend, PythonBackend,
+                                          get_backend, register_backend, source_suffixes)
+from ai_toolkit.tests.test_base import LLMTestCase
+
+TS_SOURCE = '''/** Widgets. */
+import { readFile } from 'fs';
+import type { Opts } from './opts';
+const path = require('path');
+
+/**
+ * Loads things.
+ */
+export class Loader extends Base {
+  constructor(opts: Opts) {
+    this.opts = opts;
+  }
+  load(url: string): string {
+    if (url.match(/[{}]/)) { return '}'; }
+    return this.fetch(url);
+  }
+  handler = (e) => {
+    this.load(e.url);
+  };
+}
+
+export function helper(a, b = {x: 1}) {
+  const cfg = { run() { return 1; } };
+  return new Loader(cfg);
+}
+
+export const arrow = async (x) => {
+  return helper(x, `template ${x} {`);
+};
+
+function allman()
+{
+  return 1;
+}
+'''
+
+GO_SOURCE = '''package main
+
+import (
+	"fmt"
+	"os"
+)
+
+// Server serves.
+type Server struct {
+	Name string
+}
+
+func (s *Server) Handle(w int) error {
+	for i := 0; i < 3; i++ {
+		fmt.Println(s.Name)
+	}
+	return nil
+}
+
+func main() {
+	os.Exit(0)
+}
+'''
+
+C_SOURCE = '''#include <stdio.h>
+static int
+add(int a, int b)
+{
+    return a + b;
+}
+int main(void) {
+    return add(1, 2);
+}
+'''
+
+class TestLanguageBackends(LLMTestCase):
+    """Test cases for the backend registry and BraceBackend"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.analyzer = CodeAnalyzer(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, rel_path: str, content: str):
+        with open(os.path.join(self.temp_dir, rel_path), 'w') as f:
+            f.write(content)
+
+    def test_registry(self):
+        """Test that backends are looked up by extension"""
+        self.assertIsInstance(get_backend('pkg/module.py'), PythonBackend)
+        self.assertIsInstance(get_backend('web/App.TSX'), BraceBackend)
+        self.assertIsInstance(get_backend('main.go'), BraceBackend)
+        self.assertIsNone(get_backend('README.md'))
+        self.assertIn('.py', source_suffixes())
+        self.assertIn('.js', source_suffixes())
+
+    def test_register_backend(self):
+        """Test that a registered backend is used by CodeAnalyzer"""
+        class LineBackend(LanguageBackend):
+            name = 'lines'
+            extensions = ('.lines',)
+
+            def analyze(self, source, file_path, tolerant=False):
+                return CodeContext({}, source.split(), [], None, file_path)
+
+        register_backend(LineBackend())
+        try:
+            self._write('deps.lines', 'os\nsys\n')
+            self.assertEqual(self.analyzer.analyze_file('deps.lines').imports, ['os', 'sys'])
+            self.assertIn('.lines', source_suffixes())
+        finally:
+            del language_backends._BACKENDS['.lines']
+
+    def test_incomplete_backend(self):
+        """Test that a backend without analyze() cannot be registered"""
+        class NoBackend(LanguageBackend):
+            name = 'none'
+            extensions = ('.none',)
+
+        with self.assertRaises(TypeError):
+            register_backend(NoBackend())
+        self.assertNotIn('.none', source_suffixes())
+
+    def test_typescript(self):
+        """Test classes, methods, functions and imports in TypeScript"""
+        self._write('app.ts', TS_SOURCE)
+        context = self.analyzer.analyze_file('app.ts')
+
+        self.assertEqual(context.imports, ['fs', './opts', 'path'])
+        self.assertEqual(context.import_lines, [2, 3, 4])
+        self.assertEqual(context.docstring, 'Widgets.')
+        self.assertEqual(context.diagnostics, [])
+        self.assertEqual(
+            {name: (s.type, s.line_number, s.end_line, s.parent) for name, s in context.symbols.items()},
+            {
+                'Loader': ('class', 9, 20, None),
+                'Loader.constructor': ('function', 10, 12, 'Loader'),
+                'Loader.load': ('function', 13, 16, 'Loader'),
+                'Loader.handler': ('function', 17, 19, 'Loader'),
+                'helper': ('function', 22, 25, None),
+                'arrow': ('function', 27, 29, None),
+                'allman': ('function', 31, 34, None)
+            }
+        )
+        loader = context.symbols['Loader']
+        self.assertEqual(loader.docstring, 'Loads things.')
+        self.assertEqual(loader.dependencies, {'Base'})
+        self.assertIn('self.fetch', context.symbols['Loader.load'].references)
+        self.assertIn('Loader', context.symbols['helper'].dependencies)
+
+    def test_go(self):
+        """Test structs, receiver methods and grouped imports in Go"""
+        self._write('main.go', GO_SOURCE)
+        context = self.analyzer.analyze_file('main.go')
+
+        self.assertEqual(context.imports, ['fmt', 'os'])
+        self.assertEqual(set(context.symbols), {'Server', 'Server.Handle', 'main'})
+        self.assertEqual(context.symbols['Server'].docstring, 'Server serves.')
+        handle = context.symbols['Server.Handle']
+        self.assertEqual((handle.line_number, handle.end_line, handle.parent), (13, 18, 'Server'))
+        self.assertIn('fmt', handle.dependencies)
+
+    def test_c(self):
+        """Test includes and functions with the brace on its own line"""
+        self._write('add.c', C_SOURCE)
+        context = self.analyzer.analyze_file('add.c')
+
+        self.assertEqual(context.imports, ['stdio.h'])
+        self.assertEqual(set(context.symbols), {'add', 'main'})
+        self.assertEqual(context.symbols['add'].line_number, 3)
+        self.assertEqual(context.symbols['main'].dependencies, {'add'})
+
+    def test_unbalanced_braces(self):
+        """Test that unbalanced braces raise unless tolerant"""
+        self._write('broken.js', 'function ok() {\n  return 1;\n}\n\nfunction open() {\n  if (x) {\n')
+        with self.assertRaises(SyntaxError):
+            self.analyzer.analyze_file('broken.js')
+
+        context = self.analyzer.analyze_file('broken.js', tolerant=True)
+        self.assertEqual(context.symbols['ok'].end_line, 3)
+        self.assertIn('open', context.symbols)
+        self.assertEqual(len(context.diagnostics), 1)
+        self.assertEqual(context.diagnostics[0].line, 5)
+
+    def test_resolution_and_slicing(self):
+        """Test that the resolver and slicer work on brace-language symbols"""
+        self._write('app.ts', TS_SOURCE)
+        self.assertEqual(
+            self.analyzer.resolve_symbol_dependencies('app.ts', 'Loader.handler'),
+            {'self.load': ResolvedSymbol('app.ts', 'Loader.load')}
+        )
+        sliced = self.analyzer.slice_context('app.ts', symbol_name='arrow')
+        self.assertEqual([s.name for s in sliced.slices], ['arrow', 'helper', 'Loader'])
+        self.assertTrue(sliced.slices[0].text.startswith('export const arrow'))
+
+    def test_reanalyze_falls_back(self):
+        """Test that edits to non-Python files are re-analyzed in full"""
+        self._write('add.c', C_SOURCE)
+        previous = self.analyzer.analyze_file('add.c')
+        self._write('add.c', C_SOURCE.replace('return a + b;', 'int c = a + b;\n    return c;'))
+        context = self.analyzer.reanalyze_file('add.c', [LineChange(5, 5, 2)], previous)
+        self.assertEqual(context.symbols['add'].end_line, 7)
+        self.assertEqual(context.symbols['main'].line_number, 8)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""Tests for error-tolerant parsing"""
+
+import ast
+import unittest
+
+from ai_toolkit.parse_utils import ParseDiagnostic, parse_source, parse_tolerant
+from ai_toolkit.tests.test_base import LLMTestCase
+
+BROKEN = '''import os
+
+def good():
+    return 1
+
+def bad(:
+    return 2
+
+class Half:
+    def m(self):
+        x = (1,
+    def n(self):
+        return 3
+
+@decorated
+def missing_colon()
+    pass
+
+def tail():
+    return os.sep
+'''
+
+class TestParseUtils(LLMTestCase):
+    """Test cases for parse_tolerant"""
+
+    def names(self, tree):
+        return [getattr(node, 'name', type(node).__name__) for node in tree.body]
+
+    def test_valid_source(self):
+        """Test that valid source parses without diagnostics"""
+        result = parse_tolerant("def f():\n    return 1\n")
+        self.assertTrue(result.ok)
+        self.assertEqual(self.names(result.tree), ['f'])
+
+    def test_skips_broken_blocks(self):
+        """Test that each broken top-level block is skipped and reported"""
+        result = parse_tolerant(BROKEN)
+
+        self.assertFalse(result.ok)
+        self.assertEqual(self.names(result.tree), ['Import', 'good', 'Half', 'tail'])
+        self.assertEqual([(d.start_line, d.end_line) for d in result.diagnostics],
+                         [(6, 8), (10, 11), (15, 18)])
+        self.assertEqual(result.diagnostics[0].line, 6)
+        
+        # Only the broken method is dropped from its class
+        self.assertEqual(self.names(result.tree.body[2]), ['Pass', 'n'])
+
+        # Line numbers of the remaining code are unchanged
+        self.assertEqual(result.tree.body[-1].lineno, 19)
+        self.assertIn('skipped lines 6-8', str(result.diagnostics[0]))
+
+    def test_empty_def_body(self):
+        """Test that a def without a body yet skips the def, not the code after it"""
+        source = ('def a():\n    return 1\n\ndef new():\n\ndef b():\n    return 2\n\n'
+                  'class K:\n    def half(self):\n\n    def m(self):\n        return 3\n')
+        result = parse_tolerant(source)
+
+        self.assertEqual(self.names(result.tree), ['a', 'b', 'K'])
+        self.assertEqual([(d.start_line, d.end_line) for d in result.diagnostics], [(4, 5), (10, 10)])
+        self.assertEqual(self.names(result.tree.body[2]), ['Pass', 'm'])
+        self.assertEqual(parse_tolerant('def a():\n    return 1\n\ndef new():\n').diagnostics[0].start_line, 4)
+
+    def test_unrecoverable(self):
+        """Test sources where nothing survives"""
+        result = parse_tolerant("def f(:\n")
+        self.assertEqual(result.tree.body, [])
+        self.assertEqual(len(result.diagnostics), 1)
+
+        result = parse_tolerant(b"x = 1\n\x00\n")
+        self.assertFalse(result.ok)
+        self.assertIsInstance(result.tree, ast.Module)
+
+    def test_max_errors(self):
+        """Test that parsing gives up after max_errors"""
+        source = ''.join(f"def f{i}(:\n    pass\n" for i in range(5))
+        result = parse_tolerant(source, max_errors=2)
+        self.assertEqual(result.tree.body, [])
+        self.assertEqual(len(result.diagnostics), 3)
+
+    def test_parse_source(self):
+        """Test strict and tolerant modes of parse_source"""
+        with self.assertRaises(SyntaxError):
+            parse_source(BROKEN)
+        tree, diagnostics = parse_source(BROKEN, tolerant=True)
+        self.assertEqual(len(diagnostics), 3)
+        self.assertIsInstance(diagnostics[0], ParseDiagnostic)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+"""Tests for test timing history and reporting in the test runner"""
+
+import io
+import json
+import shutil
+import tempfile
+import textwrap
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+import ai_toolkit
+from ai_toolkit.tests import run_tests
+from ai_toolkit.tests.run_tests import TimedTestResult, record_run, report_timings, run_parallel
+from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestRunTests(LLMTestCase):
+    """Test cases for timing collection, history and the timing report"""
+
+    def setUp(self):
+        """Point the timing history at a temporary file"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.timings_file = Path(self.temp_dir) / '.test_timings.json'
+        patcher = mock.patch.object(run_tests, 'TIMINGS_FILE', self.timings_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_timed_result(self):
+        """Test that every test gets a wall and CPU time"""
+        class Sample(unittest.TestCase):
+            def test_a(self):
+                pass
+
+            def test_b(self):
+                self.fail('boom')
+
+        suite = unittest.TestLoader().loadTestsFromTestCase(Sample)
+        runner = unittest.TextTestRunner(stream=io.StringIO(), resultclass=TimedTestResult)
+        result = runner.run(suite)
+
+        self.assertEqual([test_id.rsplit('.', 1)[-1] for test_id, _, _ in result.timings], ['test_a', 'test_b'])
+        for _, wall, cpu in result.timings:
+            self.assertGreaterEqual(wall, 0.0)
+            self.assertGreaterEqual(cpu, 0.0)
+
+    def test_history_over_runs(self):
+        """Test that runs are appended, trimmed and compared with earlier runs"""
+        self.assertEqual(record_run([('test_x.T.test_one', 0.5, 0.4), ('test_x.T.test_two', 0.25, 0.2)]), {})
+        previous = record_run([('test_x.T.test_one', 0.75, 0.5), ('test_y.T.test_new', 1.0, 1.0)])
+        self.assertEqual(previous, {'test_x.T.test_one': [0.5, 0.4]})
+
+        with open(self.timings_file) as f:
+            history = json.load(f)
+        self.assertEqual(len(history['runs']), 2)
+        self.assertEqual(history['runs'][1]['tests']['test_y.T.test_new'], [1.0, 1.0])
+        self.assertEqual(history['modules'], {'test_x.py': 0.75, 'test_y.py': 1.0})
+
+        # Older runs still provide timings for tests missing from the latest one
+        self.assertEqual(record_run([('test_x.T.test_two', 0.3, 0.3)]), {'test_x.T.test_two': [0.25, 0.2]})
+
+        with mock.patch.object(run_tests, 'HISTORY_LIMIT', 2):
+            record_run([])
+        with open(self.timings_file) as f:
+            self.assertEqual(len(json.load(f)['runs']), 2)
+
+    def test_corrupt_history(self):
+        """Test that an unreadable history file starts a new history"""
+        self.timings_file.write_text('{not json')
+        self.assertEqual(record_run([('test_x.T.test_one', 0.1, 0.1)]), {})
+        self.assertEqual(run_tests.load_timings(), {'test_x.py': 0.1})
+
+    def test_report(self):
+        """Test the slowest-test listing and regression detection"""
+        timings = [('t.fast', 0.01, 0.01), ('t.slow', 2.0, 1.5), ('t.noise', 0.06, 0.06), ('t.regressed', 0.5, 0.5)]
+        previous = {'t.fast': [0.001, 0.001], 't.slow': [1.9, 1.5], 't.noise': [0.03, 0.03],
+                    't.regressed': [0.2, 0.2]}
+        stream = io.StringIO()
+        report_timings(timings, previous, slowest=2, stream=stream)
+        lines = stream.getvalue().splitlines()
+
+        self.assertIn('Slowest 2 tests (wall / cpu):', lines)
+        slowest = lines[lines.index('Slowest 2 tests (wall / cpu):') + 1:][:2]
+        self.assertEqual([line.split()[-1] for line in slowest], ['t.slow', 't.regressed'])
+
+        # Only changes that are large both relatively and absolutely are regressions
+        self.assertIn('Regressions vs previous run (1):', lines)
+        self.assertTrue(lines[-1].endswith('t.regressed'))
+        self.assertIn('0.200s ->    0.500s', lines[-1])
+
+    def test_report_quiet(self):
+        """Test that nothing is printed without a listing or regressions"""
+        stream = io.StringIO()
+        report_timings([('t.a', 0.1, 0.1)], {'t.a': [0.1, 0.1]}, slowest=0, stream=stream)
+        self.assertEqual(stream.getvalue(), '')
+
+    def test_parallel_run(self):
+        """Test longest-first scheduling, combined results and one deferred index update"""
+        tests_dir = Path(self.temp_dir) / 'tests'
+        root = Path(self.temp_dir) / 'toolkit'
+        tests_dir.mkdir()
+        root.mkdir()
+        header = f"import unittest\nfrom ai_toolkit.tools.auto_index import auto_index\nROOT = {str(root)!r}\n"
+        modules = {
+            'test_pa.py': """
+                class T(unittest.TestCase):
+                    @auto_index(toolkit_root=ROOT)
+                    def test_one(self):
+                        pass
+
+                    def test_two(self):
+                        pass
+            """,
+            'test_pb.py': """
+                class T(unittest.TestCase):
+                    @auto_index(toolkit_root=ROOT)
+                    def test_pass(self):
+                        pass
+
+                    def test_fail(self):
+                        self.fail('boom')
+            """,
+            'test_pc.py': """
+                class T(unittest.TestCase):
+                    @unittest.skip('not now')
+                    def test_skipped(self):
+                        pass
+
+                    def test_error(self):
+                        raise RuntimeError('broken')
+            """
+        }
+        for name, body in modules.items():
+            (tests_dir / name).write_text(header + textwrap.dedent(body))
+
+        submitted = []
+
+        class RecordingExecutor(ProcessPoolExecutor):
+            def submit(self, fn, *args, **kwargs):
+                submitted.append(args[0])
+                return super().submit(fn, *args, **kwargs)
+
+        updated = []
+        stderr, stdout = io.StringIO(), io.StringIO()
+        with mock.patch.object(run_tests, 'ProcessPoolExecutor', RecordingExecutor), \
+                mock.patch.object(run_tests, 'load_timings', return_value={'test_pa.py': 0.1, 'test_pb.py': 2.0}), \
+                mock.patch.object(ToolkitIndexer, 'update_index', autospec=True,
+                                  side_effect=lambda indexer: updated.append(Path(indexer.root))), \
+                redirect_stderr(stderr), redirect_stdout(stdout):
+            success = run_parallel(sorted(modules), 2, [str(Path(ai_toolkit.__file__).parent.parent)],
+                                   str(tests_dir), [str(root)], slowest=0)
+
+        self.assertFalse(success)
+        # Modules without a recorded duration first, then the slowest
+        self.assertEqual(submitted, ['test_pc.py', 'test_pb.py', 'test_pa.py'])
+        output = stderr.getvalue()
+        self.assertIn('Ran 6 tests', output)
+        self.assertIn('using 2 workers', output)
+        self.assertIn('FAILED (failures=1, errors=1)', output)
+        self.assertIn('FAIL: test_fail', output)
+        self.assertIn('ERROR: test_error', output)
+
+        # Workers only deferred their updates; the runner applied them once
+        self.assertEqual(updated, [root])
+        self.assertFalse((root / 'codebase_index.json').exists())
+        with open(self.timings_file) as f:
+            self.assertEqual(set(json.load(f)['modules']), set(modules))
+
+    def test_parallel_run_success(self):
+        """Test that passing modules give a successful combined status"""
+        tests_dir = Path(self.temp_dir) / 'tests'
+        tests_dir.mkdir()
+        for name in ('test_pa.py', 'test_pb.py'):
+            (tests_dir / name).write_text('import unittest\n\nclass T(unittest.TestCase):\n'
+                                          '    def test_ok(self):\n        pass\n')
+        stderr = io.StringIO()
+        with redirect_stderr(stderr), redirect_stdout(io.StringIO()):
+            success = run_parallel(['test_pa.py', 'test_pb.py'], 2, [str(Path(ai_toolkit.__file__).parent.parent)],
+                                   str(tests_dir), [], slowest=0)
+        self.assertTrue(success)
+        self.assertIn('Ran 2 tests', stderr.getvalue())
+        self.assertTrue(stderr.getvalue().rstrip().endswith('OK'))
+
+if __name__ == '__main__':
+    unittest.main()
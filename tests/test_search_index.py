@@ -0,0 +1,94 @@
+"""Tests for the symbol full-text search index"""
+
+import unittest
+
+from ai_toolkit.tools.search_index import SearchIndex, _decode_postings, tokenize
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestSearchIndex(LLMTestCase):
+    """Test cases for SearchIndex"""
+
+    def setUp(self):
+        """Index two small files"""
+        self.index = SearchIndex()
+        self.index.update_file('pkg/config.py', [
+            ('parse_config', 'function', 3),
+            ('ConfigError', 'class', 10),
+            ('Loader', 'class', 14),
+            ('Loader.load', 'method', 15)
+        ], [
+            ('parse_config', '(path: str) -> Dict', 'Parse a configuration file into a dict.'),
+            ('ConfigError', '(ValueError)', 'Raised when a config file is invalid.'),
+            ('Loader.load', '(self, url)', 'Fetch a URL and parse the response.')
+        ], fingerprint=[1, 2, 3])
+        self.index.update_file('pkg/net.py', [
+            ('fetch_url', 'function', 1),
+            ('Client', 'class', 5)
+        ], [
+            ('fetch_url', '(url: str) -> bytes', 'Download a URL.'),
+            ('Client', '', 'HTTP client with retries.')
+        ])
+
+    def test_tokenize(self):
+        """Test identifier splitting, stop words and stemming"""
+        self.assertEqual(tokenize('parseConfig'), tokenize('parse_config'))
+        self.assertEqual(tokenize('parses the config'), tokenize('parse_config'))
+        self.assertEqual(tokenize('HTTPClient retries'), ['http', 'client', 'retry'])
+        self.assertEqual(tokenize(None), [])
+
+    def test_postings_are_delta_encoded(self):
+        """Test that postings decode to increasing symbol ids"""
+        ids = [doc_id for doc_id, _ in _decode_postings(self.index._postings['url'])]
+        self.assertEqual(ids, [3, 4])
+        self.assertEqual(self.index._postings['url'], bytearray([3, 2, 1, 5]))  # (gap, tf) pairs
+
+    def test_search_ranking(self):
+        """Test that name matches outrank docstring matches"""
+        hits = self.index.search('parse config')
+        self.assertEqual(hits[0].name, 'parse_config')
+        self.assertEqual(hits[0].summary, 'Parse a configuration file into a dict.')
+        self.assertEqual(hits[0].signature, '(path: str) -> Dict')
+        self.assertEqual({hit.name for hit in hits}, {'parse_config', 'ConfigError', 'Loader.load'})
+        self.assertEqual([hit.name for hit in self.index.search('url')], ['fetch_url', 'Loader.load'])
+        self.assertEqual(self.index.search('nothing matches'), [])
+
+    def test_search_filters(self):
+        """Test kind filtering and result limits"""
+        self.assertEqual([hit.name for hit in self.index.search('url', kind='method')], ['Loader.load'])
+        self.assertEqual([hit.name for hit in self.index.search('url', kind='function')],
+                         ['fetch_url', 'Loader.load'])
+        self.assertEqual(len(self.index.search('parse config', limit=1)), 1)
+
+        # Async functions and methods match their base kind
+        self.index.update_file('pkg/aio.py', [('fetch_url_async', 'async function', 1), ('Pool.fetch_url', 'async method', 5)], [])
+        self.assertEqual({hit.name for hit in self.index.search('fetch url', kind='function')},
+                         {'fetch_url', 'Loader.load', 'fetch_url_async', 'Pool.fetch_url'})
+        self.assertEqual({hit.name for hit in self.index.search('fetch url', kind='method')}, {'Loader.load', 'Pool.fetch_url'})
+        self.assertEqual([hit.name for hit in self.index.search('fetch url', kind='async function')], ['fetch_url_async'])
+
+    def test_update_and_remove(self):
+        """Test that replaced and removed files drop out of results"""
+        self.index.update_file('pkg/net.py', [('download', 'function', 1)], [])
+        self.assertEqual([hit.name for hit in self.index.search('url')], ['Loader.load'])
+        self.assertEqual(self.index.search('download')[0].file, 'pkg/net.py')
+        self.index.remove_file('pkg/config.py')
+        self.assertEqual(len(self.index), 1)
+        self.assertEqual(self.index.removed, 6)
+        self.assertEqual(self.index.search('parse'), [])
+
+        self.index.compact()
+        self.assertEqual(self.index.removed, 0)
+        self.assertEqual(self.index.search('download')[0].name, 'download')
+        self.assertNotIn('url', self.index._postings)
+
+    def test_save_and_load(self):
+        """Test that a saved index loads with the same results"""
+        self.index.remove_file('pkg/net.py')
+        loaded = SearchIndex.from_json(self.index.to_json())
+        self.assertEqual(loaded.search('parse config'), self.index.search('parse config'))
+        self.assertEqual(loaded.fingerprint('pkg/config.py'), [1, 2, 3])
+        self.assertIsNone(loaded.fingerprint('pkg/net.py'))
+        self.assertEqual(len(SearchIndex.from_json(b'{truncated')), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Tests for the ignore-aware source walker"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from ai_toolkit.tools.source_walker import IgnoreRules, path_is_ignored, walk_source_files
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestIgnoreRules(LLMTestCase):
+    """Test cases for gitignore pattern matching"""
+    
+    def test_unanchored_and_anchored(self):
+        """Test that patterns without a slash match at any depth"""
+        rules = IgnoreRules(['*.log', '/top.py', 'docs/build'])
+        self.assertTrue(rules.match('a/b/debug.log', False))
+        self.assertTrue(rules.match('top.py', False))
+        self.assertIsNone(rules.match('src/top.py', False))
+        self.assertTrue(rules.match('docs/build', True))
+        self.assertIsNone(rules.match('src/docs/build', True))
+        
+    def test_directory_only_and_negation(self):
+        """Test trailing-slash directory rules and ! re-inclusion"""
+        rules = IgnoreRules(['# comment', 'cache/', '*.py', '!keep.py'])
+        self.assertTrue(rules.match('cache', True))
+        self.assertIsNone(rules.match('cache', False))
+        self.assertTrue(rules.match('drop.py', False))
+        self.assertFalse(rules.match('keep.py', False))
+        
+    def test_double_star(self):
+        """Test ** matching zero or more directories"""
+        rules = IgnoreRules(['**/fixtures/*.py', 'out/**'])
+        self.assertTrue(rules.match('fixtures/a.py', False))
+        self.assertTrue(rules.match('x/y/fixtures/a.py', False))
+        self.assertTrue(rules.match('out/deep/file.py', False))
+        
+    def test_base_directory(self):
+        """Test that nested .gitignore rules only apply below their directory"""
+        rules = IgnoreRules(['*.py'], base='pkg')
+        self.assertTrue(rules.match('pkg/mod.py', False))
+        self.assertIsNone(rules.match('other/mod.py', False))
+
+class TestWalkSourceFiles(LLMTestCase):
+    """Test cases for walk_source_files"""
+    
+    def setUp(self):
+        """Create a tree with sources, caches, a virtualenv and .gitignore files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        for rel_path, content in {
+            'main.py': '',
+            'src/app.py': '',
+            'src/notes.txt': '',
+            'src/__pycache__/app.py': '',
+            'node_modules/pkg/index.py': '',
+            'myenv/pyvenv.cfg': '',
+            'myenv/lib/site.py': '',
+            '.gitignore': 'secret_*.py\n',
+            'src/secret_key.py': '',
+            'src/gen/.gitignore': '*.py\n!keep.py\n',
+            'src/gen/drop.py': '',
+            'src/gen/keep.py': '',
+        }.items():
+            path = Path(self.temp_dir) / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            
+    def walk(self, **kwargs):
+        return [rel_path.replace(os.sep, '/') for rel_path, _, _ in walk_source_files(self.temp_dir, **kwargs)]
+        
+    def test_prunes_ignored_paths(self):
+        """Test default patterns, virtualenv detection and nested .gitignore files"""
+        self.assertEqual(self.walk(), ['main.py', 'src/app.py', 'src/gen/keep.py'])
+        
+    def test_yields_stat_results(self):
+        """Test that each file comes with its stat result"""
+        for rel_path, abs_path, st in walk_source_files(self.temp_dir):
+            self.assertEqual(st.st_size, os.stat(abs_path).st_size)
+            
+    def test_custom_patterns_without_gitignore(self):
+        """Test configurable patterns and disabling .gitignore support"""
+        files = self.walk(ignore_patterns=['src/'], use_gitignore=False)
+        self.assertEqual(files, ['main.py', 'node_modules/pkg/index.py'])
+        
+    def test_start_directory(self):
+        """Test restricting the walk to a subdirectory with inherited rules"""
+        visited = []
+        files = self.walk(start='src', on_directory=visited.append)
+        self.assertEqual(files, ['src/app.py', 'src/gen/keep.py'])
+        self.assertEqual(visited, ['src', os.path.join('src', 'gen')])
+        
+    def test_path_is_ignored(self):
+        """Test checking single paths against the same rules"""
+        self.assertFalse(path_is_ignored(self.temp_dir, 'src/app.py'))
+        self.assertTrue(path_is_ignored(self.temp_dir, 'src/secret_key.py'))
+        self.assertTrue(path_is_ignored(self.temp_dir, 'src/gen/drop.py'))
+        self.assertFalse(path_is_ignored(self.temp_dir, 'src/gen/keep.py'))
+        self.assertTrue(path_is_ignored(self.temp_dir, 'myenv/lib/site.py'))
+        self.assertTrue(path_is_ignored(self.temp_dir, 'src/__pycache__/app.py'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests for the global symbol index"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from ai_toolkit.tools.symbol_index import Symbol, SymbolIndex
+from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+from ai_toolkit.tests.test_base import LLMTestCase
+
+class TestSymbolIndex(LLMTestCase):
+    """Test cases for SymbolIndex"""
+    
+    def setUp(self):
+        """Build an index from component entries"""
+        self.index = SymbolIndex.from_components({
+            'tools/indexer.py': {'symbols': [
+                ['ToolkitIndexer', 'class', 3],
+                ['ToolkitIndexer.update_index', 'method', 10],
+                ['ToolkitIndexer.update_files', 'method', 40],
+                ['update_toolkit_index', 'function', 80],
+            ]},
+            'tools/watcher.py': {'symbols': [
+                ['IndexWatcher', 'class', 5],
+                ['IndexWatcher.flush', 'method', 30],
+            ]},
+            'legacy.py': {'classes': ['Old'], 'functions': []},
+        })
+        
+    def test_lookup(self):
+        """Test exact lookup by qualified name"""
+        self.assertEqual(self.index.lookup('ToolkitIndexer.update_index'),
+                         [Symbol('ToolkitIndexer.update_index', 'tools/indexer.py', 10, 'method')])
+        self.assertEqual(self.index.lookup('update_index'), [])
+        self.assertIn('IndexWatcher', self.index)
+        self.assertEqual(len(self.index), 6)
+        
+    def test_prefix(self):
+        """Test case-insensitive prefix search on qualified and short names"""
+        names = [s.name for s in self.index.prefix('update_')]
+        self.assertEqual(names, ['ToolkitIndexer.update_files', 'ToolkitIndexer.update_index',
+                                 'update_toolkit_index'])
+        names = [s.name for s in self.index.prefix('toolkitindexer.')]
+        self.assertEqual(names, ['ToolkitIndexer.update_files', 'ToolkitIndexer.update_index'])
+        self.assertEqual(len(self.index.prefix('', limit=None)), 6)
+        self.assertEqual(self.index.prefix('zzz'), [])
+        
+    def test_fuzzy(self):
+        """Test trigram ranking tolerates typos"""
+        results = self.index.fuzzy('IndxWatcher')
+        self.assertEqual(results[0][0].name, 'IndexWatcher')
+        self.assertLess(results[0][1], 1.0)
+        
+        results = self.index.fuzzy('update_index')
+        self.assertEqual(results[0], (self.index.lookup('ToolkitIndexer.update_index')[0], 1.0))
+        self.assertEqual(self.index.fuzzy('qqqq'), [])
+        
+    def test_incremental_update(self):
+        """Test replacing and removing the symbols of a file"""
+        self.index.update_file('tools/watcher.py', [['IndexWatcher', 'class', 7], ['PollingSource', 'class', 50]])
+        self.assertEqual(self.index.lookup('IndexWatcher')[0].line, 7)
+        self.assertEqual(self.index.lookup('IndexWatcher.flush'), [])
+        self.assertEqual([s.name for s in self.index.prefix('poll')], ['PollingSource'])
+        self.assertEqual([s.name for s in self.index.in_file('tools/watcher.py')], ['IndexWatcher', 'PollingSource'])
+        
+        self.index.remove_file('tools/watcher.py')
+        self.assertEqual(self.index.prefix('poll'), [])
+        self.assertEqual(self.index.fuzzy('PollingSource'), [])
+        self.assertEqual(len(self.index), 4)
+
+class TestIndexerSymbols(LLMTestCase):
+    """Test cases for symbols recorded by ToolkitIndexer"""
+    
+    def setUp(self):
+        """Create a temporary toolkit"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.write_file('pkg/shapes.py', 'class Shape:\n    class Meta:\n        pass\n\n    def area(self):\n        def helper():\n            pass\n\ndef make_shape():\n    pass\n')
+        
+    def write_file(self, rel_path: str, content: str):
+        """Write a file in the temporary toolkit"""
+        path = Path(self.temp_dir) / rel_path
+        os.makedirs(path.parent, exist_ok=True)
+        path.write_text(content)
+        
+    def test_symbols_recorded_and_kept_current(self):
+        """Test that the indexer records symbols and updates its symbol index"""
+        indexer = ToolkitIndexer(self.temp_dir)
+        indexer.update_index()
+        rel_path = os.path.join('pkg', 'shapes.py')
+        self.assertEqual(indexer.components[rel_path]['symbols'], [
+            ['Shape', 'class', 1], ['Shape.Meta', 'class', 2], ['Shape.area', 'method', 5],
+            ['Shape.area.helper', 'function', 6], ['make_shape', 'function', 9]])
+        
+        symbols = ToolkitIndexer(self.temp_dir).symbol_index()
+        self.assertEqual(symbols.lookup('Shape.area')[0].line, 5)
+        
+        self.write_file('pkg/shapes.py', 'class Circle:\n    pass\n')
+        self.write_file('pkg/extra.py', 'def make_circle():\n    pass\n')
+        symbols = indexer.symbol_index()
+        indexer.update_files(['pkg/shapes.py'])
+        indexer.update_index()
+        self.assertEqual(symbols.lookup('Shape'), [])
+        self.assertEqual([s.name for s in symbols.prefix('make_')], ['make_circle'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Tests for compact symbol storage"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ai_toolkit.code_analyzer import CodeAnalyzer, CodeSymbol, ResolvedSymbol
+from ai_toolkit.symbol_store import CompactSymbol, StringTable, SymbolStore
+from ai_toolkit.tests.test_base import LLMTestCase
+
+SOURCE = '''"""Module docstring."""
+import os
+from pathlib import Path
+
+class Base:
+    """Base docstring."""
+    def run(self):
+        """Run docstring."""
+        return os.getcwd()
+
+class Child(Base):
+    def go(self):
+        return self.run()
+
+def helper():
+    return Path('.')
+'''
+
+class TestSymbolStore(LLMTestCase):
+    """Test cases for SymbolStore and CompactSymbol"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        for name in ('a.py', 'b.py'):
+            with open(os.path.join(self.temp_dir, name), 'w') as f:
+                f.write(SOURCE)
+        self.analyzer = CodeAnalyzer(self.temp_dir)
+        self.store = SymbolStore(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_string_table(self):
+        """Test that equal strings share one ID and one object"""
+        table = StringTable()
+        first = table.id('name')
+        self.assertEqual(table.id(''.join(['na', 'me'])), first)
+        self.assertEqual(table[first], 'name')
+        self.assertIs(table.intern(''.join(['na', 'me'])), table[first])
+        self.assertIsNone(table.intern(None))
+        self.assertEqual(len(table), 1)
+
+    def test_compact_symbols_match(self):
+        """Test that compact symbols expose the same data as CodeSymbol"""
+        context = self.analyzer.analyze_file('a.py')
+        compact = self.store.compact_context(context)
+
+        self.assertEqual(set(compact.symbols), set(context.symbols))
+        for name, symbol in context.symbols.items():
+            self.assertIsInstance(compact.symbols[name], CompactSymbol)
+            self.assertEqual(compact.symbols[name].to_symbol(), symbol)
+        self.assertEqual(compact.import_map, context.import_map)
+        self.assertEqual(compact.imports, context.imports)
+
+    def test_strings_shared_across_files(self):
+        """Test that names from different files are interned once"""
+        a = self.store.compact_context(self.analyzer.analyze_file('a.py'))
+        size = len(self.store.strings)
+        b = self.store.compact_context(self.analyzer.analyze_file('b.py'))
+
+        self.assertEqual(len(self.store.strings), size)
+        self.assertIs(a.symbols['Child.go'].name, b.symbols['Child.go'].name)
+        self.assertIs(a.symbols['Child.go'].parent, b.symbols['Child.go'].parent)
+
+    def test_docstring(self):
+        """Test that docstrings are the analyzed ones, not the current source"""
+        symbols = self.store.compact_context(self.analyzer.analyze_file('a.py')).symbols
+        self.assertEqual(symbols['Base.run'].docstring, 'Run docstring.')
+        self.assertEqual(symbols['Base'].docstring, 'Base docstring.')
+        self.assertIsNone(symbols['helper'].docstring)
+
+        with open(os.path.join(self.temp_dir, 'a.py'), 'w') as f:
+            f.write(SOURCE.replace('Run docstring.', 'Edited docstring.'))
+        self.assertEqual(symbols['Base.run'].docstring, 'Run docstring.')
+        os.remove(os.path.join(self.temp_dir, 'a.py'))
+        self.assertEqual(symbols['Base.run'].docstring, 'Run docstring.')
+
+    def test_docstring_other_language(self):
+        """Test that docstrings of symbols from non-Python sources are kept"""
+        symbol = CodeSymbol(name='add', type='function', line_number=2, end_line=4,
+                            docstring='Adds two numbers.', parent=None,
+                            dependencies=frozenset(), references=frozenset())
+        compact = self.store.compact_symbols('math.js', [symbol])['add']
+        self.assertEqual(compact.docstring, 'Adds two numbers.')
+        self.assertEqual(compact.to_symbol(), symbol)
+
+    def test_compact_analyzer(self):
+        """Test that resolution and slicing work on compact storage"""
+        analyzer = CodeAnalyzer(self.temp_dir, compact=True)
+        deps = analyzer.resolve_symbol_dependencies('a.py', 'Child.go')
+        self.assertEqual(deps['self.run'], ResolvedSymbol('a.py', 'Base.run'))
+        self.assertEqual(
+            analyzer.slice_context('a.py', symbol_name='Child.go').render(),
+            self.analyzer.slice_context('a.py', symbol_name='Child.go').render()
+        )
+
+if __name__ == '__main__':
+    unittest.main()
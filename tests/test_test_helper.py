@@ -1,10 +1,14 @@
+import ast
 import unittest
 from pathlib import Path
 import tempfile
 import os
+import sys
 import shutil
+from unittest import mock
 
-from ai_toolkit.test_helper import TestHelper, TestCase, TestAnalysis
+from ai_toolkit import test_helper
+from ai_toolkit.test_helper import TestHelper, TestCase, TestAnalysis, TestSuiteReport, TestVisitor
 
 class TestTestHelper(unittest.TestCase):
     """Test cases for TestHelper"""
@@ -114,5 +118,131 @@ class TestCalculator(unittest.TestCase):
         self.assertIn('class TestCalculator(unittest.TestCase):', content)
         self.assertIn('def setUp(self):', content)
         
+    def test_visitor_single_pass(self):
+        """Test that nested helpers are counted once with lightweight assertion records"""
+        tree = ast.parse('''class TestNested(unittest.TestCase):
+    def setUp(self):
+        def make():
+            self.helper_value = 1
+        make()
+        
+    def test_outer(self):
+        def check(value):
+            self.assertTrue(value)
+        check(self.helper_value)
+''')
+        visitor = TestVisitor()
+        visitor.visit(tree)
+        
+        self.assertEqual(visitor.total_functions, 1)
+        self.assertEqual(visitor.tested_functions, 1)
+        self.assertEqual(visitor.assertions, [('assertTrue', 9)])
+        self.assertIn('helper_value', visitor.setup_vars)
+        self.assertIn('helper_value', visitor.used_vars)
+        
+    def test_measure_line_coverage(self):
+        """Test measuring real line coverage by running the test file"""
+        sys.modules.pop('calculator', None)
+        self.addCleanup(sys.modules.pop, 'calculator', None)
+        
+        report = self.helper.measure_line_coverage(self.test_file)
+        
+        self.assertEqual(report.tests_run, 2)
+        self.assertEqual(list(report.files), ['calculator.py'])
+        calculator = report.files['calculator.py']
+        self.assertIn(17, calculator.missing)  # subtract() is never called
+        self.assertNotIn(12, calculator.missing)  # add() is
+        
+        analysis = self.helper.analyze_test_file(self.test_file, line_coverage=True)
+        self.assertIsNotNone(analysis.line_coverage)
+        self.assertLess(analysis.line_coverage, 100)
+        self.assertIsNone(self.helper.analyze_test_file(self.test_file).line_coverage)
+        
+    def test_analyze_test_file_cached(self):
+        """Test that unchanged files are served from the content-hash cache"""
+        with mock.patch.object(test_helper, '_analyze_test_source', wraps=test_helper._analyze_test_source) as analyze:
+            first = self.helper.analyze_test_file(self.test_file)
+            second = self.helper.analyze_test_file(self.test_file)
+            self.assertEqual(second, first)
+            self.assertEqual(analyze.call_count, 1)
+            
+            # Callers get copies, so mutating one result leaves the cache intact
+            second.unused_setup.append('mutated')
+            second.suggestions.clear()
+            self.assertEqual(self.helper.analyze_test_file(self.test_file), first)
+            
+            # Changing the content invalidates the cached analysis
+            with open(os.path.join(self.temp_dir, self.test_file), 'a') as f:
+                f.write("\n# trailing comment\n")
+            self.helper.analyze_test_file(self.test_file)
+            self.assertEqual(analyze.call_count, 2)
+        
+    def test_analyze_test_suite(self):
+        """Test aggregating analysis across a directory of test files"""
+        os.makedirs(os.path.join(self.temp_dir, 'suite', '__pycache__'))
+        with open(os.path.join(self.temp_dir, 'suite', 'test_more.py'), 'w') as f:
+            f.write('''import unittest
+
+class TestMore(unittest.TestCase):
+    def test_one(self):
+        self.assertTrue(True)
+        self.assertFalse(False)
+''')
+        with open(os.path.join(self.temp_dir, 'suite', 'test_broken.py'), 'w') as f:
+            f.write("def test_broken(:\n")
+        with open(os.path.join(self.temp_dir, 'suite', '__pycache__', 'test_skip.py'), 'w') as f:
+            f.write("def test_skip():\n    pass\n")
+            
+        report = self.helper.analyze_test_suite()
+        
+        self.assertIsInstance(report, TestSuiteReport)
+        self.assertEqual(set(report.files), {'test_calculator.py', 'suite/test_more.py'})
+        self.assertIn('suite/test_broken.py', report.errors)
+        self.assertEqual(report.total_tests, 3)
+        self.assertAlmostEqual(report.coverage, 2 / 3 * 100)
+        self.assertAlmostEqual(report.assertion_density, 1.0)
+        self.assertEqual(report.unused_setup, {'test_calculator.py': ['unused_var']})
+        
+    def test_tolerant_analysis(self):
+        """Test analyzing and generating from files with syntax errors"""
+        with open(os.path.join(self.temp_dir, 'test_partial.py'), 'w') as f:
+            f.write("def test_broken(:\n    pass\n\ndef test_ok(self):\n    self.assertTrue(True)\n")
+        with self.assertRaises(SyntaxError):
+            self.helper.analyze_test_file('test_partial.py')
+            
+        analysis = self.helper.analyze_test_file('test_partial.py', tolerant=True)
+        self.assertEqual(analysis.test_count, 1)
+        self.assertEqual(len(analysis.parse_errors), 1)
+        
+        # The partial result is not returned by a strict analysis
+        with self.assertRaises(SyntaxError):
+            self.helper.analyze_test_file('test_partial.py')
+            
+        report = self.helper.analyze_test_suite(tolerant=True)
+        self.assertIn('test_partial.py', report.files)
+        self.assertEqual(report.errors, {})
+        
+        with open(os.path.join(self.temp_dir, self.source_file), 'a') as f:
+            f.write("\ndef broken(:\n    pass\n")
+        test_case = self.helper.generate_test_case(self.source_file, 'add', tolerant=True)
+        self.assertEqual(test_case.function_name, 'test_add')
+        
+    def test_analyze_test_suite_parallel(self):
+        """Test that pooled analysis matches serial analysis"""
+        for i in range(40):
+            with open(os.path.join(self.temp_dir, f'test_gen_{i}.py'), 'w') as f:
+                f.write(f"def test_{i}(self):\n    self.assertEqual({i}, {i})\n")
+        # Too deeply nested to parse; reported instead of aborting the run
+        with open(os.path.join(self.temp_dir, 'test_deep.py'), 'w') as f:
+            f.write("def test_deep(self):\n    assert " + "a+" * 20000 + "a\n")
+                
+        parallel = TestHelper(self.temp_dir).analyze_test_suite(max_workers=2)
+        serial = TestHelper(self.temp_dir).analyze_test_suite(max_workers=1)
+        
+        self.assertEqual(parallel.files, serial.files)
+        self.assertEqual(parallel.total_tests, 42)
+        self.assertEqual(list(parallel.errors), ['test_deep.py'])
+        self.assertTrue(parallel.errors['test_deep.py'].startswith('RecursionError'))
+        
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
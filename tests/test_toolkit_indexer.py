@@ -1,15 +1,25 @@
 """Tests for the AI Toolkit Self-Indexing System"""
 
 import unittest
+import ast
 import tempfile
 import os
 import shutil
+import json
+import multiprocessing
 from pathlib import Path
+from unittest import mock
 import xml.etree.ElementTree as ET
 
 from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer, ComponentAnalyzer
+from ai_toolkit.tools import index_store, toolkit_indexer
+from ai_toolkit.tools.index_store import LazySection
 from ai_toolkit.tests.test_base import LLMTestCase
 
+def _update_one_file(root: str, rel_path: str):
+    """Update a single file's index entry from a worker process"""
+    ToolkitIndexer(root, lazy=True).update_files([rel_path])
+
 class TestToolkitIndexer(LLMTestCase):
     """Test cases for ToolkitIndexer"""
     
@@ -127,6 +137,308 @@ class TestMyComponent(unittest.TestCase):
                 break
         self.assertTrue(found_coverage)
         
+    def test_update_index_skips_unchanged_files(self):
+        """Test that files with an unchanged fingerprint are not re-analyzed"""
+        self.indexer.update_index()
+        first = dict(self.indexer.components['src/component.py'])
+        self.assertEqual(len(first['fingerprint']), 3)
+        
+        self.indexer.update_index()
+        self.assertEqual(self.indexer.components['src/component.py'], first)
+        
+        # Touching the file changes its fingerprint and forces re-analysis
+        path = Path(self.temp_dir) / 'src/component.py'
+        stamp = path.stat().st_mtime_ns + 10 ** 9
+        os.utime(path, ns=(stamp, stamp))
+        self.indexer.update_index()
+        self.assertEqual(self.indexer.components['src/component.py']['last_update'], 3)
+        
+    def test_update_index_ignores_excluded_directories(self):
+        """Test that caches, virtualenvs and gitignored paths are not indexed"""
+        self.write_file('__pycache__/cached.py', 'x = 1\n')
+        self.write_file('vendor_env/pyvenv.cfg', 'home = /usr/bin\n')
+        self.write_file('vendor_env/lib/site.py', 'x = 1\n')
+        self.write_file('.gitignore', 'generated/\n')
+        self.write_file('generated/output.py', 'x = 1\n')
+        
+        self.indexer.update_index()
+        self.assertEqual(set(self.indexer.components), {'src/component.py', 'tests/test_component.py'})
+        
+        # Incremental updates honour the same rules
+        self.indexer.update_files(['generated/output.py'])
+        self.assertNotIn('generated/output.py', self.indexer.components)
+        
+    def test_update_index_tolerates_syntax_errors(self):
+        """Test that a broken file does not abort the update"""
+        self.write_file('src/broken.py', 'import os\n\ndef bad(:\n    pass\n\ndef fine():\n    return os.sep\n')
+        self.indexer.update_index()
+        
+        self.assertIn('src/component.py', self.indexer.components)
+        entry = self.indexer.components['src/broken.py']
+        self.assertEqual(entry['functions'], ['fine'])
+        self.assertEqual(set(self.indexer.dependencies['src/broken.py']), {'os'})
+        self.assertEqual(self.indexer.parse_errors(), {'src/broken.py': entry['errors']})
+        self.assertEqual(entry['errors'][0][0], 3)
+        
+        # Fixing the file clears its errors
+        self.write_file('src/broken.py', 'def fine():\n    return 1\n')
+        self.indexer.update_files(['src/broken.py'])
+        self.assertEqual(self.indexer.parse_errors(), {})
+        
+    def test_update_index_dispatches_by_extension(self):
+        """Test that non-Python sources are indexed by their language backend"""
+        self.write_file('web/app.ts', "import { api } from './api';\n\nexport class App {\n  start() {\n    return api();\n  }\n}\n\nexport function main() {\n  new App().start();\n}\n")
+        self.write_file('web/notes.txt', 'function ignored() {}\n')
+        self.indexer.update_index()
+        
+        self.assertIn('src/component.py', self.indexer.components)
+        self.assertNotIn('web/notes.txt', self.indexer.components)
+        entry = self.indexer.components['web/app.ts']
+        self.assertEqual(entry['classes'], ['App'])
+        self.assertEqual(set(entry['functions']), {'start', 'main'})
+        self.assertEqual(set(self.indexer.dependencies['web/app.ts']), {'./api'})
+        self.assertEqual(self.indexer.symbol_index().lookup('App.start')[0].kind, 'method')
+        
+        # Incremental updates accept the same extensions
+        self.write_file('web/app.ts', 'export function main() {}\n')
+        self.indexer.update_files(['web/app.ts'])
+        self.assertEqual(self.indexer.components['web/app.ts']['functions'], ['main'])
+        
+    def test_search_index(self):
+        """Test that the search index is saved with the index and kept up to date"""
+        self.write_file('src/loader.py', 'def load_settings(path: str) -> dict:\n    """Read YAML settings from disk."""\n')
+        self.indexer.update_index()
+        self.assertTrue(self.indexer.search_file.exists())
+        
+        search = ToolkitIndexer(self.temp_dir, lazy=True).search_index()
+        hit = search.search('yaml settings')[0]
+        self.assertEqual((hit.name, hit.file, hit.line), ('load_settings', 'src/loader.py', 1))
+        self.assertEqual(hit.signature, '(path: str) -> dict')
+        
+        # Incremental updates replace and remove a file's symbols
+        self.write_file('src/loader.py', 'def read_config():\n    """Read TOML settings."""\n')
+        self.indexer.update_files(['src/loader.py'])
+        search = ToolkitIndexer(self.temp_dir).search_index()
+        self.assertEqual([h.name for h in search.search('settings')], ['read_config'])
+        os.remove(os.path.join(self.temp_dir, 'src', 'loader.py'))
+        self.indexer.update_files(['src/loader.py'])
+        self.assertEqual(ToolkitIndexer(self.temp_dir).search_index().search('settings'), [])
+        
+    def test_search_index_rebuilt_when_missing(self):
+        """Test that an index saved without a search file gets one on first search"""
+        self.indexer.update_index()
+        os.remove(self.indexer.search_file)
+        indexer = ToolkitIndexer(self.temp_dir, lazy=True)
+        self.assertIn('MyComponent', [hit.name for hit in indexer.search_index().search('component')])
+        self.assertTrue(indexer.search_file.exists())
+        
+        # A file changed since it was indexed is not backfilled from its new contents
+        os.remove(self.indexer.search_file)
+        self.write_file('src/component.py', 'class Renamed:\n    """A test component."""\n')
+        search = ToolkitIndexer(self.temp_dir).search_index()
+        self.assertIsNone(search.fingerprint(os.path.join('src', 'component.py')))
+        self.assertNotIn('Renamed', [hit.name for hit in search.search('component')])
+        
+    def test_update_index_parallel_matches_serial(self):
+        """Test that pooled analysis produces the same index as serial analysis"""
+        for i in range(12):
+            self.write_file(f'pkg/mod_{i}.py', f'import os\nfrom src.component import MyComponent\n\nclass Thing{i}(MyComponent):\n    def run(self):\n        pass\n\n    def stop(self):\n        pass\n\nclass Other{i}:\n    pass\n')
+            self.write_file(f'tests/test_mod_{i}.py', f'import unittest\n\nclass TestThing{i}(unittest.TestCase):\n    pass\n')
+            
+        self.indexer.update_index(max_workers=1)
+        serial = ToolkitIndexer(self.temp_dir)
+        
+        os.remove(self.indexer.index_file)
+        parallel = ToolkitIndexer(self.temp_dir)
+        with mock.patch('ai_toolkit.tools.toolkit_indexer.PARALLEL_THRESHOLD', 4):
+            parallel.update_index(max_workers=2)
+            
+        self.assertEqual(parallel.components, serial.components)
+        self.assertEqual(parallel.dependencies, serial.dependencies)
+        self.assertEqual(parallel.test_coverage, serial.test_coverage)
+        self.assertEqual(len(parallel.components), 26)
+        
+    def test_test_coverage_sets(self):
+        """Test that coverage entries are deduplicated, pruned and saved as lists"""
+        self.write_file('tests/test_other.py', 'class TestMyComponent:\n    pass\n')
+        self.indexer.update_index()
+        test_path = os.path.join('tests', 'test_component.py')
+        other_path = os.path.join('tests', 'test_other.py')
+        self.assertEqual(list(self.indexer.test_coverage['MyComponent']), [test_path, other_path])
+        
+        # Paths are shared between the component keys and coverage entries
+        component_key = next(k for k in self.indexer.components if k == test_path)
+        coverage_key = next(iter(self.indexer.test_coverage['MyComponent']))
+        self.assertIs(component_key, coverage_key)
+        
+        os.remove(Path(self.temp_dir) / other_path)
+        self.indexer.update_files([test_path])
+        self.indexer.update_index()
+        self.assertEqual(list(self.indexer.test_coverage['MyComponent']), [test_path])
+        
+        with open(self.indexer.index_file) as f:
+            saved = json.load(f)
+        self.assertEqual(saved['test_coverage']['MyComponent'], [test_path])
+        reloaded = ToolkitIndexer(self.temp_dir)
+        self.assertEqual(reloaded.test_coverage, self.indexer.test_coverage)
+        
+    def test_lazy_loading(self):
+        """Test that a lazy indexer reads sections and decodes entries on demand"""
+        self.write_file('src/other.py', 'from src.component import MyComponent\n')
+        self.indexer.update_index()
+        eager = ToolkitIndexer(self.temp_dir)
+        
+        lazy = ToolkitIndexer(self.temp_dir, lazy=True)
+        self.assertIsInstance(lazy.components, LazySection)
+        self.assertFalse(lazy.components.loaded)
+        self.assertEqual(lazy.update_counter, 1)
+        
+        # A no-change update compares stored fingerprints without decoding entries
+        lazy.update_index()
+        self.assertTrue(all(lazy.components.is_raw(k) for k in lazy.components))
+        
+        # Updating one file only decodes what it touches
+        self.write_file('src/other.py', 'import json\n')
+        lazy.update_files(['src/other.py'])
+        component_path = os.path.join('src', 'component.py')
+        self.assertTrue(lazy.components.is_raw(component_path))
+        
+        reloaded = ToolkitIndexer(self.temp_dir)
+        self.assertEqual(reloaded.components[component_path], eager.components[component_path])
+        self.assertEqual(reloaded.dependencies[os.path.join('src', 'other.py')], {'json'})
+        self.assertEqual(dict(ToolkitIndexer(self.temp_dir, lazy=True).test_coverage), reloaded.test_coverage)
+        
+    def test_lazy_reads_touched_sections_only(self):
+        """Test that a lazy section reads only its own span until the index is replaced"""
+        self.indexer.update_index()
+        lazy = ToolkitIndexer(self.temp_dir, lazy=True)
+        spans = []
+        def read_section_stamped(path, span, stamp):
+            spans.append(span)
+            return index_store.read_section_stamped(path, span, stamp)
+        
+        with mock.patch.object(toolkit_indexer, 'read_section_stamped', side_effect=read_section_stamped), \
+                mock.patch.object(toolkit_indexer, 'read_sections', wraps=index_store.read_sections) as read_all:
+            self.assertEqual(dict(lazy.test_coverage), self.indexer.test_coverage)
+            self.assertEqual(spans, [lazy._layout['test_coverage']])
+            self.assertFalse(lazy.components.loaded)
+            read_all.assert_not_called()
+            
+            # Another process rewrites the index before the next section is read
+            self.write_file('src/late.py', 'class Late:\n    pass\n')
+            ToolkitIndexer(self.temp_dir).update_index()
+            late = os.path.join('src', 'late.py')
+            self.assertIn(late, lazy.components)
+            self.assertEqual(read_all.call_count, 1)
+            self.assertIn(late, lazy.dependencies)
+            self.assertEqual(read_all.call_count, 1)
+            
+        # The loaded stamp is kept, so saving merges with the replaced file
+        self.write_file('src/other.py', 'import json\n')
+        lazy.update_files(['src/other.py'])
+        saved = ToolkitIndexer(self.temp_dir)
+        self.assertIn(late, saved.components)
+        self.assertEqual(saved.dependencies[os.path.join('src', 'other.py')], {'json'})
+        self.assertEqual(saved.update_counter, 3)
+        
+    def test_lazy_sections_from_one_version(self):
+        """Test that lazy sections read after the index is replaced all come from one version"""
+        self.indexer.update_index()
+        lazy = ToolkitIndexer(self.temp_dir, lazy=True)
+        
+        # Another process rewrites the index before any section is read
+        self.write_file('src/late.py', 'class Late:\n    pass\n')
+        ToolkitIndexer(self.temp_dir).update_index()
+        
+        late = os.path.join('src', 'late.py')
+        self.assertIn(late, lazy.dependencies)
+        self.assertEqual(lazy.components[late]['classes'], ['Late'])
+        self.assertEqual(set(lazy._fingerprints), set(lazy.components))
+        self.assertEqual(lazy.update_counter, 2)
+        lazy.update_files([late])
+        self.assertEqual(ToolkitIndexer(self.temp_dir).update_counter, 3)
+        
+    def test_lazy_loading_old_layout(self):
+        """Test that lazy mode falls back to a full load for plain JSON indexes"""
+        with open(self.indexer.index_file, 'w') as f:
+            json.dump({'components': {'src/component.py': {'classes': ['MyComponent']}},
+                       'dependencies': {'src/component.py': ['os']}}, f, indent=4)
+        lazy = ToolkitIndexer(self.temp_dir, lazy=True)
+        self.assertEqual(lazy.components, {'src/component.py': {'classes': ['MyComponent']}})
+        self.assertEqual(lazy.dependencies, {'src/component.py': {'os'}})
+        
+    def test_concurrent_updates_merge(self):
+        """Test that updates saved by another indexer are merged, not overwritten"""
+        self.indexer.update_index()
+        first = ToolkitIndexer(self.temp_dir, lazy=True)
+        second = ToolkitIndexer(self.temp_dir)
+        
+        self.write_file('src/first.py', 'class First:\n    pass\n')
+        self.write_file('tests/test_second.py', 'class TestSecond:\n    pass\n')
+        os.remove(Path(self.temp_dir) / 'tests/test_component.py')
+        first.update_files(['src/first.py', 'tests/test_component.py'])
+        second.update_files(['tests/test_second.py'])
+        
+        saved = ToolkitIndexer(self.temp_dir)
+        self.assertEqual(set(saved.components), {
+            os.path.join('src', 'component.py'),
+            os.path.join('src', 'first.py'),
+            os.path.join('tests', 'test_second.py')
+        })
+        self.assertEqual(list(saved.test_coverage['Second']), [os.path.join('tests', 'test_second.py')])
+        self.assertEqual(list(saved.test_coverage['MyComponent']), [])
+        self.assertEqual(saved.update_counter, 3)
+        self.assertEqual(second.components, saved.components)
+        
+    def test_concurrent_processes(self):
+        """Test that indexers saving from several processes lose no updates"""
+        self.indexer.update_index()
+        for i in range(6):
+            self.write_file(f'src/worker_{i}.py', f'class Worker{i}:\n    pass\n')
+        with multiprocessing.get_context('fork').Pool(3) as pool:
+            pool.starmap(_update_one_file, [(self.temp_dir, f'src/worker_{i}.py') for i in range(6)])
+            
+        saved = ToolkitIndexer(self.temp_dir)
+        self.assertEqual(len(saved.components), 8)
+        self.assertEqual(saved.update_counter, 7)
+        leftovers = [name for name in os.listdir(self.temp_dir) if name.endswith('.tmp')]
+        self.assertEqual(leftovers, [])
+        
+    def test_select_tests(self):
+        """Test selecting tests through the reverse dependency graph"""
+        self.write_file('src/base.py', 'class Base:\n    pass\n')
+        self.write_file('src/service.py', 'from src.base import Base\n\nclass Service(Base):\n    pass\n')
+        self.write_file('tests/test_service.py', 'import unittest\nimport src.service\n')
+        self.indexer.update_index()
+        
+        # Direct dependency
+        self.assertEqual(
+            self.indexer.select_tests(['src/component.py']),
+            ['tests/test_component.py']
+        )
+        
+        # Transitive dependency through src/service.py, absolute paths accepted
+        self.assertEqual(
+            self.indexer.select_tests([Path(self.temp_dir) / 'src/base.py']),
+            ['tests/test_service.py']
+        )
+        
+        # A changed test file selects itself; unrelated files select nothing
+        self.assertEqual(self.indexer.select_tests(['tests/test_service.py']), ['tests/test_service.py'])
+        self.assertEqual(self.indexer.select_tests(['README.md']), [])
+        
+    def test_select_tests_submodule_and_relative_imports(self):
+        """Test that 'from pkg import mod' and 'from . import mod' select dependent tests"""
+        self.write_file('lib/mod.py', 'def run():\n    pass\n')
+        self.write_file('lib/helpers.py', 'from . import mod\n')
+        self.write_file('lib/sub/deep.py', 'from ..helpers import *\n')
+        self.write_file('tests/test_mod.py', 'from lib import mod\n')
+        self.write_file('tests/test_deep.py', 'from lib.sub import deep\n')
+        self.indexer.update_index()
+        
+        self.assertEqual(self.indexer.select_tests(['lib/mod.py']), ['tests/test_deep.py', 'tests/test_mod.py'])
+        self.assertEqual(self.indexer.select_tests(['lib/helpers.py']), ['tests/test_deep.py'])
+        
     def test_extract_tested_components(self):
         """Test extracting tested components from test file"""
         analysis = {
@@ -156,6 +468,12 @@ from typing import Dict, List
         self.assertIn('typing.Dict', analyzer.imports)
         self.assertIn('typing.List', analyzer.imports)
         
+    def test_analyze_from_import_dependencies(self):
+        """Test submodule candidates and relative imports in dependencies"""
+        analyzer = ComponentAnalyzer('test_module')
+        analyzer.visit(ast.parse('from pkg import mod\nfrom . import sibling\nfrom ..up import name\nfrom __future__ import annotations\n'))
+        self.assertEqual(analyzer.dependencies, {'pkg', 'pkg.mod', '.sibling', '..up', '..up.name'})
+        
     def test_analyze_classes(self):
         """Test analyzing class definitions"""
         code = '''
@@ -191,5 +509,68 @@ class MyClass:
             {'standalone_function', 'method'}
         )
 
+    def test_qualified_symbols(self):
+        """Test qualified names for methods, nested scopes and async definitions"""
+        code = '''
+class Outer:
+    class Inner:
+        def method(self):
+            pass
+            
+    async def fetch(self):
+        def helper():
+            pass
+            
+async def main():
+    pass
+'''
+        analyzer = ComponentAnalyzer('test_module')
+        analyzer.visit(ast.parse(code))
+        
+        self.assertEqual(analyzer.symbols, [
+            ('Outer', 'class', 2),
+            ('Outer.Inner', 'class', 3),
+            ('Outer.Inner.method', 'method', 4),
+            ('Outer.fetch', 'async method', 7),
+            ('Outer.fetch.helper', 'function', 8),
+            ('main', 'async function', 11),
+        ])
+        self.assertEqual(analyzer.functions, {'method', 'fetch', 'helper', 'main'})
+        
+    def test_call_edges(self):
+        """Test call edges with alias expansion and self resolution"""
+        code = '''
+import os.path as osp
+from pkg.util import helper as h, other
+
+def run(x):
+    h(x)
+    osp.join(x)
+    print(len(x))
+    return Worker().start()
+
+class Worker:
+    @staticmethod
+    def start(arg=other()):
+        self.stop()
+        
+    def stop(self):
+        self.start()
+
+run(1)
+'''
+        analyzer = ComponentAnalyzer('test_module')
+        analyzer.visit(ast.parse(code))
+        
+        self.assertEqual(analyzer.calls, [
+            ('run', 'pkg.util.helper', 6),
+            ('run', 'os.path.join', 7),
+            ('run', 'Worker', 9),
+            ('Worker', 'pkg.util.other', 13),
+            ('Worker.start', 'Worker.stop', 14),
+            ('Worker.stop', 'Worker.start', 17),
+            ('<module>', 'run', 19),
+        ])
+        
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -8,12 +8,35 @@ import functools
 import os
 import logging
 from pathlib import Path
-from typing import Optional, Callable, Union
+from typing import Optional, Callable, Set, Union
 
 from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
 
 logger = logging.getLogger(__name__)
 
+# Environment variable listing toolkit roots (os.pathsep separated) whose index
+# updates are deferred, e.g. by parallel test workers; the runner applies them once
+DEFER_ENV = 'AI_TOOLKIT_DEFER_INDEX'
+
+# Roots whose update was skipped because it was deferred
+_deferred_roots: Set[str] = set()
+
+def _deferred_root(root) -> Optional[str]:
+    """Return the normalized root if updates to it are currently deferred."""
+    deferred = os.environ.get(DEFER_ENV)
+    if not deferred or not isinstance(root, (str, Path)):
+        return None
+    root = os.path.abspath(root)
+    if root in {os.path.abspath(p) for p in deferred.split(os.pathsep) if p}:
+        return root
+    return None
+
+def pop_deferred_roots() -> Set[str]:
+    """Return and clear the roots whose index updates were deferred."""
+    roots = set(_deferred_roots)
+    _deferred_roots.clear()
+    return roots
+
 def auto_index(func: Optional[Callable] = None, *, toolkit_root: Optional[Union[str, Path]] = None):
     """Decorator that updates the toolkit index after running tests.
     
@@ -40,7 +63,11 @@ def auto_index(func: Optional[Callable] = None, *, toolkit_root: Optional[Union[
                 # Only update index if test passes
                 root = toolkit_root or os.getcwd()
                 try:
-                    indexer = ToolkitIndexer(root)
+                    indexer = ToolkitIndexer(root, lazy=True)
+                    deferred = _deferred_root(indexer.root)
+                    if deferred:
+                        _deferred_roots.add(deferred)
+                        return result
                     indexer.update_index()
                     logger.info(f"Updated codebase index for {root}")
                 except Exception as e:
@@ -102,10 +129,15 @@ def auto_index_class(cls: Optional[type] = None, *, toolkit_root: Optional[Union
         # Store the wrapped methods on the class for child classes to check
         test_cls._auto_index_wrapped_methods = wrapped_methods
         
-        # Create a new __init_subclass__ to handle child class methods
-        original_init_subclass = getattr(test_cls, '__init_subclass__', lambda *args, **kwargs: None)
+        # Create a new __init_subclass__ to handle child class methods. The
+        # original hook must be bound to the child class, not test_cls, so base
+        # class hooks (e.g. LLMTestCase's method wrapping) see the new methods
+        original_init_subclass = test_cls.__dict__.get('__init_subclass__')
         def __init_subclass__(cls, **kwargs):
-            original_init_subclass(**kwargs)
+            if original_init_subclass is not None:
+                original_init_subclass.__get__(None, cls)(**kwargs)
+            else:
+                super(test_cls, cls).__init_subclass__(**kwargs)
             # Wrap any new test methods in the child class
             for name, attr in cls.__dict__.items():
                 if name.startswith('test_') and callable(attr):
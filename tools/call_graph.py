@@ -0,0 +1,320 @@
+#AI Toolkit Call Graph
+#
+#This module turns the call edges recorded by ComponentAnalyzer into a
+#workspace call graph. Nodes are symbols ('file:Qualified.name', with
+#'file:<module>' for module-level code) and edges are call sites. Callees
+#are resolved through enclosing scopes, module names and the workspace
+#symbol table once, and adjacency is stored in CSR integer arrays with the
+#call-site lines alongside, so callers/callees lookups are slices and
+#reachability stays linear across millions of edges.
+#
+
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ai_toolkit.tools.dependency_graph import module_names
+
+MODULE_NODE = '<module>'
+
+@dataclass(frozen=True)
+class CallSite:
+    """A call from one symbol to another"""
+    caller: str  # Node name, e.g. 'pkg/app.py:App.run'
+    callee: str
+    line: int  # Line of the call in the caller's file
+
+def node_name(rel_path: str, symbol: str) -> str:
+    """Return the call graph node name of a symbol defined in a file."""
+    return f"{rel_path}:{symbol}"
+
+def _sort_edges(n: int, keys: Sequence[int], others: Sequence[int]) -> Tuple[array, List[int]]:
+    """Order edges by (key, other), keeping input order among equal pairs.
+
+    Returns:
+        (offsets, order): CSR offsets over keys, and edge indices in sorted order
+    """
+    # Sorting plain integers that pack (key, other, edge index) is much
+    # faster than sorting indices with a key function
+    count = len(keys)
+    packed = sorted([(key * n + other) * count + edge for edge, (key, other) in enumerate(zip(keys, others))])
+    order = [value % count for value in packed]
+    offsets = array('i', [0]) * (n + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+    return offsets, order
+
+class CallGraph:
+    """Directed call graph over the symbols of an indexed workspace.
+
+    A callee name recorded in a file is resolved, in order, to a function
+    nested in the calling function's scopes, a symbol of the same file, a
+    symbol of a workspace module the name is prefixed with ('pkg.mod.func')
+    or the only workspace symbol with that qualified name. Calling a class
+    resolves to its __init__ when it has one. Calls that resolve to nothing
+    (builtins, methods of unknown objects, other packages) are counted in
+    `unresolved`; names matching several files link to all of them.
+
+    Forward and reverse edges are CSR arrays sorted by target: the edges of
+    node i are targets[offsets[i]:offsets[i + 1]], with the call-site line
+    of each in a parallel array.
+    """
+
+    def __init__(self, components: Mapping[str, Dict]):
+        """Build the graph from ToolkitIndexer.components.
+
+        Args:
+            components: Map of file path to its index entry ('symbols' as
+                       [name, kind, line] and 'calls' as [caller, callee, line])
+        """
+        entries = list(components.items())
+        self.nodes: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        kinds_by_file: Dict[str, Dict[str, str]] = {}
+        nodes_by_file: Dict[str, Dict[str, int]] = {}  # Name -> node of the symbol itself
+        local_by_file: Dict[str, Dict[str, int]] = {}  # Name -> node called for it
+        nested_by_file: Dict[str, Set[str]] = {}  # Short names of functions nested in functions
+        modules: Dict[str, List[str]] = {}
+        for rel_path, entry in entries:
+            kinds = {MODULE_NODE: 'module'}
+            for name, kind, _ in entry.get('symbols', ()):
+                kinds[name] = kind
+            kinds_by_file[rel_path] = kinds
+            own = nodes_by_file[rel_path] = {}
+            for name in kinds:
+                node = own[name] = len(self.nodes)
+                self.nodes.append(node_name(rel_path, name))
+                self.ids[self.nodes[-1]] = node
+                if name != MODULE_NODE:
+                    self._by_name.setdefault(name, []).append(node)
+            local = local_by_file[rel_path] = {}
+            nested = nested_by_file[rel_path] = set()
+            for name, kind in kinds.items():
+                if name == MODULE_NODE:
+                    continue
+                init = f"{name}.__init__"
+                local[name] = own[init] if kind == 'class' and init in own else own[name]
+                parent, _, short = name.rpartition('.')
+                if parent and kinds.get(parent, 'class') != 'class':
+                    nested.add(short)
+            if rel_path.endswith('.py'):
+                for module in module_names(rel_path):
+                    modules.setdefault(module, []).append(rel_path)
+
+        sources, targets, lines = [], [], []
+        add_source, add_target, add_line = sources.append, targets.append, lines.append
+        self.unresolved = 0
+        resolved: Dict[str, List[int]] = {}  # Callees not defined in the calling file
+        for rel_path, entry in entries:
+            kinds, local, nested = kinds_by_file[rel_path], local_by_file[rel_path], nested_by_file[rel_path]
+            own = nodes_by_file[rel_path]
+            for caller, callee, line in entry.get('calls', ()):
+                source = own.get(caller)
+                if source is None:
+                    continue
+                found = None
+                if callee in nested and caller != MODULE_NODE:
+                    found = self._resolve_nested(kinds, local, caller, callee)
+                if found is None:
+                    node = local.get(callee)
+                    if node is not None:
+                        found = (node,)
+                    else:
+                        found = resolved.get(callee)
+                        if found is None:
+                            found = resolved[callee] = self._resolve(callee, local_by_file, modules)
+                if not found:
+                    self.unresolved += 1
+                for target in found:
+                    add_source(source)
+                    add_target(target)
+                    add_line(line)
+
+        n = len(self.nodes)
+        self._offsets, order = _sort_edges(n, sources, targets)
+        self._targets = array('i', map(targets.__getitem__, order))
+        self._lines = array('i', map(lines.__getitem__, order))
+        self._reverse_offsets, order = _sort_edges(n, targets, sources)
+        self._reverse_targets = array('i', map(sources.__getitem__, order))
+        self._reverse_lines = array('i', map(lines.__getitem__, order))
+
+    @staticmethod
+    def _resolve_nested(kinds: Dict[str, str], local: Dict[str, int], caller: str, callee: str) -> Optional[Tuple[int]]:
+        """Resolve a callee to a function nested in the caller's function scopes."""
+        scopes = caller.split('.')
+        for i in range(len(scopes), 0, -1):
+            prefix = '.'.join(scopes[:i])
+            if kinds.get(prefix, 'class') == 'class':
+                continue  # Class bodies are not enclosing scopes for their methods
+            node = local.get(f"{prefix}.{callee}")
+            if node is not None:
+                return (node,)
+        return None
+
+    def _resolve(self, callee: str, local_by_file: Dict[str, Dict[str, int]],
+                 modules: Dict[str, List[str]]) -> List[int]:
+        """Resolve a callee not defined in the calling file to its definitions."""
+        parts = callee.split('.')
+        for split in range(len(parts) - 1, 0, -1):
+            files = self._module_files(modules, parts[:split])
+            if files:
+                name = '.'.join(parts[split:])
+                found = [local_by_file[f][name] for f in files if name in local_by_file[f]]
+                if found:
+                    return found
+        ids = self._by_name.get(callee, ())
+        return list(ids) if len(ids) == 1 else []
+
+    @staticmethod
+    def _module_files(modules: Dict[str, List[str]], parts: List[str]) -> Optional[List[str]]:
+        """Find the files a module name refers to by its longest known suffix."""
+        for start in range(len(parts)):
+            files = modules.get('.'.join(parts[start:]))
+            if files:
+                return files
+        return None
+
+    @classmethod
+    def from_index(cls, indexer) -> 'CallGraph':
+        """Build the graph for a ToolkitIndexer's current index."""
+        return cls(indexer.components)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.ids or symbol in self._by_name
+
+    @property
+    def edge_count(self) -> int:
+        """Number of resolved call sites."""
+        return len(self._targets)
+
+    def _node_ids(self, symbol: str) -> List[int]:
+        """Nodes for a node name ('file:Qualified.name') or for every definition of a qualified name.
+
+        Raises:
+            KeyError: If the symbol is not in the graph
+        """
+        node = self.ids.get(symbol)
+        if node is not None:
+            return [node]
+        ids = self._by_name.get(symbol)
+        if not ids:
+            raise KeyError(f"Symbol not in call graph: {symbol}")
+        return ids
+
+    def _sites(self, symbol: str, reverse: bool) -> List[CallSite]:
+        offsets, targets, lines = ((self._reverse_offsets, self._reverse_targets, self._reverse_lines) if reverse
+                                   else (self._offsets, self._targets, self._lines))
+        sites = []
+        for node in self._node_ids(symbol):
+            for pos in range(offsets[node], offsets[node + 1]):
+                other = self.nodes[targets[pos]]
+                if reverse:
+                    sites.append(CallSite(other, self.nodes[node], lines[pos]))
+                else:
+                    sites.append(CallSite(self.nodes[node], other, lines[pos]))
+        return sites
+
+    def callees(self, symbol: str) -> List[CallSite]:
+        """Calls made directly by a symbol, grouped by callee."""
+        return self._sites(symbol, reverse=False)
+
+    def callers(self, symbol: str) -> List[CallSite]:
+        """Calls made directly to a symbol, grouped by caller."""
+        return self._sites(symbol, reverse=True)
+
+    def _distances(self, starts: List[int], reverse: bool, max_depth: Optional[int]) -> array:
+        """Breadth-first call distances from the start nodes; -1 where unreached."""
+        offsets, targets = ((self._reverse_offsets, self._reverse_targets) if reverse
+                            else (self._offsets, self._targets))
+        distance = array('i', [-1]) * len(self.nodes)
+        queue = deque()
+        for node in starts:
+            distance[node] = 0
+            queue.append(node)
+        while queue:
+            node = queue.popleft()
+            next_distance = distance[node] + 1
+            if max_depth is not None and next_distance > max_depth:
+                continue
+            for target in targets[offsets[node]:offsets[node + 1]]:
+                if distance[target] == -1:
+                    distance[target] = next_distance
+                    queue.append(target)
+        return distance
+
+    def reachable(self, symbol: str, max_depth: Optional[int] = None, reverse: bool = False) -> Dict[str, int]:
+        """Everything a symbol calls, directly or transitively, with call distances.
+
+        Args:
+            symbol: Node name or qualified name (all its definitions)
+            max_depth: Follow at most this many calls
+            reverse: Follow callers instead, i.e. everything that can reach the symbol
+
+        Returns:
+            Map of node name to the fewest calls needed to reach it; the
+            symbol itself is left out
+        """
+        starts = self._node_ids(symbol)
+        distance = self._distances(starts, reverse, max_depth)
+        for node in starts:
+            distance[node] = -1
+        return {self.nodes[i]: d for i, d in enumerate(distance) if d > 0}
+
+    def paths(self, source: str, target: str, max_depth: int = 10, limit: int = 100) -> List[List[str]]:
+        """Call chains from source to target without repeated symbols.
+
+        Only nodes that can still reach the target within the remaining
+        depth are explored, so the search stays within the relevant part of
+        the graph.
+
+        Args:
+            source: Entry point, as a node name or qualified name
+            target: Symbol to reach, as a node name or qualified name
+            max_depth: Longest chain, in calls
+            limit: Stop after this many paths
+
+        Returns:
+            Paths found, as lists of node names from source to target,
+            sorted shortest first
+        """
+        starts = self._node_ids(source)
+        goals = set(self._node_ids(target))
+        remaining = self._distances(list(goals), reverse=True, max_depth=max_depth)
+        offsets, targets = self._offsets, self._targets
+        paths = []
+        on_path = bytearray(len(self.nodes))
+        for start in starts:
+            if remaining[start] == -1:
+                continue
+            path = [start]
+            on_path[start] = 1
+            stack = [offsets[start]]  # Next edge to try at each depth
+            while stack and len(paths) < limit:
+                node, pos = path[-1], stack[-1]
+                if pos == offsets[node + 1]:
+                    stack.pop()
+                    on_path[path.pop()] = 0
+                    continue
+                stack[-1] = pos + 1
+                nxt = targets[pos]
+                if pos > offsets[node] and targets[pos - 1] == nxt:
+                    continue  # Another call site of the same edge
+                if on_path[nxt] or remaining[nxt] == -1 or len(path) + remaining[nxt] > max_depth:
+                    continue
+                if nxt in goals:
+                    paths.append([self.nodes[i] for i in path] + [self.nodes[nxt]])
+                    continue
+                path.append(nxt)
+                on_path[nxt] = 1
+                stack.append(offsets[nxt])
+            for node in path:
+                on_path[node] = 0
+        paths.sort(key=len)
+        return paths
@@ -0,0 +1,278 @@
+#AI Toolkit Dependency Graph
+#
+#This module turns the flat {file: module names} dependency map kept by the
+#toolkit indexer into a queryable graph over indexed files. Module names are
+#resolved to files once, and adjacency is stored in compact integer arrays
+#(CSR layout) so traversals stay linear in the size of the graph even across
+#thousands of modules.
+#
+
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Union
+
+def module_names(rel_path: str) -> List[str]:
+    """Return every dotted-module suffix a file can be imported as.
+
+    'pkg/tools/mod.py' yields 'pkg.tools.mod', 'tools.mod' and 'mod', so
+    imports relative to any package root resolve to the same file.
+    """
+    parts = Path(rel_path).with_suffix('').parts
+    return ['.'.join(parts[i:]) for i in range(len(parts))]
+
+def absolute_module(name: str, rel_path: str) -> Optional[str]:
+    """Resolve a relative module name ('.mod', '..pkg.mod') against the importing file.
+
+    Returns:
+        The dotted name from the workspace root, the name itself if it is
+        absolute, or None if it climbs above the root
+    """
+    level = len(name) - len(name.lstrip('.'))
+    if not level:
+        return name
+    package = list(Path(rel_path).parent.parts)
+    if level - 1 > len(package):
+        return None
+    parts = package[:len(package) - (level - 1)]
+    if name[level:]:
+        parts.append(name[level:])
+    return '.'.join(parts) or None
+
+class DependencyGraph:
+    """Directed graph of indexed files; an edge A -> B means A depends on B.
+
+    Forward and reverse adjacency are kept as CSR arrays: the neighbours of
+    node i are targets[offsets[i]:offsets[i + 1]]. Every query runs in
+    O(V + E).
+    """
+
+    def __init__(self, dependencies: Mapping[str, Iterable[str]], files: Optional[Iterable[str]] = None,
+                 package: Optional[str] = None):
+        """Build the graph from a dependency map.
+
+        Args:
+            dependencies: Map of file path to the module names it depends on
+            files: Additional files to include as nodes (e.g. files not yet indexed)
+            package: Name the workspace root itself is imported as, if any
+                     (e.g. 'ai_toolkit' for 'ai_toolkit.tools.mod')
+        """
+        nodes = set(dependencies)
+        if files is not None:
+            nodes.update(files)
+        self.files: List[str] = sorted(nodes)
+        self.ids: Dict[str, int] = {f: i for i, f in enumerate(self.files)}
+
+        # Map module names to files: the dotted path from the workspace root,
+        # and every suffix of two or more parts, which is rooted at a package
+        # directory (e.g. 'src/pkg/mod.py' imported as 'pkg.mod'). A bare
+        # 'mod' only names a module at the root, so 'import json' does not
+        # resolve to 'tools/json.py'
+        modules: Dict[str, List[int]] = {}
+        for node, rel_path in enumerate(self.files):
+            if rel_path.endswith('.py'):
+                names = module_names(rel_path)
+                for name in names[:max(1, len(names) - 1)]:
+                    modules.setdefault(name, []).append(node)
+
+        # Resolve each dependency to the files of its longest matching module name
+        edges: List[Set[int]] = [set() for _ in self.files]
+        self.unresolved: Dict[str, List[str]] = {}
+        for rel_path, deps in dependencies.items():
+            node = self.ids[rel_path]
+            for dep in deps:
+                name = absolute_module(dep, rel_path) if rel_path.endswith('.py') else dep
+                targets = self._resolve(modules, name, package) if name else None
+                if targets:
+                    edges[node].update(t for t in targets if t != node)
+                else:
+                    self.unresolved.setdefault(rel_path, []).append(dep)
+        for deps in self.unresolved.values():
+            deps.sort()
+
+        self._offsets, self._targets = self._compress(edges)
+        reverse: List[List[int]] = [[] for _ in self.files]
+        for node, targets in enumerate(edges):
+            for target in targets:
+                reverse[target].append(node)
+        self._reverse_offsets, self._reverse_targets = self._compress(reverse)
+
+    @staticmethod
+    def _resolve(modules: Dict[str, List[int]], name: str, package: Optional[str]) -> Optional[List[int]]:
+        """Find the files an absolute module name refers to.
+
+        Trailing parts that match no module are dropped, so 'pkg.mod.Class'
+        (from 'from pkg.mod import Class') resolves to 'pkg/mod.py'. Leading
+        parts may be dropped as long as two or more remain, for workspaces
+        installed under an outer package; the workspace's own package name
+        is stripped outright.
+        """
+        parts = name.split('.')
+        candidates = [parts]
+        if package and len(parts) > 1 and parts[0] == package:
+            candidates.append(parts[1:])
+        for parts in candidates:
+            for end in range(len(parts), 0, -1):
+                for start in range(end):
+                    if start and end - start < 2:
+                        break
+                    targets = modules.get('.'.join(parts[start:end]))
+                    if targets:
+                        return targets
+        return None
+
+    @staticmethod
+    def _compress(adjacency: List[Iterable[int]]):
+        """Pack adjacency lists into (offsets, targets) integer arrays."""
+        offsets = array('i', [0])
+        targets = array('i')
+        for neighbours in adjacency:
+            targets.extend(sorted(neighbours))
+            offsets.append(len(targets))
+        return offsets, targets
+
+    @classmethod
+    def from_index(cls, indexer, files: Optional[Iterable[str]] = None) -> 'DependencyGraph':
+        """Build the graph for a ToolkitIndexer's current index."""
+        nodes = set(indexer.components)
+        if files is not None:
+            nodes.update(files)
+        return cls(indexer.dependencies, nodes, Path(indexer.root).absolute().name)
+
+    def __len__(self) -> int:
+        return len(self.files)
+
+    def __contains__(self, rel_path: str) -> bool:
+        return rel_path in self.ids
+
+    @property
+    def edge_count(self) -> int:
+        """Number of resolved file-to-file edges."""
+        return len(self._targets)
+
+    def _neighbours(self, node: int, reverse: bool = False) -> array:
+        offsets, targets = ((self._reverse_offsets, self._reverse_targets) if reverse
+                            else (self._offsets, self._targets))
+        return targets[offsets[node]:offsets[node + 1]]
+
+    def _node_ids(self, files: Union[str, Iterable[str]]) -> List[int]:
+        if isinstance(files, str):
+            files = [files]
+        return [self.ids[f] for f in files if f in self.ids]
+
+    def dependencies(self, rel_path: str) -> List[str]:
+        """Files a file depends on directly."""
+        return [self.files[t] for t in self._neighbours(self.ids[rel_path])]
+
+    def dependents(self, rel_path: str) -> List[str]:
+        """Files that depend directly on a file."""
+        return [self.files[t] for t in self._neighbours(self.ids[rel_path], reverse=True)]
+
+    def _closure(self, files: Union[str, Iterable[str]], reverse: bool, include_self: bool) -> Set[str]:
+        """Breadth-first reachability from a set of files."""
+        starts = self._node_ids(files)
+        seen = bytearray(len(self.files))
+        queue = deque()
+        for node in starts:
+            if include_self:
+                seen[node] = 1
+            queue.append(node)
+        while queue:
+            for target in self._neighbours(queue.popleft(), reverse):
+                if not seen[target]:
+                    seen[target] = 1
+                    queue.append(target)
+        return {self.files[i] for i, flag in enumerate(seen) if flag}
+
+    def transitive_dependencies(self, files: Union[str, Iterable[str]], include_self: bool = False) -> Set[str]:
+        """Every file the given files depend on, directly or transitively.
+
+        A start file is only included when include_self is set or when it
+        depends on itself through a cycle.
+        """
+        return self._closure(files, reverse=False, include_self=include_self)
+
+    def transitive_dependents(self, files: Union[str, Iterable[str]], include_self: bool = False) -> Set[str]:
+        """Every file affected by a change to the given files (impact analysis)."""
+        return self._closure(files, reverse=True, include_self=include_self)
+
+    def topological_order(self) -> List[str]:
+        """Order files so that every file comes after its dependencies.
+
+        Raises:
+            ValueError: If the graph has cycles; use strongly_connected_components
+                       for a build order that groups cyclic files together
+        """
+        pending = array('i', (self._offsets[i + 1] - self._offsets[i] for i in range(len(self.files))))
+        queue = deque(i for i, count in enumerate(pending) if count == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(self.files[node])
+            for dependent in self._neighbours(node, reverse=True):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    queue.append(dependent)
+        if len(order) < len(self.files):
+            cycle = next(c for c in self.strongly_connected_components() if len(c) > 1)
+            raise ValueError(f"Dependency cycle between: {', '.join(cycle)}")
+        return order
+
+    def strongly_connected_components(self) -> List[List[str]]:
+        """Find strongly connected components with an iterative Tarjan's algorithm.
+
+        Components are returned dependencies-first (reverse topological order
+        of the condensed graph), so they double as a build order.
+        """
+        n = len(self.files)
+        index = array('i', [-1]) * n
+        lowlink = array('i', [0]) * n
+        on_stack = bytearray(n)
+        stack: List[int] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            # Explicit call stack of (node, next edge position)
+            work = [(root, self._offsets[root])]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            while work:
+                node, pos = work[-1]
+                end = self._offsets[node + 1]
+                if pos < end:
+                    work[-1] = (node, pos + 1)
+                    target = self._targets[pos]
+                    if index[target] == -1:
+                        index[target] = lowlink[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        work.append((target, self._offsets[target]))
+                    elif on_stack[target] and index[target] < lowlink[node]:
+                        lowlink[node] = index[target]
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component.append(self.files[member])
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    def cycles(self) -> List[List[str]]:
+        """Groups of files that depend on each other in a cycle."""
+        return [c for c in self.strongly_connected_components() if len(c) > 1]
@@ -0,0 +1,372 @@
+#AI Toolkit Index Query
+#
+#This module answers questions about the toolkit index: file dependencies
+#and dependents, where symbols are defined, which symbols match a search,
+#who calls what, which tests cover a change and overall statistics. It can
+#be used as a library, as a command line tool, or as a long-lived local
+#server (Unix socket, one JSON request per line) that keeps the index
+#resident so editor plugins and scripts avoid reloading it on every
+#invocation. The CLI uses a running server automatically. Sockets live in
+#a per-user directory and are only accessible to their owner.
+#
+
+import os
+import sys
+import json
+import socket
+import hashlib
+import argparse
+import tempfile
+import threading
+import socketserver
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from ai_toolkit.tools.index_store import file_stamp
+from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+
+COMMANDS = ('deps', 'rdeps', 'where', 'search', 'callers', 'callees', 'call-paths', 'tests-for', 'stats')
+
+def default_socket_path(toolkit_root: Union[str, Path]) -> str:
+    """Return the socket path a query server for a toolkit root listens on.
+
+    The socket goes in $XDG_RUNTIME_DIR when set, otherwise in a per-user
+    directory under the temp directory, so other users cannot reach it.
+    """
+    digest = hashlib.sha1(os.path.abspath(toolkit_root).encode()).hexdigest()[:12]
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if not runtime_dir or not os.path.isdir(runtime_dir):
+        user = os.getuid() if hasattr(os, 'getuid') else os.environ.get('USERNAME', 'user')
+        runtime_dir = os.path.join(tempfile.gettempdir(), f"ai_toolkit-{user}")
+    return os.path.join(runtime_dir, f"ai_toolkit_index_{digest}.sock")
+
+def _private_dir(path: str):
+    """Create a directory only the current user can access, or check an existing one.
+
+    Raises:
+        PermissionError: If the directory belongs to another user or is
+                         accessible to others
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not os.path.isdir(path) or os.path.islink(path) or st.st_uid != os.getuid():
+        raise PermissionError(f"Socket directory is not owned by the current user: {path}")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+class IndexQuery:
+    """Answers index queries, reloading the index only when it changes on disk."""
+
+    def __init__(self, toolkit_root: Union[str, Path]):
+        self.root = Path(toolkit_root)
+        self._indexer: Optional[ToolkitIndexer] = None
+        self._stamp = None
+        self._graph = None
+        self._call_graph = None
+
+    @property
+    def indexer(self) -> ToolkitIndexer:
+        """The loaded index, reloaded (lazily) if the index file was rewritten."""
+        stamp = file_stamp(self.root / "codebase_index.json")
+        if self._indexer is None or stamp != self._stamp:
+            self._indexer = ToolkitIndexer(self.root, lazy=True)
+            self._stamp = stamp
+            self._graph = None
+            self._call_graph = None
+        return self._indexer
+
+    @property
+    def graph(self):
+        """Dependency graph of the loaded index, built on first use."""
+        indexer = self.indexer
+        if self._graph is None:
+            self._graph = indexer.dependency_graph()
+        return self._graph
+
+    @property
+    def call_graph(self):
+        """Call graph of the loaded index, built on first use."""
+        indexer = self.indexer
+        if self._call_graph is None:
+            self._call_graph = indexer.call_graph()
+        return self._call_graph
+
+    def _rel_path(self, path: str) -> str:
+        """Normalize a path given relative to the cwd, the root, or absolute."""
+        candidate = Path(path)
+        if not candidate.is_absolute() and candidate.exists():
+            candidate = candidate.resolve()
+        if candidate.is_absolute():
+            try:
+                candidate = candidate.relative_to(self.root.resolve())
+            except ValueError:
+                pass
+        return os.path.normpath(str(candidate))
+
+    def _require(self, rel_path: str):
+        if rel_path not in self.graph:
+            raise KeyError(f"File not in index: {rel_path}")
+
+    def deps(self, file: str, transitive: bool = False) -> List[str]:
+        """Files a file depends on."""
+        rel_path = self._rel_path(file)
+        self._require(rel_path)
+        if transitive:
+            return sorted(self.graph.transitive_dependencies(rel_path))
+        return self.graph.dependencies(rel_path)
+
+    def rdeps(self, file: str, transitive: bool = False) -> List[str]:
+        """Files that depend on a file."""
+        rel_path = self._rel_path(file)
+        self._require(rel_path)
+        if transitive:
+            return sorted(self.graph.transitive_dependents(rel_path))
+        return self.graph.dependents(rel_path)
+
+    def where(self, name: str, fuzzy: bool = False, limit: int = 20) -> List[Dict[str, Any]]:
+        """Find symbol definitions: exact qualified name, else by prefix, or fuzzy."""
+        symbols = self.indexer.symbol_index()
+        if fuzzy:
+            matches = [symbol for symbol, _ in symbols.fuzzy(name, limit=limit)]
+        else:
+            matches = symbols.lookup(name) or symbols.prefix(name, limit=limit)
+        return [{'name': s.name, 'file': s.file, 'line': s.line, 'kind': s.kind} for s in matches[:limit]]
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Symbols whose name, signature or docstring match a query, best first."""
+        hits = self.indexer.search_index().search(query, limit=limit, kind=kind)
+        return [{'name': h.name, 'file': h.file, 'line': h.line, 'kind': h.kind, 'signature': h.signature,
+                 'summary': h.summary, 'score': h.score} for h in hits]
+
+    def _calls(self, symbol: str, reverse: bool, transitive: bool,
+               max_depth: Optional[int]) -> List[Dict[str, Any]]:
+        graph = self.call_graph
+        if transitive:
+            reached = graph.reachable(symbol, max_depth=max_depth, reverse=reverse)
+            return [{'symbol': name, 'distance': distance}
+                    for name, distance in sorted(reached.items(), key=lambda item: (item[1], item[0]))]
+        sites = graph.callers(symbol) if reverse else graph.callees(symbol)
+        return [{'symbol': site.caller if reverse else site.callee, 'line': site.line} for site in sites]
+
+    def callers(self, symbol: str, transitive: bool = False, max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Call sites of a symbol, or with transitive everything that can reach it."""
+        return self._calls(symbol, True, transitive, max_depth)
+
+    def callees(self, symbol: str, transitive: bool = False, max_depth: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Calls made by a symbol, or with transitive everything it can reach."""
+        return self._calls(symbol, False, transitive, max_depth)
+
+    def call_paths(self, source: str, target: str, max_depth: int = 10, limit: int = 100) -> List[List[str]]:
+        """Call chains from an entry point to a symbol."""
+        return self.call_graph.paths(source, target, max_depth=max_depth, limit=limit)
+
+    def tests_for(self, files: List[str]) -> List[str]:
+        """Test files affected by changes to the given files."""
+        return self.indexer.select_tests([self._rel_path(f) for f in files])
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary counts for the index."""
+        indexer = self.indexer
+        graph = self.graph
+        return {
+            'files': len(graph),
+            'test_files': sum(1 for f in graph.files if 'test_' in Path(f).stem),
+            'symbols': len(indexer.symbol_index()),
+            'dependency_edges': graph.edge_count,
+            'files_with_external_deps': len(graph.unresolved),
+            'cycles': len(graph.cycles()),
+            'covered_components': sum(1 for files in indexer.test_coverage.values() if files),
+            'update_counter': indexer.update_counter
+        }
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer a {'cmd': ..., 'args': {...}} request.
+
+        Returns:
+            {'ok': True, 'result': ...} or {'ok': False, 'error': message}
+        """
+        handlers = {
+            'deps': self.deps,
+            'rdeps': self.rdeps,
+            'where': self.where,
+            'search': self.search,
+            'callers': self.callers,
+            'callees': self.callees,
+            'call-paths': self.call_paths,
+            'tests-for': self.tests_for,
+            'stats': self.stats
+        }
+        try:
+            handler = handlers[request['cmd']]
+        except (KeyError, TypeError):
+            return {'ok': False, 'error': f"Unknown command; expected one of {', '.join(COMMANDS)}"}
+        try:
+            return {'ok': True, 'result': handler(**request.get('args', {}))}
+        except (KeyError, TypeError, ValueError) as e:
+            return {'ok': False, 'error': str(e.args[0]) if e.args else repr(e)}
+
+class _QueryHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request per line and writes one JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = {'ok': False, 'error': 'Invalid JSON request'}
+            else:
+                with self.server.lock:
+                    response = self.server.query.handle(request)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+if hasattr(socketserver, 'ThreadingUnixStreamServer'):
+    class QueryServer(socketserver.ThreadingUnixStreamServer):
+        """Unix socket server keeping one IndexQuery resident in memory."""
+
+        daemon_threads = True
+
+        def __init__(self, toolkit_root: Union[str, Path], socket_path: Optional[str] = None):
+            self.socket_path = socket_path or default_socket_path(toolkit_root)
+            if self.socket_path == default_socket_path(toolkit_root):
+                _private_dir(os.path.dirname(self.socket_path))
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)  # Left behind by a server that did not shut down
+            self.query = IndexQuery(toolkit_root)
+            self.lock = threading.Lock()
+            super().__init__(self.socket_path, _QueryHandler)
+
+        def server_bind(self):
+            super().server_bind()
+            os.chmod(self.socket_path, 0o600)  # Only the owner may connect
+
+        def server_close(self):
+            super().server_close()
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+else:
+    QueryServer = None  # Unix sockets unavailable on this platform
+
+def query_server(socket_path: str, cmd: str, timeout: float = 5.0, **args) -> Dict[str, Any]:
+    """Send one request to a running query server and return its response.
+
+    Raises:
+        OSError: If no server is listening on socket_path
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps({'cmd': cmd, 'args': args}).encode() + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError("Query server closed the connection")
+    return json.loads(line)
+
+def _print_result(cmd: str, result: Any):
+    """Print a query result for humans."""
+    if cmd == 'stats':
+        for key, value in result.items():
+            print(f"{key}: {value}")
+    elif cmd == 'where':
+        for symbol in result:
+            print(f"{symbol['file']}:{symbol['line']}: {symbol['kind']} {symbol['name']}")
+    elif cmd == 'search':
+        for hit in result:
+            print(f"{hit['file']}:{hit['line']}: {hit['kind']} {hit['name']}{hit['signature']}")
+            if hit['summary']:
+                print(f"    {hit['summary']}")
+    elif cmd in ('callers', 'callees'):
+        for item in result:
+            detail = f"line {item['line']}" if 'line' in item else f"distance {item['distance']}"
+            print(f"{item['symbol']} ({detail})")
+    elif cmd == 'call-paths':
+        for path in result:
+            print(' -> '.join(path))
+    else:
+        for item in result:
+            print(item)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Query the AI toolkit index")
+    parser.add_argument('--root', default=str(Path(__file__).parent.parent),
+                        help='Toolkit root (defaults to this toolkit)')
+    parser.add_argument('--socket', help='Query server socket (defaults to a per-root path)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    subparsers = parser.add_subparsers(dest='cmd', required=True)
+
+    for cmd, help_text in (('deps', 'Files a file depends on'), ('rdeps', 'Files depending on a file')):
+        sub = subparsers.add_parser(cmd, help=help_text)
+        sub.add_argument('file')
+        sub.add_argument('--transitive', action='store_true', help='Include indirect dependencies')
+    sub = subparsers.add_parser('where', help='Where a symbol is defined')
+    sub.add_argument('name')
+    sub.add_argument('--fuzzy', action='store_true', help='Rank approximate matches')
+    sub.add_argument('--limit', type=int, default=20)
+    sub = subparsers.add_parser('search', help='Symbols matching words in their name, signature or docstring')
+    sub.add_argument('query', nargs='+')
+    sub.add_argument('--kind', help="Only symbols of this kind, e.g. 'class' or 'function'")
+    sub.add_argument('--limit', type=int, default=10)
+    for cmd, help_text in (('callers', 'Calls to a symbol'), ('callees', 'Calls made by a symbol')):
+        sub = subparsers.add_parser(cmd, help=help_text)
+        sub.add_argument('symbol', help="Qualified name, or 'file:Qualified.name' for one definition")
+        sub.add_argument('--transitive', action='store_true', help='Include indirect calls')
+        sub.add_argument('--max-depth', type=int, help='Follow at most this many calls')
+    sub = subparsers.add_parser('call-paths', help='Call chains from an entry point to a symbol')
+    sub.add_argument('source')
+    sub.add_argument('target')
+    sub.add_argument('--max-depth', type=int, default=10)
+    sub.add_argument('--limit', type=int, default=100)
+    sub = subparsers.add_parser('tests-for', help='Tests affected by changed files')
+    sub.add_argument('files', nargs='+')
+    subparsers.add_parser('stats', help='Index statistics')
+    subparsers.add_parser('serve', help='Keep the index resident and answer queries on a Unix socket')
+    args = parser.parse_args(argv)
+
+    socket_path = args.socket or default_socket_path(args.root)
+    if args.cmd == 'serve':
+        if QueryServer is None:
+            print("Server mode requires Unix domain sockets", file=sys.stderr)
+            return 1
+        with QueryServer(args.root, args.socket) as server:
+            print(f"Serving {args.root} on {server.socket_path}", file=sys.stderr)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    query_args = {k: v for k, v in vars(args).items() if k not in ('root', 'socket', 'json', 'cmd')}
+    if isinstance(query_args.get('query'), list):
+        query_args['query'] = ' '.join(query_args['query'])
+    if 'files' in query_args:
+        # The server may run in another directory, so send absolute paths
+        query_args['files'] = [os.path.abspath(f) if os.path.exists(f) else f for f in query_args['files']]
+    elif 'file' in query_args and os.path.exists(query_args['file']):
+        query_args['file'] = os.path.abspath(query_args['file'])
+
+    response = None
+    if hasattr(socket, 'AF_UNIX') and os.path.exists(socket_path):
+        try:
+            response = query_server(socket_path, args.cmd, **query_args)
+        except OSError:
+            response = None  # Stale socket; answer in process
+    if response is None:
+        response = IndexQuery(args.root).handle({'cmd': args.cmd, 'args': query_args})
+
+    if not response['ok']:
+        print(f"error: {response['error']}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(response['result'], indent=2))
+    else:
+        _print_result(args.cmd, response['result'])
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+#AI Toolkit Index Store
+#
+#This module reads and writes codebase_index.json in a sectioned layout that
+#can be loaded lazily. The file stays valid JSON, but its first line is a
+#fixed-size header holding the metadata and the byte span of every section,
+#and each section entry sits on its own line. A reader can therefore open
+#the index in O(1), scan only the sections it touches and decode only the
+#entries it reads; unchanged entries are written back verbatim.
+#
+#Writes are atomic (temp file + rename) and serialized across processes with
+#an advisory lock file, so readers never see a partially written index.
+#Readers check each section read against the stamp of the version its header
+#came from, on the same descriptor, so they never combine spans from one
+#version of the file with bytes of another.
+#
+
+import os
+import json
+import time
+import tempfile
+from contextlib import contextmanager
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+# Size of the padded header line, in bytes
+HEADER_SIZE = 1024
+HEADER_PREFIX = b'{"layout": '
+
+_decoder = json.JSONDecoder()
+
+class _Raw:
+    """Undecoded JSON text of a section entry."""
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+class LazySection(MutableMapping):
+    """Mapping over one index section that decodes entries on first access.
+
+    The section's lines are only read when the mapping is first used, and
+    each entry's JSON is only decoded when its value is requested. Keys and
+    membership never require decoding.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Tuple[str, str]]], decode: Callable[[Any], Any] = None):
+        """Initialize the section.
+
+        Args:
+            loader: Returns (key, raw JSON text) pairs for the section
+            decode: Converts a decoded JSON value into its in-memory form
+        """
+        self._loader = loader
+        self._decode = decode
+        self._entries: Optional[Dict[str, Any]] = None
+
+    def _data(self) -> Dict[str, Any]:
+        if self._entries is None:
+            self._entries = {key: _Raw(text) for key, text in self._loader()}
+            self._loader = None
+        return self._entries
+
+    def __getitem__(self, key):
+        entries = self._data()
+        value = entries[key]
+        if type(value) is _Raw:
+            value = json.loads(value.text)
+            if self._decode is not None:
+                value = self._decode(value)
+            entries[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._data()[key] = value
+
+    def __delitem__(self, key):
+        del self._data()[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._data()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def __repr__(self) -> str:
+        loaded = 'unloaded' if self._entries is None else f"{len(self._entries)} entries"
+        return f"<LazySection {loaded}>"
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the section's lines have been read."""
+        return self._entries is not None
+
+    def is_raw(self, key) -> bool:
+        """Check whether an entry is still undecoded, i.e. unchanged since it was read."""
+        return type(self._data().get(key)) is _Raw
+
+    def encoded_items(self, encode: Callable[[Any], Any] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (key, JSON text), reusing the raw text of undecoded entries."""
+        for key, value in self._data().items():
+            if type(value) is _Raw:
+                yield key, value.text
+            else:
+                yield key, json.dumps(encode(value) if encode is not None else value)
+
+def _parse_header(head: bytes) -> Optional[Dict]:
+    if not head.startswith(HEADER_PREFIX) or len(head) < HEADER_SIZE:
+        return None
+    try:
+        return json.loads(head.rstrip(b' \n,') + b'}')
+    except ValueError:
+        return None
+
+def _parse_section(body: bytes) -> Iterator[Tuple[str, str]]:
+    for line in body.decode('ascii').splitlines():
+        if line.endswith(','):
+            line = line[:-1]
+        key, pos = _decoder.raw_decode(line)
+        yield key, line[pos + 2:]  # Skip ': ' after the key
+
+def _stamp(st: os.stat_result) -> Tuple[int, int, int]:
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def read_header(path) -> Optional[Dict]:
+    """Read the header of a sectioned index file.
+
+    Returns:
+        Dict with 'layout' (section name -> [start, end] byte span) and
+        'metadata', or None if the file is missing or uses the old layout
+    """
+    return read_header_stamped(path)[1]
+
+def read_header_stamped(path) -> Tuple[Optional[Tuple[int, int, int]], Optional[Dict]]:
+    """Read the header of an index file along with the file_stamp of the version read.
+
+    Returns:
+        (stamp, header); the stamp is None if the file is missing and the
+        header is None if it is missing or uses the old layout
+    """
+    try:
+        with open(path, 'rb') as f:
+            return _stamp(os.fstat(f.fileno())), _parse_header(f.read(HEADER_SIZE))
+    except FileNotFoundError:
+        return None, None
+
+def read_section(path, span) -> Iterator[Tuple[str, str]]:
+    """Yield (key, raw JSON text) for every entry in a section's byte span.
+
+    The span must come from a header of the same file version; use
+    read_section_stamped or read_sections when the file may be replaced
+    concurrently.
+    """
+    start, end = span
+    with open(path, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+    return _parse_section(body)
+
+def read_section_stamped(path, span, stamp) -> Optional[List[Tuple[str, str]]]:
+    """Read one section's entries if the file is still the version with the given stamp.
+
+    The stamp is checked on the descriptor the section is read through, so a
+    span taken from that version's header always matches the bytes read.
+
+    Returns:
+        [(key, raw JSON text)], or None if the file was replaced or removed
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        if _stamp(os.fstat(f.fileno())) != stamp:
+            return None
+        start, end = span
+        f.seek(start)
+        return list(_parse_section(f.read(end - start)))
+
+def read_sections(path) -> Optional[Tuple[Tuple[int, int, int], Dict, Dict[str, List[Tuple[str, str]]]]]:
+    """Read the header and every section of an index file through one descriptor.
+
+    write_atomic replaces the file by renaming over it, which leaves an open
+    descriptor on the old version, so the spans in the header always match
+    the bytes read.
+
+    Returns:
+        (stamp, header, section name -> [(key, raw JSON text)]) for the
+        version read, or None if the file is missing or uses the old layout
+    """
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with f:
+        stamp = _stamp(os.fstat(f.fileno()))
+        header = _parse_header(f.read(HEADER_SIZE))
+        if header is None:
+            return None
+        body = f.read()
+    sections = {name: list(_parse_section(body[start - HEADER_SIZE:end - HEADER_SIZE]))
+                for name, (start, end) in header['layout'].items()}
+    return stamp, header, sections
+
+def encode_index(metadata: Dict, sections: Mapping[str, Iterable[Tuple[str, str]]]) -> bytes:
+    """Serialize an index in the sectioned layout.
+
+    Args:
+        metadata: Small JSON-serializable metadata stored in the header
+        sections: Section name -> (key, JSON text) pairs, in order
+
+    Returns:
+        The file contents; valid JSON whose top-level keys are 'layout',
+        'metadata' and the section names
+    """
+    parts = []
+    layout = {}
+    offset = HEADER_SIZE
+    names = list(sections)
+    for i, name in enumerate(names):
+        opening = f"{json.dumps(name)}: {{\n"
+        lines = [f"{json.dumps(key)}: {text}" for key, text in sections[name]]
+        body = ',\n'.join(lines) + ('\n' if lines else '')
+        closing = '}\n' if i == len(names) - 1 else '},\n'
+        start = offset + len(opening)
+        layout[name] = [start, start + len(body)]
+        parts.append(opening + body + closing)
+        offset += len(opening) + len(body) + len(closing)
+    parts.append('}\n')
+
+    header = f"{HEADER_PREFIX.decode()}{json.dumps(layout)}, \"metadata\": {json.dumps(metadata)}"
+    if len(header) + 2 > HEADER_SIZE:
+        raise ValueError("Index metadata does not fit in the header")
+    header = header.ljust(HEADER_SIZE - 2) + ',\n'
+    return (header + ''.join(parts)).encode('ascii')
+
+def file_stamp(path) -> Optional[Tuple[int, int, int]]:
+    """Identify a version of a file by (inode, mtime_ns, size), or None if missing."""
+    try:
+        return _stamp(os.stat(path))
+    except FileNotFoundError:
+        return None
+
+def write_atomic(path, data: bytes):
+    """Replace a file's contents atomically.
+
+    The data is written to a temporary file in the same directory, flushed
+    to disk and renamed over the target, so readers see either the old or
+    the new contents, never a truncated file.
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+@contextmanager
+def index_lock(path):
+    """Hold an exclusive advisory lock for an index file across processes.
+
+    The lock is taken on a separate '<path>.lock' file so it survives the
+    index itself being replaced. On platforms without fcntl or msvcrt the
+    lock is a no-op.
+    """
+    lock_path = os.fspath(path) + '.lock'
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10 seconds
+                    time.sleep(0.1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,286 @@
+#AI Toolkit Index Watcher
+#
+#This module keeps the toolkit index hot by watching the toolkit root for
+#changes and incrementally re-indexing only the files that were touched.
+#Change notification uses Linux inotify through ctypes when available and
+#falls back to stat polling everywhere else; no external services are needed.
+#
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from ai_toolkit.language_backends import source_suffixes
+from ai_toolkit.tools.toolkit_indexer import ToolkitIndexer
+from ai_toolkit.tools.source_walker import walk_source_files
+
+logger = logging.getLogger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct('iIII')
+
+def _is_source(name: str) -> bool:
+    """Check whether a file name is indexed by ToolkitIndexer.update_index."""
+    return name.endswith(source_suffixes()) and name != '__init__.py'
+
+class PollingSource:
+    """Detects changes by comparing (mtime, size) snapshots of the source files."""
+
+    def __init__(self, indexer: ToolkitIndexer):
+        self.indexer = indexer
+        self.snapshot = self.scan()
+
+    def scan(self) -> Dict[str, Tuple[int, int]]:
+        """Stat every indexable file below the root, pruning ignored directories."""
+        return {rel_path: (st.st_mtime_ns, st.st_size)
+                for rel_path, _, st in self.indexer.iter_source_files()}
+
+    def read(self, timeout: float) -> Set[str]:
+        """Wait for the polling interval and return the files that changed."""
+        if timeout > 0:
+            time.sleep(timeout)
+        current = self.scan()
+        previous = self.snapshot
+        self.snapshot = current
+        touched = {path for path, stamp in current.items() if previous.get(path) != stamp}
+        touched.update(path for path in previous if path not in current)
+        return touched
+
+    def close(self):
+        pass
+
+class InotifySource:
+    """Detects changes with Linux inotify, watching every directory below the root."""
+
+    def __init__(self, indexer: ToolkitIndexer):
+        import ctypes
+        import ctypes.util
+
+        self.indexer = indexer
+        self.root = indexer.root
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, str] = {}  # Watch descriptor -> directory relative to root
+        self._add_tree('.')
+
+    def _add_tree(self, rel_dir: str) -> Set[str]:
+        """Watch a directory and its non-ignored subdirectories, returning the sources in them."""
+        def watch(directory: str):
+            path = os.fsencode(os.path.join(self.root, directory))
+            wd = self._libc.inotify_add_watch(self._fd, path, WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+
+        indexer = self.indexer
+        return {rel_path for rel_path, _, _ in walk_source_files(
+            self.root, indexer.ignore_patterns, indexer.use_gitignore, source_suffixes(),
+            start=rel_dir, on_directory=watch)
+            if _is_source(os.path.basename(rel_path))}
+
+    def read(self, timeout: float) -> Optional[Set[str]]:
+        """Wait for events and return the files they touched.
+
+        Returns None when the kernel queue overflowed and events were lost,
+        in which case the caller must fall back to a full rescan.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return set()
+            raise
+
+        touched = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self._watches[wd]
+                continue
+            rel_path = os.path.normpath(os.path.join(directory, name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    touched.update(self._add_tree(rel_path))
+                elif mask & IN_MOVED_FROM:
+                    # Watches of a moved-away directory keep reporting under the
+                    # old name; drop them and let the caller rescan.
+                    return None
+            elif _is_source(name):
+                touched.add(rel_path)
+        return touched
+
+    def close(self):
+        os.close(self._fd)
+
+class IndexWatcher:
+    """Watches the toolkit root and keeps its index up to date incrementally.
+
+    Change notifications are coalesced: touched files accumulate until no new
+    change has arrived for `debounce` seconds (or `max_delay` has passed since
+    the first pending change), then only those files are re-analyzed.
+    """
+
+    def __init__(self, toolkit_root: str, interval: float = 0.5, debounce: float = 0.2,
+                 max_delay: float = 5.0, backend: Optional[str] = None):
+        """Initialize the watcher.
+
+        Args:
+            toolkit_root: Path to the AI toolkit root directory
+            interval: Maximum time to wait for notifications per iteration
+            debounce: Quiet period that ends a burst of changes
+            max_delay: Upper bound on how long a change may stay pending
+            backend: 'inotify' or 'poll'; defaults to inotify when available
+        """
+        self.root = Path(toolkit_root)
+        self.interval = interval
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.indexer = ToolkitIndexer(toolkit_root)
+        self.pending: Set[str] = set()
+        self._first_change = 0.0
+        self._last_change = 0.0
+        self.source = self._open_source(backend)
+        self.backend = 'inotify' if isinstance(self.source, InotifySource) else 'poll'
+
+    def _open_source(self, backend: Optional[str]):
+        """Create the change source, falling back to polling if inotify is unavailable."""
+        if backend in (None, 'inotify') and sys.platform.startswith('linux'):
+            try:
+                return InotifySource(self.indexer)
+            except (OSError, AttributeError) as e:
+                if backend == 'inotify':
+                    raise
+                logger.info(f"inotify unavailable ({e}); falling back to polling")
+        elif backend == 'inotify':
+            raise OSError("inotify is only available on Linux")
+        return PollingSource(self.indexer)
+
+    def collect(self, timeout: Optional[float] = None) -> Set[str]:
+        """Wait for change notifications and add the touched files to the pending set.
+
+        Returns:
+            Files newly reported as touched
+        """
+        touched = self.source.read(self.interval if timeout is None else timeout)
+        if touched is None:
+            # Events were lost or watches went stale: re-establish the watches
+            # and diff the index fingerprints against a fresh scan instead
+            logger.warning("Change notifications incomplete; rescanning")
+            self.source.close()
+            self.source = self._open_source(self.backend)
+            touched = self.indexer.stale_files()
+        if touched:
+            now = time.monotonic()
+            if not self.pending:
+                self._first_change = now
+            self._last_change = now
+            self.pending.update(touched)
+        return touched
+
+    def ready(self) -> bool:
+        """Check whether the pending burst of changes should be flushed."""
+        if not self.pending:
+            return False
+        now = time.monotonic()
+        return (now - self._last_change >= self.debounce or
+                now - self._first_change >= self.max_delay)
+
+    def flush(self) -> Set[str]:
+        """Re-index the pending files.
+
+        Returns:
+            Files that were re-indexed or removed from the index
+        """
+        if not self.pending:
+            return set()
+        files, self.pending = self.pending, set()
+        self.indexer.update_files(sorted(files))
+        logger.info(f"Re-indexed {len(files)} file(s) in {self.root}")
+        return files
+
+    def run(self, stop_event: Optional[threading.Event] = None):
+        """Watch until stop_event is set (or forever), flushing each burst of changes."""
+        try:
+            while stop_event is None or not stop_event.is_set():
+                timeout = self.interval
+                if self.pending:
+                    timeout = min(timeout, self.debounce)
+                self.collect(timeout)
+                if self.ready():
+                    try:
+                        self.flush()
+                    except Exception as e:
+                        logger.warning(f"Failed to update codebase index: {e}")
+        finally:
+            self.close()
+
+    def close(self):
+        """Release the change notification source."""
+        self.source.close()
+
+def watch_toolkit_index(toolkit_root: Optional[str] = None, **kwargs):
+    """Keep the AI toolkit index up to date until interrupted.
+
+    Args:
+        toolkit_root: Optional path to toolkit root. If not provided,
+                     will attempt to detect from current file location.
+        **kwargs: Passed through to IndexWatcher
+    """
+    if toolkit_root is None:
+        toolkit_root = Path(__file__).parent.parent
+
+    # Start from a complete index, then stay incremental
+    ToolkitIndexer(toolkit_root).update_index()
+    watcher = IndexWatcher(toolkit_root, **kwargs)
+    logger.info(f"Watching {watcher.root} using {watcher.backend}")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Keep the AI toolkit index up to date")
+    parser.add_argument('root', nargs='?', help='Toolkit root (defaults to this toolkit)')
+    parser.add_argument('--interval', type=float, default=0.5)
+    parser.add_argument('--debounce', type=float, default=0.2)
+    parser.add_argument('--backend', choices=['inotify', 'poll'])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    watch_toolkit_index(args.root, interval=args.interval, debounce=args.debounce,
+                        backend=args.backend)
@@ -0,0 +1,281 @@
+#AI Toolkit Search Index
+#
+#This module provides ranked full-text search over the symbols of the toolkit
+#index: qualified names, signatures and docstrings, so "the function that
+#parses config" can be found without grepping the tree. Terms map to posting
+#lists of symbol ids, stored delta-encoded as varint (gap, term frequency)
+#pairs, and queries are scored with BM25. The index is updated per file as
+#the toolkit index changes and saved next to it.
+#
+
+import re
+import math
+import json
+import heapq
+import base64
+from array import array
+from collections import Counter
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+SEARCH_VERSION = 1
+
+# Name terms count this many times, so a match in the name outranks one in prose
+NAME_WEIGHT = 3
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+_STOP_WORDS = frozenset('''
+    a an and are as at be by for from has if in is it its of on or that the this
+    to was were will with self cls none true false return returns
+'''.split())
+_SUFFIXES = (('ies', 'y'), ('ings', ''), ('ing', ''), ('ers', ''), ('er', ''), ('ed', ''), ('es', ''), ('s', ''))
+
+@lru_cache(maxsize=1 << 16)
+def _term(word: str) -> Optional[str]:
+    """Return the search term for a word, or None for stop words; cached since vocabularies are small."""
+    word = word.lower()
+    if len(word) < 2 or word in _STOP_WORDS:
+        return None
+    return _stem(word)
+
+def _stem(word: str) -> str:
+    """Strip common English suffixes so 'parses', 'parsing' and 'parser' match 'parse'."""
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith('ss'):
+            word = word[:len(word) - len(suffix)] + replacement
+            if word[-1] == word[-2] and word[-1] not in 'aeiouslz':
+                word = word[:-1]  # 'runner' -> 'run', 'stopped' -> 'stop'
+            break
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    return word
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into search terms: words and identifier parts, lowercased and stemmed.
+
+    'parseConfig', 'parse_config' and 'parses the config' all yield
+    ['pars', 'config'].
+    """
+    if not text:
+        return []
+    return [term for term in map(_term, _WORD.findall(text)) if term is not None]
+
+def _encode_postings(postings: bytearray, gap: int, tf: int):
+    """Append one (gap, tf) pair as two varints."""
+    for value in (gap, tf):
+        while value >= 0x80:
+            postings.append((value & 0x7F) | 0x80)
+            value >>= 7
+        postings.append(value)
+
+def _decode_postings(postings: bytes) -> Iterator[Tuple[int, int]]:
+    """Yield (symbol id, term frequency) pairs from delta-encoded postings."""
+    doc_id = 0
+    values = []
+    value = shift = 0
+    for byte in postings:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        values.append(value)
+        value = shift = 0
+        if len(values) == 2:
+            doc_id += values[0]
+            yield doc_id, values[1]
+            values.clear()
+
+@dataclass(frozen=True)
+class SearchHit:
+    """A symbol matching a search query"""
+    name: str  # Qualified name
+    file: str
+    line: int
+    kind: str
+    signature: str  # e.g. '(self, path: str) -> Dict'; empty when unknown
+    summary: str  # First line of the docstring
+    score: float
+
+class SearchIndex:
+    """Inverted index over symbol names, signatures and docstrings with BM25 ranking.
+
+    Symbols get increasing integer ids, so postings only ever grow at the
+    end: a file's new symbols are appended and its old ones are marked
+    removed. Removed ids are skipped at query time and dropped by compact(),
+    which runs before every save.
+    """
+
+    def __init__(self):
+        self._docs: List[Optional[list]] = []  # [file, name, kind, line, signature, summary, length] or None if removed
+        self._files: Dict[str, Tuple[Optional[List[int]], List[int]]] = {}  # File -> (fingerprint, symbol ids)
+        self._postings: Dict[str, bytearray] = {}
+        self._last_id: Dict[str, int] = {}  # Last symbol id in each posting list
+        self._live = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    @property
+    def removed(self) -> int:
+        """Symbols removed but still referenced by the postings."""
+        return len(self._docs) - self._live
+
+    def fingerprint(self, rel_path: str) -> Optional[List[int]]:
+        """Fingerprint of the file version a file's symbols were indexed from, or None if absent."""
+        entry = self._files.get(rel_path)
+        return entry[0] if entry is not None else None
+
+    def files(self) -> List[str]:
+        return list(self._files)
+
+    def update_file(self, rel_path: str, symbols: Iterable[Sequence], docs: Iterable[Sequence],
+                    fingerprint: Optional[List[int]] = None):
+        """Replace the searchable symbols of a file.
+
+        Args:
+            rel_path: File path relative to the toolkit root
+            symbols: (qualified name, kind, line) entries as stored in the index
+            docs: (qualified name, signature, docstring) entries; symbols
+                  without one are indexed by name only
+            fingerprint: Fingerprint of the analyzed file version
+        """
+        self.remove_file(rel_path)
+        texts = {name: (signature or '', docstring) for name, signature, docstring in docs}
+        ids = []
+        for name, kind, line in symbols:
+            signature, docstring = texts.get(name, ('', None))
+            terms = Counter()
+            for term in tokenize(name):
+                terms[term] += NAME_WEIGHT
+            terms.update(tokenize(signature))
+            terms.update(tokenize(docstring))
+            length = sum(terms.values())
+            summary = docstring.strip().split('\n', 1)[0].strip() if docstring else ''
+            doc_id = len(self._docs)
+            self._docs.append([rel_path, name, kind, line, signature, summary, length])
+            ids.append(doc_id)
+            self._live += 1
+            self._total_length += length
+            for term, tf in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = bytearray()
+                _encode_postings(postings, doc_id - self._last_id.get(term, 0), tf)
+                self._last_id[term] = doc_id
+        self._files[rel_path] = (fingerprint, ids)
+
+    def remove_file(self, rel_path: str):
+        """Drop every symbol recorded for a file."""
+        entry = self._files.pop(rel_path, None)
+        if entry is None:
+            return
+        for doc_id in entry[1]:
+            self._total_length -= self._docs[doc_id][6]
+            self._docs[doc_id] = None
+            self._live -= 1
+
+    def compact(self):
+        """Renumber the live symbols and drop removed ones from the postings."""
+        if not self.removed:
+            return
+        new_ids = array('i', [-1]) * len(self._docs)
+        docs = []
+        for doc_id, doc in enumerate(self._docs):
+            if doc is not None:
+                new_ids[doc_id] = len(docs)
+                docs.append(doc)
+        postings, last_id = {}, {}
+        for term, data in self._postings.items():
+            encoded = bytearray()
+            previous = 0
+            for doc_id, tf in _decode_postings(data):
+                doc_id = new_ids[doc_id]
+                if doc_id >= 0:
+                    _encode_postings(encoded, doc_id - previous, tf)
+                    previous = doc_id
+            if encoded:
+                postings[term] = encoded
+                last_id[term] = previous
+        self._docs = docs
+        self._postings, self._last_id = postings, last_id
+        self._files = {path: (fingerprint, [new_ids[i] for i in ids])
+                       for path, (fingerprint, ids) in self._files.items()}
+
+    def search(self, query: str, limit: int = 10, kind: Optional[str] = None) -> List[SearchHit]:
+        """Rank symbols against a free-text query with BM25.
+
+        Args:
+            query: Words or identifiers, e.g. 'parse config file'
+            limit: Maximum number of results
+            kind: Only return symbols of this kind ('class', 'function',
+                  'method', ...); async variants match their base kind
+                  and 'function' also matches methods
+
+        Returns:
+            Hits, best first; ties are ordered by file and line
+        """
+        if not self._live:
+            return []
+        average_length = self._total_length / self._live or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            data = self._postings.get(term)
+            if data is None:
+                continue
+            matches = [(doc_id, tf) for doc_id, tf in _decode_postings(data) if self._docs[doc_id] is not None]
+            if not matches:
+                continue
+            idf = math.log(1 + (self._live - len(matches) + 0.5) / (len(matches) + 0.5))
+            for doc_id, tf in matches:
+                length = self._docs[doc_id][6]
+                norm = tf + K1 * (1 - B + B * length / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (K1 + 1) / norm
+
+        if kind is not None:
+            kinds = ('function', 'method') if kind == 'function' else (kind,)
+            scores = {doc_id: score for doc_id, score in scores.items()
+                      if self._docs[doc_id][2] == kind or self._docs[doc_id][2].split()[-1] in kinds}
+        best = heapq.nsmallest(limit, scores.items(),
+                               key=lambda item: (-item[1], self._docs[item[0]][0], self._docs[item[0]][3]))
+        hits = []
+        for doc_id, score in best:
+            rel_path, name, doc_kind, line, signature, summary, _ = self._docs[doc_id]
+            hits.append(SearchHit(name, rel_path, line, doc_kind, signature, summary, round(score, 4)))
+        return hits
+
+    def to_json(self) -> bytes:
+        """Serialize the index; removed symbols are compacted away first."""
+        self.compact()
+        data = {
+            'version': SEARCH_VERSION,
+            'docs': self._docs,
+            'files': self._files,
+            'postings': {term: [self._last_id[term], base64.b64encode(bytes(postings)).decode('ascii')]
+                         for term, postings in self._postings.items()}
+        }
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> 'SearchIndex':
+        """Load an index saved by to_json; an unreadable or outdated one loads empty."""
+        index = cls()
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return index
+        if not isinstance(data, dict) or data.get('version') != SEARCH_VERSION:
+            return index
+        index._docs = data['docs']
+        index._files = {path: (fingerprint, ids) for path, (fingerprint, ids) in data['files'].items()}
+        for term, (last_id, encoded) in data['postings'].items():
+            index._postings[term] = bytearray(base64.b64decode(encoded))
+            index._last_id[term] = last_id
+        index._live = len(index._docs)
+        index._total_length = sum(doc[6] for doc in index._docs)
+        return index
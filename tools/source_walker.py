@@ -0,0 +1,241 @@
+#AI Toolkit Source Walker
+#
+#This module provides the directory walk used by the toolkit indexer. It is
+#built on os.scandir, prunes ignored directories before descending into them
+#(caches, virtualenvs, VCS metadata, build outputs and anything matched by
+#.gitignore files) and yields stat results alongside paths so callers can
+#fingerprint files without extra system calls.
+#
+
+import os
+import re
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# Patterns (gitignore syntax) that are never indexed
+DEFAULT_IGNORE_PATTERNS = [
+    '__pycache__/',
+    '.git/',
+    '.hg/',
+    '.svn/',
+    '.venv/',
+    'venv/',
+    'node_modules/',
+    'build/',
+    'dist/',
+    '*.egg-info/',
+    '.tox/',
+    '.nox/',
+    '.mypy_cache/',
+    '.pytest_cache/',
+    '.ruff_cache/',
+]
+
+def _translate_glob(pattern: str) -> str:
+    """Translate a gitignore glob into a regular expression fragment."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**/', i):
+                out.append('(?:.*/)?')
+                i += 3
+                continue
+            if pattern.startswith('**', i):
+                out.append('.*')
+                i += 2
+                continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+class IgnoreRules:
+    """An ordered set of gitignore-style patterns relative to a base directory.
+
+    Supports comments, negation (!), directory-only patterns (trailing /),
+    anchored patterns (containing a /) and the *, ?, [...] and ** wildcards.
+    """
+
+    def __init__(self, patterns: Iterable[str], base: str = ''):
+        self.base = base.strip('/')
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negated, directory only)
+        for line in patterns:
+            line = line.rstrip('\n').rstrip('\r')
+            if not line.strip() or line.startswith('#'):
+                continue
+            if not line.endswith('\\ '):
+                line = line.rstrip(' ')
+            negated = line.startswith('!')
+            if negated or line.startswith('\\!') or line.startswith('\\#'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            anchored = '/' in line
+            body = _translate_glob(line.lstrip('/'))
+            regex = f"^{body}$" if anchored else f"^(?:.*/)?{body}$"
+            self.rules.append((re.compile(regex), negated, dir_only))
+            
+        # Without negations any match decides, so all rules collapse into one regex
+        self._combined = None
+        if not any(negated for _, negated, _ in self.rules):
+            self._combined = (
+                self._combine(regex for regex, _, _ in self.rules),
+                self._combine(regex for regex, _, dir_only in self.rules if not dir_only)
+            )
+            
+    @staticmethod
+    def _combine(regexes: Iterable[re.Pattern]) -> Optional[re.Pattern]:
+        """Join compiled patterns into a single alternation."""
+        sources = [regex.pattern for regex in regexes]
+        return re.compile('|'.join(f"(?:{p})" for p in sources)) if sources else None
+
+    @classmethod
+    def from_file(cls, path: str, base: str = '') -> 'IgnoreRules':
+        """Load rules from a .gitignore file whose directory is base."""
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls(f.readlines(), base)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """Return True/False if a rule decides whether rel_path is ignored, else None."""
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        if self._combined is not None:
+            regex = self._combined[0] if is_dir else self._combined[1]
+            return True if regex is not None and regex.match(rel_path) else None
+        decision = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                decision = not negated
+        return decision
+
+def _is_ignored(rule_sets: List[IgnoreRules], rel_path: str, is_dir: bool) -> bool:
+    """Apply rule sets in order; later (deeper) sets override earlier ones."""
+    ignored = False
+    for rules in rule_sets:
+        decision = rules.match(rel_path, is_dir)
+        if decision is not None:
+            ignored = decision
+    return ignored
+
+def _ancestor_rules(root: str, rel_dir: str, patterns: Iterable[str], use_gitignore: bool) -> List[IgnoreRules]:
+    """Collect the rule sets that apply inside rel_dir, excluding its own .gitignore."""
+    rule_sets = [IgnoreRules(patterns)]
+    if use_gitignore and rel_dir:
+        parts = rel_dir.split('/')
+        for depth in range(len(parts)):
+            parent = '/'.join(parts[:depth])
+            gitignore = os.path.join(root, parent, '.gitignore')
+            if os.path.isfile(gitignore):
+                rule_sets.append(IgnoreRules.from_file(gitignore, parent))
+    return rule_sets
+
+def path_is_ignored(root: str, rel_path: str, ignore_patterns: Optional[Iterable[str]] = None,
+                    use_gitignore: bool = True) -> bool:
+    """Check whether walk_source_files would skip a file, given its path relative to root."""
+    root = os.fspath(root)
+    patterns = DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns
+    parts = rel_path.replace(os.sep, '/').strip('/').split('/')
+    rule_sets = [IgnoreRules(patterns)]
+    for depth in range(len(parts)):
+        rel_dir = '/'.join(parts[:depth])
+        if rel_dir and (_is_ignored(rule_sets, rel_dir, True) or
+                        os.path.isfile(os.path.join(root, rel_dir, 'pyvenv.cfg'))):
+            return True
+        gitignore = os.path.join(root, rel_dir, '.gitignore')
+        if use_gitignore and os.path.isfile(gitignore):
+            rule_sets.append(IgnoreRules.from_file(gitignore, rel_dir))
+    return _is_ignored(rule_sets, '/'.join(parts), False)
+
+def walk_source_files(root: str,
+                      ignore_patterns: Optional[Iterable[str]] = None,
+                      use_gitignore: bool = True,
+                      suffixes: Tuple[str, ...] = ('.py',),
+                      start: str = '',
+                      on_directory: Optional[Callable[[str], None]] = None
+                      ) -> Iterator[Tuple[str, str, os.stat_result]]:
+    """Walk a tree and yield (rel_path, abs_path, stat) for every source file.
+
+    Ignored directories are pruned before they are listed. Directories that
+    contain a pyvenv.cfg (virtualenvs of any name) are skipped as well.
+    Relative paths use the platform separator, matching the index keys.
+
+    Args:
+        root: Directory to walk
+        ignore_patterns: Gitignore-style patterns; defaults to DEFAULT_IGNORE_PATTERNS
+        use_gitignore: Also honour .gitignore files found in the tree
+        suffixes: File name suffixes to yield
+        start: Optional subdirectory (relative to root) to restrict the walk to
+        on_directory: Called with each visited directory's relative path
+    """
+    root = os.fspath(root)
+    patterns = DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns
+
+    # Rules from .gitignore files of the directories above the start point
+    start = start.replace(os.sep, '/').strip('/')
+    if start in ('', '.'):
+        start = ''
+    base_rules = _ancestor_rules(root, start, patterns, use_gitignore)
+    if start and _is_ignored(base_rules, start, True):
+        return
+
+    stack = [(start, base_rules)]
+    while stack:
+        rel_dir, rule_sets = stack.pop()
+        abs_dir = os.path.join(root, rel_dir) if rel_dir else root
+        try:
+            with os.scandir(abs_dir) as it:
+                entries = list(it)
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            continue
+
+        names = {entry.name for entry in entries}
+        if 'pyvenv.cfg' in names and rel_dir:
+            continue
+        if use_gitignore and '.gitignore' in names:
+            rule_sets = rule_sets + [IgnoreRules.from_file(os.path.join(abs_dir, '.gitignore'), rel_dir)]
+        if on_directory is not None:
+            on_directory(rel_dir.replace('/', os.sep) or '.')
+
+        subdirs = []
+        for entry in sorted(entries, key=lambda e: e.name):
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if not _is_ignored(rule_sets, rel_path, True):
+                    subdirs.append(rel_path)
+            elif entry.name.endswith(suffixes) and not _is_ignored(rule_sets, rel_path, False):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                yield rel_path.replace('/', os.sep), entry.path, st
+
+        # Push in reverse so directories are visited in sorted order
+        for rel_path in reversed(subdirs):
+            stack.append((rel_path, rule_sets))
@@ -0,0 +1,162 @@
+#AI Toolkit Symbol Index
+#
+#This module provides a global symbol table over the toolkit index. Every
+#class, function and method recorded by ComponentAnalyzer is mapped from its
+#qualified name to (file, line, kind). A sorted key array answers prefix
+#queries with binary search and a trigram index answers fuzzy
+#"go to symbol" queries. Both are updated per file as the index changes.
+#
+
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+@dataclass(frozen=True)
+class Symbol:
+    """Location of a symbol definition"""
+    name: str  # Qualified name, e.g. 'ToolkitIndexer.update_index'
+    file: str
+    line: int
+    kind: str  # 'class', 'function', 'method', 'async function' or 'async method'
+
+    @property
+    def short_name(self) -> str:
+        return self.name.rsplit('.', 1)[-1]
+
+def trigrams(text: str) -> Set[str]:
+    """Return the lowercase trigrams of a name, padded so prefixes weigh more."""
+    padded = f"  {text.lower()} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class SymbolIndex:
+    """Global symbol table with exact, prefix and fuzzy lookup.
+
+    Symbols get integer ids. The sorted key array holds (key, id) pairs for
+    both the lowercase qualified name and the lowercase short name, so a
+    prefix query on either is a bisect plus a scan over the matches. The
+    trigram index maps each trigram of a short name to the ids containing it.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[int, Symbol] = {}
+        self._by_file: Dict[str, List[int]] = {}
+        self._by_name: Dict[str, List[int]] = {}
+        self._keys: List[Tuple[str, int]] = []
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._gram_counts: Dict[int, int] = {}
+        self._next_id = 0
+
+    @classmethod
+    def from_components(cls, components: Mapping[str, Dict]) -> 'SymbolIndex':
+        """Build an index from ToolkitIndexer.components."""
+        index = cls()
+        keys = index._keys
+        for rel_path, entry in components.items():
+            index._add_file(rel_path, entry.get('symbols', ()), keys.append)
+        keys.sort()
+        return index
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+
+    @staticmethod
+    def _index_keys(symbol: Symbol) -> Set[str]:
+        return {symbol.name.lower(), symbol.short_name.lower()}
+
+    def _add_file(self, rel_path: str, symbols: Iterable[Sequence], add_key) -> None:
+        ids = self._by_file.setdefault(rel_path, [])
+        for name, kind, line in symbols:
+            symbol_id = self._next_id
+            self._next_id += 1
+            symbol = Symbol(name, rel_path, line, kind)
+            self._symbols[symbol_id] = symbol
+            ids.append(symbol_id)
+            self._by_name.setdefault(name, []).append(symbol_id)
+            for key in self._index_keys(symbol):
+                add_key((key, symbol_id))
+            grams = trigrams(symbol.short_name)
+            self._gram_counts[symbol_id] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, set()).add(symbol_id)
+
+    def update_file(self, rel_path: str, symbols: Iterable[Sequence]) -> None:
+        """Replace the symbols recorded for a file.
+
+        Args:
+            rel_path: File path relative to the toolkit root
+            symbols: (qualified name, kind, line) entries as stored in the index
+        """
+        self.remove_file(rel_path)
+        self._add_file(rel_path, symbols, lambda key: insort(self._keys, key))
+
+    def remove_file(self, rel_path: str) -> None:
+        """Drop every symbol recorded for a file."""
+        for symbol_id in self._by_file.pop(rel_path, ()):
+            symbol = self._symbols.pop(symbol_id)
+            del self._gram_counts[symbol_id]
+            ids = self._by_name[symbol.name]
+            ids.remove(symbol_id)
+            if not ids:
+                del self._by_name[symbol.name]
+            for key in self._index_keys(symbol):
+                pos = bisect_left(self._keys, (key, symbol_id))
+                del self._keys[pos]
+            for gram in trigrams(symbol.short_name):
+                ids = self._trigrams[gram]
+                ids.discard(symbol_id)
+                if not ids:
+                    del self._trigrams[gram]
+
+    def lookup(self, name: str) -> List[Symbol]:
+        """Find the definitions of an exact qualified name."""
+        return [self._symbols[i] for i in self._by_name.get(name, ())]
+
+    def in_file(self, rel_path: str) -> List[Symbol]:
+        """List the symbols defined in a file, in source order."""
+        return sorted((self._symbols[i] for i in self._by_file.get(rel_path, ())), key=lambda s: s.line)
+
+    def prefix(self, prefix: str, limit: Optional[int] = 50) -> List[Symbol]:
+        """Find symbols whose qualified or short name starts with prefix (case-insensitive).
+
+        Results are ordered by name, then file.
+        """
+        prefix = prefix.lower()
+        seen: Set[int] = set()
+        pos = bisect_left(self._keys, (prefix, -1))
+        while pos < len(self._keys):
+            key, symbol_id = self._keys[pos]
+            if not key.startswith(prefix):
+                break
+            seen.add(symbol_id)
+            pos += 1
+        matches = sorted((self._symbols[i] for i in seen), key=lambda s: (s.name, s.file, s.line))
+        return matches if limit is None else matches[:limit]
+
+    def fuzzy(self, query: str, limit: int = 20, threshold: float = 0.3) -> List[Tuple[Symbol, float]]:
+        """Rank symbols by trigram similarity of their short name to query.
+
+        Args:
+            query: Approximate symbol name; typos and missing characters are tolerated
+            limit: Maximum number of results
+            threshold: Minimum similarity (0-1) for a symbol to be returned
+
+        Returns:
+            (symbol, score) pairs, best match first
+        """
+        query_grams = trigrams(query)
+        hits: Dict[int, int] = {}
+        for gram in query_grams:
+            for symbol_id in self._trigrams.get(gram, ()):
+                hits[symbol_id] = hits.get(symbol_id, 0) + 1
+
+        # Dice coefficient over trigram sets, computed from the hit counts
+        scored = []
+        for symbol_id, shared in hits.items():
+            score = 2 * shared / (len(query_grams) + self._gram_counts[symbol_id])
+            if score >= threshold:
+                scored.append((self._symbols[symbol_id], score))
+        scored.sort(key=lambda item: (-item[1], item[0].name, item[0].file, item[0].line))
+        return scored[:limit]
@@ -9,37 +9,200 @@
 #
 
 import os
+import sys
 import ast
 import json
+import builtins
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Set, Optional, Tuple, Union
+
+from ai_toolkit.code_analyzer import CodeContext
+from ai_toolkit.language_backends import PythonBackend, get_backend, source_suffixes
+from ai_toolkit.parse_utils import parse_tolerant
+from ai_toolkit.tools.call_graph import CallGraph
+from ai_toolkit.tools.dependency_graph import DependencyGraph
+from ai_toolkit.tools.index_store import (LazySection, encode_index, file_stamp, index_lock,
+                                          read_header_stamped, read_section_stamped, read_sections,
+                                          write_atomic)
+from ai_toolkit.tools.search_index import SearchIndex
+from ai_toolkit.tools.source_walker import DEFAULT_IGNORE_PATTERNS, path_is_ignored, walk_source_files
+from ai_toolkit.tools.symbol_index import SymbolIndex
+
+# Below this many files to analyze, update_index stays serial because
+# process pool startup costs more than it saves
+PARALLEL_THRESHOLD = 64
+
+# Bumped whenever ComponentAnalyzer records something new; it is part of every
+# file fingerprint, so entries written by an older analyzer are re-analyzed
+ANALYZER_VERSION = 4
+
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+def _fingerprint(st: os.stat_result) -> List[int]:
+    """Fingerprint a file's indexed state from its stat result."""
+    return [st.st_mtime_ns, st.st_size, ANALYZER_VERSION]
+
+def _analyze_source(file_path: Union[str, Path]) -> Optional[Dict]:
+    """Parse a source file and collect its components and dependencies.
+    
+    Python files go through ComponentAnalyzer; other files through the
+    language backend registered for their extension (see
+    language_backends), which records no call edges. Syntax errors never
+    abort the analysis: the broken top-level blocks are skipped and
+    reported under 'errors' as [line, message] pairs. Returns None if the
+    file cannot be read (e.g. it was deleted mid-update). Module-level so
+    it can run in a process pool worker.
+    """
+    file_path = Path(file_path)
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+    except OSError:
+        return None
+        
+    backend = get_backend(file_path)
+    if backend is not None and not isinstance(backend, PythonBackend):
+        source = content.decode('utf-8', errors='replace')
+        return _components_from_context(backend.analyze(source, str(file_path), tolerant=True))
+        
+    parsed = parse_tolerant(content, str(file_path))
+    analyzer = ComponentAnalyzer(file_path.stem)
+    analyzer.visit(parsed.tree)
+    
+    return {
+        'imports': analyzer.imports,
+        'classes': analyzer.classes,
+        'functions': analyzer.functions,
+        'dependencies': analyzer.dependencies,
+        'symbols': analyzer.symbols,
+        'calls': analyzer.calls,
+        'docs': analyzer.docs,
+        'errors': [[d.line, d.message] for d in parsed.diagnostics]
+    }
+
+def _components_from_context(context: CodeContext) -> Dict:
+    """Convert a language backend's CodeContext to the fields _analyze_source records."""
+    symbols = sorted(context.symbols.values(), key=lambda s: s.line_number)
+    classes = {s.name.rsplit('.', 1)[-1] for s in symbols if s.type == 'class'}
+    kinds = {s.name: s.type for s in symbols}
+    return {
+        'imports': set(context.imports),
+        'classes': classes,
+        'functions': {s.name.rsplit('.', 1)[-1] for s in symbols if s.type == 'function'},
+        'dependencies': set(context.imports),
+        'symbols': [(s.name, 'method' if s.type == 'function' and kinds.get(s.parent) == 'class' else s.type,
+                     s.line_number) for s in symbols],
+        'calls': [],
+        'docs': [(s.name, '', s.docstring) for s in symbols if s.docstring],
+        'errors': [[d.line, d.message] for d in context.diagnostics]
+    }
 
 class ToolkitIndexer:
     """Maintains an index of AI toolkit components and their relationships."""
     
-    def __init__(self, toolkit_root: str):
+    def __init__(self, toolkit_root: str, ignore_patterns: Optional[Iterable[str]] = None,
+                 use_gitignore: bool = True, lazy: bool = False):
         """Initialize the indexer with the toolkit root directory.
         
         Args:
             toolkit_root: Path to the AI toolkit root directory
+            ignore_patterns: Gitignore-style patterns excluded from indexing;
+                            defaults to DEFAULT_IGNORE_PATTERNS
+            use_gitignore: Also exclude files matched by .gitignore files
+            lazy: Only read the index header now; sections are read when first
+                  used and entries decoded when first accessed (see index_store)
         """
         self.root = Path(toolkit_root)
         self.index_file = self.root / "codebase_index.json"
+        self.search_file = self.root / "codebase_search.json"
+        self.ignore_patterns = list(DEFAULT_IGNORE_PATTERNS if ignore_patterns is None else ignore_patterns)
+        self.use_gitignore = use_gitignore
         self.components: Dict[str, Dict] = {}
         self.dependencies: Dict[str, Set[str]] = {}
-        self.test_coverage: Dict[str, List[str]] = {}
+        # Component -> test files, as insertion-ordered sets (dict keys) of
+        # paths interned through _path_table; lists only in the saved index
+        self.test_coverage: Dict[str, Dict[str, None]] = {}
+        self._path_table: Dict[str, str] = {}
+        self._symbol_index: Optional[SymbolIndex] = None  # Built on first use
         self.update_counter = 0
+        self._fingerprints: Mapping[str, List[int]] = {}  # Stored fingerprints, lazy mode only
+        self._touched: Set[str] = set()  # Files recorded or removed since the last load/save
+        self._search_index: Optional[SearchIndex] = None  # Loaded on first use
+        self._search_stamp = None  # Stamp of the search file _search_index matches
+        # File -> (fingerprint, symbols, docs), or None if removed, not yet in the search file
+        self._search_changes: Dict[str, Optional[Tuple]] = {}
         
-        # Load existing index if it exists
-        if self.index_file.exists():
+        # Load existing index if it exists, remembering which version was read
+        self._layout: Dict[str, List[int]] = {}  # Section spans of the loaded version, lazy mode only
+        self._sections_read = False
+        self._snapshot: Optional[Dict[str, List]] = None  # Raw entries of a version read in full
+        if lazy:
+            self._loaded_stamp, header = read_header_stamped(self.index_file)
+        else:
+            self._loaded_stamp, header = file_stamp(self.index_file), None
+        if header is not None:
+            self.update_counter = header['metadata'].get('update_counter', 0)
+            self._layout = header['layout']
+            self.components = LazySection(self._section_loader('components'))
+            self.dependencies = LazySection(self._section_loader('dependencies'), set)
+            self.test_coverage = LazySection(self._section_loader('test_coverage'),
+                                             lambda files: dict.fromkeys(map(self._intern_path, files)))
+            self._fingerprints = LazySection(self._section_loader('fingerprints'))
+        elif self.index_file.exists():
             with open(self.index_file, 'r') as f:
-                data = json.load(f)
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = {}  # Empty or truncated index; rebuilt on next update
                 self.components = data.get('components', {})
                 self.dependencies = {k: set(v) for k, v in data.get('dependencies', {}).items()}
-                self.test_coverage = data.get('test_coverage', {})
+                self.test_coverage = {k: dict.fromkeys(map(self._intern_path, v))
+                                      for k, v in data.get('test_coverage', {}).items()}
                 self.update_counter = data.get('metadata', {}).get('update_counter', 0)
+        self._loaded_counter = self.update_counter
+        
+    def _section_loader(self, name: str):
+        """Return a loader reading one section of the index file on demand.
+        
+        Only the section's own byte span is read, through a descriptor on
+        which the file is checked to still be the version the header came
+        from. If another process replaced the file since, every remaining
+        section is read from the new version in one pass instead (see
+        _read_snapshot). Entries are decoded only when accessed.
+        """
+        def load():
+            if self._snapshot is None:
+                span = self._layout.get(name)
+                if span is None:
+                    return ()
+                entries = read_section_stamped(self.index_file, span, self._loaded_stamp)
+                if entries is not None:
+                    self._sections_read = True
+                    return entries
+                self._read_snapshot()
+            return self._snapshot.pop(name, ())
+        return load
+        
+    def _read_snapshot(self):
+        """Read every section of a replaced index file for the unloaded lazy sections.
+        
+        If no section has been read yet, the indexer adopts the new version.
+        Otherwise it keeps the loaded stamp, so the next save merges with the
+        file on disk rather than overwriting entries read from the old version.
+        """
+        snapshot = read_sections(self.index_file)
+        if snapshot is None:
+            self._snapshot = {}  # Deleted or rewritten in the old layout since construction
+            return
+        stamp, header, self._snapshot = snapshot
+        if stamp != self._loaded_stamp and not self._sections_read:
+            saved_counter = header['metadata'].get('update_counter', 0)
+            self.update_counter = saved_counter + self.update_counter - self._loaded_counter
+            self._loaded_counter = saved_counter
+            self._loaded_stamp = stamp
         
     def analyze_file(self, file_path: Path) -> Dict:
         """Analyze a Python file for components and dependencies.
@@ -48,63 +211,324 @@ class ToolkitIndexer:
             file_path: Path to the Python file to analyze
             
         Returns:
-            Dict containing file analysis results
+            Dict containing file analysis results, or None if the file
+            cannot be read
         """
-        with open(file_path, 'r') as f:
-            content = f.read()
-            
-        tree = ast.parse(content)
-        analyzer = ComponentAnalyzer(file_path.stem)
-        analyzer.visit(tree)
-        
-        return {
-            'imports': analyzer.imports,
-            'classes': analyzer.classes,
-            'functions': analyzer.functions,
-            'dependencies': analyzer.dependencies
-        }
+        return _analyze_source(file_path)
+        
+    def update_index(self, max_workers: Optional[int] = None):
+        """Update the toolkit index by analyzing all source files.
+        
+        Changed files are analyzed in a process pool when there are at least
+        PARALLEL_THRESHOLD of them, serially otherwise. Results are merged
+        in walk order either way, so the index does not depend on the mode.
+        A file with syntax errors is indexed from its valid top-level blocks
+        (see parse_errors) instead of aborting the update.
         
-    def update_index(self):
-        """Update the toolkit index by analyzing all Python files."""
+        Args:
+            max_workers: Process pool size (defaults to the CPU count);
+                        1 forces serial analysis
+        """
         # Increment update counter
         self.update_counter += 1
         
         # Keep track of seen files to remove stale entries
         seen_files = set()
         
-        # Analyze all Python files in toolkit
-        for file_path in self.root.rglob('*.py'):
-            if file_path.is_file() and not str(file_path).endswith('__init__.py'):
-                rel_path = str(file_path.relative_to(self.root))
-                seen_files.add(rel_path)
-                analysis = self.analyze_file(file_path)
+        # Collect source files in toolkit, skipping files whose fingerprint
+        # (mtime, size) is unchanged since they were last indexed
+        pending: List[Tuple[str, str, List[int]]] = []
+        for rel_path, abs_path, st in self.iter_source_files():
+            seen_files.add(rel_path)
+            fingerprint = _fingerprint(st)
+            if self._is_current(rel_path, fingerprint):
+                continue
+            pending.append((rel_path, abs_path, fingerprint))
+            
+        paths = [abs_path for _, abs_path, _ in pending]
+        if len(pending) < PARALLEL_THRESHOLD or max_workers == 1:
+            analyses = map(self.analyze_file, map(Path, paths))
+            for (rel_path, abs_path, fingerprint), analysis in zip(pending, analyses):
+                self._store_analysis(rel_path, Path(abs_path), analysis, fingerprint)
+        else:
+            workers = max_workers or os.cpu_count() or 1
+            chunksize = max(1, len(paths) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                analyses = executor.map(_analyze_source, paths, chunksize=chunksize)
+                for (rel_path, abs_path, fingerprint), analysis in zip(pending, analyses):
+                    self._store_analysis(rel_path, Path(abs_path), analysis, fingerprint)
+        
+        # Remove stale entries (by key, so lazily loaded entries stay undecoded)
+        for rel_path in [k for k in self.components if k not in seen_files]:
+            del self.components[rel_path]
+            self._touched.add(rel_path)
+            self._search_changes[rel_path] = None
+            if self._symbol_index is not None:
+                self._symbol_index.remove_file(rel_path)
+        for rel_path in [k for k in self.dependencies if k not in seen_files]:
+            del self.dependencies[rel_path]
+            self._touched.add(rel_path)
+        for files in self.test_coverage.values():
+            for stale in [f for f in files if f not in seen_files]:
+                del files[stale]
+        
+        self._save_index_json()
+        
+    def _is_current(self, rel_path: str, fingerprint: List[int]) -> bool:
+        """Check whether a file's index entry was recorded for the given fingerprint."""
+        if rel_path not in self.components or rel_path not in self.dependencies:
+            return False
+        if isinstance(self.components, LazySection) and self.components.is_raw(rel_path):
+            # Unchanged since it was read; compare without decoding the entry
+            return self._fingerprints.get(rel_path) == fingerprint
+        entry = self.components[rel_path]
+        return entry.get('fingerprint') == fingerprint
+        
+    def stale_files(self) -> Set[str]:
+        """Files whose index entries do not match the tree: new, changed or deleted since indexed.
+        
+        Compares stat fingerprints only; nothing is analyzed.
+        """
+        seen = set()
+        stale = set()
+        for rel_path, _, st in self.iter_source_files():
+            seen.add(rel_path)
+            if not self._is_current(rel_path, _fingerprint(st)):
+                stale.add(rel_path)
+        stale.update(rel_path for rel_path in self.components if rel_path not in seen)
+        return stale
+        
+    def _stored_fingerprint(self, rel_path: str) -> Optional[List[int]]:
+        """Return the fingerprint recorded for an indexed file."""
+        if isinstance(self.components, LazySection) and self.components.is_raw(rel_path):
+            return self._fingerprints.get(rel_path)
+        return self.components[rel_path].get('fingerprint')
+        
+    def iter_source_files(self, start: str = ''):
+        """Yield (rel_path, abs_path, stat) for every indexable file.
+        
+        Ignored directories are pruned without being listed; see
+        source_walker.walk_source_files.
+        
+        Args:
+            start: Optional subdirectory to restrict the walk to
+        """
+        for rel_path, abs_path, st in walk_source_files(self.root, self.ignore_patterns,
+                                                        self.use_gitignore, source_suffixes(), start):
+            if not rel_path.endswith('__init__.py'):
+                yield rel_path, abs_path, st
                 
-                # Record components
-                self.components[rel_path] = {
-                    'classes': list(analysis['classes']),
-                    'functions': list(analysis['functions']),
-                    'last_update': self.update_counter
-                }
+    def update_files(self, file_paths: Iterable[Union[str, Path]]):
+        """Incrementally update the index for specific files.
+        
+        Files that still exist are re-analyzed; files that no longer exist
+        or are excluded by the ignore rules are removed from the index.
+        Nothing else is re-analyzed.
+        
+        Args:
+            file_paths: Changed file paths, absolute or relative to the toolkit root
+        """
+        self.update_counter += 1
+        
+        for path in file_paths:
+            path = Path(path)
+            file_path = path if path.is_absolute() else self.root / path
+            rel_path = str(file_path.relative_to(self.root))
+            self._remove_file(rel_path)
+            if get_backend(file_path) is None or file_path.name == '__init__.py':
+                continue
+            if path_is_ignored(self.root, rel_path, self.ignore_patterns, self.use_gitignore):
+                continue
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
+                continue
+            self._record_file(rel_path, file_path, _fingerprint(st))
                 
-                # Record dependencies
-                self.dependencies[rel_path] = analysis['dependencies']
+        self._save_index_json()
+        
+    def _record_file(self, rel_path: str, file_path: Path, fingerprint: Optional[List[int]] = None):
+        """Analyze one file and record its components, dependencies and coverage."""
+        self._store_analysis(rel_path, file_path, self.analyze_file(file_path), fingerprint)
+        
+    def _store_analysis(self, rel_path: str, file_path: Path, analysis: Optional[Dict],
+                        fingerprint: Optional[List[int]] = None):
+        """Record the components, dependencies and coverage of an analyzed file."""
+        if analysis is None:
+            self._remove_file(rel_path)  # Unreadable, e.g. deleted since the walk
+            return
+        rel_path = self._intern_path(rel_path)
+        self._touched.add(rel_path)
+        
+        # Record components
+        self.components[rel_path] = {
+            'classes': sorted(analysis['classes']),
+            'functions': sorted(analysis['functions']),
+            'symbols': [list(symbol) for symbol in analysis['symbols']],
+            'calls': [list(call) for call in analysis['calls']],
+            'last_update': self.update_counter,
+            'fingerprint': fingerprint
+        }
+        if analysis.get('errors'):
+            self.components[rel_path]['errors'] = analysis['errors']
+        
+        if self._symbol_index is not None:
+            self._symbol_index.update_file(rel_path, analysis['symbols'])
+        self._search_changes[rel_path] = (fingerprint, analysis['symbols'], analysis.get('docs', ()))
+        
+        # Record dependencies
+        self.dependencies[rel_path] = analysis['dependencies']
+        
+        # Record test coverage if this is a test file
+        if 'test_' in file_path.stem:
+            covered_components = self._extract_tested_components(analysis)
+            for component in covered_components:
+                self.test_coverage.setdefault(component, {})[rel_path] = None
+                    
+    def _remove_file(self, rel_path: str):
+        """Drop every index entry recorded for a file."""
+        self._touched.add(rel_path)
+        self.components.pop(rel_path, None)
+        self.dependencies.pop(rel_path, None)
+        for files in self.test_coverage.values():
+            files.pop(rel_path, None)
+        if self._symbol_index is not None:
+            self._symbol_index.remove_file(rel_path)
+        self._search_changes[rel_path] = None
                 
-                # Record test coverage if this is a test file
-                if 'test_' in file_path.stem:
-                    covered_components = self._extract_tested_components(analysis)
-                    for component in covered_components:
-                        if component not in self.test_coverage:
-                            self.test_coverage[component] = []
-                        if rel_path not in self.test_coverage[component]:
-                            self.test_coverage[component].append(rel_path)
-        
-        # Remove stale entries
-        self.components = {k: v for k, v in self.components.items() if k in seen_files}
-        self.dependencies = {k: v for k, v in self.dependencies.items() if k in seen_files}
-        self.test_coverage = {k: [f for f in v if f in seen_files] 
-                            for k, v in self.test_coverage.items()}
+    def parse_errors(self) -> Dict[str, List]:
+        """Indexed files with syntax errors, mapped to their [line, message] errors."""
+        return {rel_path: entry['errors'] for rel_path, entry in self.components.items()
+                if entry.get('errors')}
         
-        self._save_index_json()
+    def _intern_path(self, rel_path: str) -> str:
+        """Return the shared instance of a path string used across the index."""
+        return self._path_table.setdefault(rel_path, rel_path)
+        
+    def dependency_graph(self, files: Optional[Iterable[str]] = None) -> DependencyGraph:
+        """Build a queryable graph of the indexed files and their dependencies.
+        
+        Args:
+            files: Additional relative paths to include as nodes
+        """
+        return DependencyGraph.from_index(self, files)
+        
+    def call_graph(self) -> CallGraph:
+        """Build a queryable call graph of the indexed symbols."""
+        return CallGraph.from_index(self)
+        
+    def symbol_index(self) -> SymbolIndex:
+        """Return the global symbol table for the index.
+        
+        Built from the recorded symbols on first use and kept up to date by
+        update_index and update_files afterwards.
+        """
+        if self._symbol_index is None:
+            self._symbol_index = SymbolIndex.from_components(self.components)
+        return self._symbol_index
+        
+    def search_index(self) -> SearchIndex:
+        """Return the full-text search index over symbol names, signatures and docstrings.
+        
+        Loaded from the search file saved next to the index. Files whose
+        search entry does not match their indexed fingerprint (e.g. an index
+        written before the search file existed) are re-analyzed for their
+        docstrings, and the search file is rewritten if anything changed.
+        Files changed on disk since they were indexed are left for the next
+        index update, so search entries always match the indexed version.
+        """
+        self._load_search_index()
+        search = self._search_index
+        for rel_path in self.components:
+            fingerprint = self._stored_fingerprint(rel_path)
+            if rel_path in self._search_changes or search.fingerprint(rel_path) == fingerprint:
+                continue
+            file_path = self.root / rel_path
+            if self._current_fingerprint(file_path) != fingerprint:
+                continue
+            analysis = self.analyze_file(file_path)
+            if analysis is None or self._current_fingerprint(file_path) != fingerprint:
+                continue  # Changed while being analyzed
+            self._search_changes[rel_path] = (fingerprint, analysis['symbols'], analysis['docs'])
+        for rel_path in search.files():
+            if rel_path not in self.components:
+                self._search_changes[rel_path] = None
+        if self._search_changes:
+            self._save_search_index()
+        return self._search_index
+        
+    @staticmethod
+    def _current_fingerprint(file_path: Path) -> Optional[List[int]]:
+        try:
+            return _fingerprint(file_path.stat())
+        except OSError:
+            return None
+            
+    def _load_search_index(self):
+        """(Re)load the search file unless the loaded search index is current."""
+        stamp = file_stamp(self.search_file)
+        if self._search_index is not None and stamp == self._search_stamp:
+            return
+        self._search_index = SearchIndex()
+        if stamp is not None:
+            with open(self.search_file, 'rb') as f:
+                self._search_index = SearchIndex.from_json(f.read())
+        self._search_stamp = stamp
+        
+    def _save_search_index(self):
+        """Apply pending search changes to the search file under its lock.
+        
+        The file is re-read first if another process rewrote it, so only
+        the files this indexer changed are replaced.
+        """
+        with index_lock(self.search_file):
+            self._load_search_index()
+            search = self._search_index
+            for rel_path, change in self._search_changes.items():
+                if change is None:
+                    search.remove_file(rel_path)
+                else:
+                    fingerprint, symbols, docs = change
+                    search.update_file(rel_path, symbols, docs, fingerprint)
+            write_atomic(self.search_file, search.to_json())
+            self._search_stamp = file_stamp(self.search_file)
+        self._search_changes.clear()
+        
+    def select_tests(self, changed_files: Iterable[Union[str, Path]]) -> List[str]:
+        """Select the test files affected by a set of changed files.
+        
+        Walks the reverse dependency graph from the changed files and returns
+        every indexed test file that depends on them, directly or
+        transitively. Test files recorded in test_coverage for classes
+        defined in affected files are included as well.
+        
+        Args:
+            changed_files: Changed file paths, absolute or relative to the toolkit root
+            
+        Returns:
+            Sorted list of affected test file paths relative to the toolkit root
+        """
+        changed = set()
+        for path in changed_files:
+            path = Path(path)
+            if path.is_absolute():
+                try:
+                    path = path.relative_to(self.root)
+                except ValueError:
+                    continue
+            changed.add(str(path))
+            
+        # Walk the reverse dependency graph from the changed files
+        graph = self.dependency_graph(changed)
+        affected = changed | graph.transitive_dependents(changed)
+                    
+        selected = {f for f in affected if 'test_' in Path(f).stem and f in self.components}
+        for rel_path in affected:
+            for class_name in self.components.get(rel_path, {}).get('classes', []):
+                if class_name != self.root.stem:
+                    selected.update(self.test_coverage.get(class_name, []))
+                    
+        return sorted(selected)
         
     def _extract_tested_components(self, analysis: Dict) -> Set[str]:
         """Extract components being tested from test file analysis."""
@@ -122,25 +546,91 @@ class ToolkitIndexer:
                     
         return tested
         
+    @staticmethod
+    def _encoded_items(section: Mapping, encode=None):
+        """Yield (key, JSON text) for a section, reusing undecoded lazy entries."""
+        if isinstance(section, LazySection):
+            return section.encoded_items(encode)
+        return ((k, json.dumps(encode(v) if encode is not None else v)) for k, v in section.items())
+        
     def _save_index_json(self):
-        """Save the current index state to JSON."""
-        index_data = {
-            'metadata': {
-                'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'update_counter': self.update_counter,
-                'version': '0.1.0'
-            },
-            'components': self.components,
-            'dependencies': {k: list(v) for k, v in self.dependencies.items()},
-            'test_coverage': self.test_coverage
-        }
+        """Save the current index state to JSON.
+        
+        The file uses the sectioned layout from index_store: valid JSON with
+        one entry per line and a header locating each section, so lazy
+        indexers can read it partially.
         
+        Saving is safe across processes: it holds the index lock, merges in
+        updates other processes saved since this index was loaded, and
+        replaces the file atomically.
+        """
         os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
-        with open(self.index_file, 'w') as f:
-            json.dump(index_data, f, indent=4)
+        with index_lock(self.index_file):
+            current = file_stamp(self.index_file)
+            if current is not None and current != self._loaded_stamp:
+                self._merge_saved_index()
+            write_atomic(self.index_file, self._encode_index())
+            self._loaded_stamp = file_stamp(self.index_file)
+        self._loaded_counter = self.update_counter
+        self._touched.clear()
+        if self._search_changes:
+            self._save_search_index()
+        
+    def _merge_saved_index(self):
+        """Overlay this indexer's changes on the index as saved by other processes.
+        
+        Entries of files this indexer recorded or removed since it was loaded
+        win; every other entry is taken from the file on disk, so concurrent
+        incremental updates combine instead of the last writer winning.
+        """
+        saved = ToolkitIndexer(self.root, self.ignore_patterns, self.use_gitignore, lazy=True)
+        for rel_path in self._touched:
+            for mine, theirs in ((self.components, saved.components),
+                                 (self.dependencies, saved.dependencies)):
+                if rel_path in mine:
+                    theirs[rel_path] = mine[rel_path]
+                else:
+                    theirs.pop(rel_path, None)
+        for files in saved.test_coverage.values():
+            for rel_path in [f for f in files if f in self._touched]:
+                del files[rel_path]
+        for component, files in self.test_coverage.items():
+            for rel_path in files:
+                if rel_path in self._touched:
+                    saved.test_coverage.setdefault(component, {})[saved._intern_path(rel_path)] = None
+                    
+        self.components = saved.components
+        self.dependencies = saved.dependencies
+        self.test_coverage = saved.test_coverage
+        self._fingerprints = saved._fingerprints
+        self._path_table = saved._path_table
+        self.update_counter = saved.update_counter + self.update_counter - self._loaded_counter
+        self._symbol_index = None  # Other processes changed files; rebuilt on next use
+        
+    def _encode_index(self) -> bytes:
+        """Serialize the index in the sectioned layout."""
+        metadata = {
+            'last_updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'update_counter': self.update_counter,
+            'version': '0.1.0'
+        }
+        sections = {
+            'components': self._encoded_items(self.components),
+            'dependencies': self._encoded_items(self.dependencies, sorted),
+            'test_coverage': self._encoded_items(self.test_coverage, list),
+            'fingerprints': ((k, json.dumps(self._stored_fingerprint(k))) for k in self.components)
+        }
+        return encode_index(metadata, sections)
 
 class ComponentAnalyzer(ast.NodeVisitor):
-    """AST visitor to analyze Python file components and dependencies."""
+    """AST visitor to analyze Python file components and dependencies.
+    
+    A single pass collects imports, dependencies, qualified symbols with
+    their signatures and docstrings (for the search index) and call edges.
+    Symbols are qualified by their enclosing classes and functions
+    ('Class.method', 'outer.inner'); `classes` and `functions` keep the flat
+    names for existing callers.
+    """
     
     def __init__(self, module_name: str):
         self.module_name = module_name
@@ -148,6 +638,35 @@ class ComponentAnalyzer(ast.NodeVisitor):
         self.classes: Set[str] = set()
         self.functions: Set[str] = set()
         self.dependencies: Set[str] = set()
+        self.symbols: List[Tuple[str, str, int]] = []  # (qualified name, kind, line)
+        self.docs: List[Tuple[str, str, Optional[str]]] = []  # (qualified name, signature, docstring)
+        self.aliases: Dict[str, str] = {}  # Imported local name -> dotted target
+        self._raw_calls: List[Tuple[str, str, int]] = []
+        self._scope: List[Tuple[str, str]] = []  # (name, 'class' or 'function')
+        
+    def _qualify(self, name: str) -> str:
+        """Prefix a name with its enclosing classes and functions."""
+        return '.'.join([scope for scope, _ in self._scope] + [name])
+        
+    @property
+    def calls(self) -> List[Tuple[str, str, int]]:
+        """Call edges as (caller, callee, line).
+        
+        The caller is a qualified symbol name, or '<module>' for module-level
+        code. Callees are dotted names with imported aliases expanded and
+        self/cls resolved to the enclosing class; calls to builtins that are
+        not shadowed by an import or definition are omitted.
+        """
+        defined = {name.split('.', 1)[0] for name, _, _ in self.symbols}
+        edges = []
+        for caller, callee, line in self._raw_calls:
+            head, _, rest = callee.partition('.')
+            if head in self.aliases:
+                callee = self.aliases[head] + ('.' + rest if rest else '')
+            elif head in _BUILTIN_NAMES and head not in defined:
+                continue
+            edges.append((caller, callee, line))
+        return edges
         
     def visit_Import(self, node):
         """Record import statements."""
@@ -155,32 +674,104 @@ class ComponentAnalyzer(ast.NodeVisitor):
             self.imports.add(name.name)
             if not name.name.startswith('__'):
                 self.dependencies.add(name.name)
+            if name.asname:
+                self.aliases[name.asname] = name.name
+            else:
+                head = name.name.split('.', 1)[0]
+                self.aliases[head] = head
         self.generic_visit(node)
         
     def visit_ImportFrom(self, node):
-        """Record from-import statements."""
+        """Record from-import statements.
+        
+        'from pkg import mod' may import a submodule, so each imported name
+        is also recorded as a 'pkg.mod' dependency candidate. Relative
+        imports keep their leading dots ('.mod', '..pkg.mod'); DependencyGraph
+        resolves them against the importing file's package.
+        """
+        module = '.' * node.level + (node.module or '')
         if node.module:
             self.imports.add(node.module)
-            if not node.module.startswith('__'):
-                self.dependencies.add(node.module)
+        track = not module.startswith('__')
+        if track and node.module:
+            self.dependencies.add(module)
         for name in node.names:
             full_name = f"{node.module}.{name.name}" if node.module else name.name
             self.imports.add(full_name)
+            if name.name != '*':
+                self.aliases[name.asname or name.name] = full_name
+                if track:
+                    self.dependencies.add(module + name.name if module.endswith('.') else f"{module}.{name.name}")
         self.generic_visit(node)
         
     def visit_ClassDef(self, node):
         """Record class definitions."""
         self.classes.add(node.name)
+        self.symbols.append((self._qualify(node.name), 'class', node.lineno))
+        bases = ', '.join(ast.unparse(base) for base in node.bases + node.keywords)
+        self.docs.append((self._qualify(node.name), f"({bases})" if bases else '', ast.get_docstring(node)))
         # Record base classes as dependencies
         for base in node.bases:
             if isinstance(base, ast.Name):
                 self.dependencies.add(base.id)
-        self.generic_visit(node)
+        # Decorators, bases and keywords are evaluated in the enclosing scope
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+        self._scope.append((node.name, 'class'))
+        for child in node.body:
+            self.visit(child)
+        self._scope.pop()
         
     def visit_FunctionDef(self, node):
         """Record function definitions."""
         self.functions.add(node.name)
+        in_class = bool(self._scope) and self._scope[-1][1] == 'class'
+        kind = 'method' if in_class else 'function'
+        if isinstance(node, ast.AsyncFunctionDef):
+            kind = 'async ' + kind
+        self.symbols.append((self._qualify(node.name), kind, node.lineno))
+        signature = f"({ast.unparse(node.args)})"
+        if node.returns is not None:
+            signature += f" -> {ast.unparse(node.returns)}"
+        self.docs.append((self._qualify(node.name), signature, ast.get_docstring(node)))
+        # Decorators, defaults and annotations are evaluated in the enclosing scope
+        for child in node.decorator_list:
+            self.visit(child)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._scope.append((node.name, 'function'))
+        for child in node.body:
+            self.visit(child)
+        self._scope.pop()
+        
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_Call(self, node):
+        """Record a call edge from the enclosing symbol."""
+        callee = self._dotted_name(node.func)
+        if callee is not None:
+            caller = '.'.join(scope for scope, _ in self._scope) or '<module>'
+            self._raw_calls.append((caller, callee, node.lineno))
         self.generic_visit(node)
+        
+    def _dotted_name(self, node) -> Optional[str]:
+        """Return the dotted name of a called expression, if it has one."""
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        head = node.id
+        if head in ('self', 'cls') and parts:
+            # Resolve to the class of the innermost enclosing method
+            for i in range(len(self._scope) - 1, 0, -1):
+                if self._scope[i][1] == 'function' and self._scope[i - 1][1] == 'class':
+                    head = '.'.join(scope for scope, _ in self._scope[:i])
+                    break
+        parts.append(head)
+        return '.'.join(reversed(parts))
 
 def update_toolkit_index(toolkit_root: Optional[str] = None):
     """Update the AI toolkit index.
@@ -198,4 +789,8 @@ def update_toolkit_index(toolkit_root: Optional[str] = None):
     indexer.update_index()
     
 if __name__ == '__main__':
+    # With arguments, answer a query (see index_query); without, rebuild the index
+    if len(sys.argv) > 1:
+        from ai_toolkit.tools.index_query import main
+        sys.exit(main())
     update_toolkit_index() 
\ No newline at end of file